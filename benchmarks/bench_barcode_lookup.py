@@ -0,0 +1,87 @@
+"""
+Barcode lookup latency: the old per-keystroke key rebuild + bisect against the persistent
+barcode index of the Catalog and the scanner's GTIN lookup, and prefix lookups against a
+scan of every barcode.
+
+    python benchmarks/bench_barcode_lookup.py --sizes 10000 100000 1000000
+"""
+import argparse
+import random
+import time
+from bisect import bisect_left, bisect_right
+
+import standin
+from modules.Catalog import Catalog
+
+
+def make_rows(count, rng):
+    return [
+        (f"IT{n // 2:07d}", " ".join(rng.choice(standin.WORDS) for _ in range(3)), standin.UOMS[n % 2],
+         1.0, 0.5, f"955{rng.randrange(10 ** 10):010d}", "HQ", 1.0)
+        for n in range(count)
+    ]
+
+
+def legacy_lookup(items, target):
+    """BarcodeApp.binary_search before the index: rebuild every key, then bisect."""
+    item_codes = [str(item[5]).lower() for item in items]
+    index = bisect_left(item_codes, target.lower())
+    end_index = bisect_right(item_codes, target.lower())
+    return items[index:end_index]
+
+
+def scan_prefix(items, prefix):
+    """What a partial code needed before prefix search: a scan over the whole catalog."""
+    return [item for item in items if str(item[5]).lower().startswith(prefix)]
+
+
+def per_lookup(function, targets):
+    started = time.perf_counter()
+    for target in targets:
+        function(target)
+    return (time.perf_counter() - started) / len(targets)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'items':>9} {'catalog build ms':>17} {'legacy us/lookup':>17} {'index us/lookup':>16} {'GTIN us/lookup':>15} {'speedup':>9}")
+    prefix_rows = []
+    for size in args.sizes:
+        rng = random.Random(3)
+        rows = make_rows(size, rng)
+        items = sorted(rows, key=lambda row: row[5].lower())
+
+        started = time.perf_counter()
+        catalog = Catalog.from_rows(rows, False)
+        build = time.perf_counter() - started
+
+        targets = [rng.choice(rows)[5] for _ in range(args.lookups)] + ["000"]  # Hits and a miss
+        # The legacy path is O(n) per lookup; a handful of lookups is enough to time it
+        legacy = per_lookup(lambda target: legacy_lookup(items, target), targets[:max(3, 200000 // size)])
+        indexed = per_lookup(catalog.barcode_index.exact, targets)
+        gtin = per_lookup(catalog.barcode_lookup.lookup, targets)
+
+        for target in targets[:50]:
+            assert [row[5] for row in legacy_lookup(items, target)] == \
+                [catalog.barcodes[row_id] for row_id in catalog.barcode_index.exact(target)]
+            assert list(catalog.barcode_index.exact(target)) == list(catalog.barcode_lookup.lookup(target))
+        print(f"{size:>9} {build * 1000:>17.1f} {legacy * 1e6:>17.1f} {indexed * 1e6:>16.2f} {gtin * 1e6:>15.2f} {legacy / gtin:>8.0f}x")
+
+        prefixes = [target[:7] for target in targets]
+        scanned = per_lookup(lambda prefix: scan_prefix(items, prefix), prefixes[:max(3, 200000 // size)])
+        ranged = per_lookup(catalog.barcode_index.prefix, prefixes)
+        for prefix in prefixes[:50]:
+            assert len(scan_prefix(items, prefix)) == len(catalog.barcode_index.prefix(prefix))
+        prefix_rows.append((size, scanned, ranged))
+
+    print(f"\n{'items':>9} {'scan us/prefix':>15} {'index us/prefix':>16} {'speedup':>9}")
+    for size, scanned, ranged in prefix_rows:
+        print(f"{size:>9} {scanned * 1e6:>15.1f} {ranged * 1e6:>16.2f} {scanned / ranged:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
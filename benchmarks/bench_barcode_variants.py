@@ -0,0 +1,89 @@
+"""
+Scanned barcode variants (EAN-13 with a leading zero for a UPC-A, codes stored without their
+check digit): how many the exact barcode index resolves against the GTIN index, its build
+time and memory, and the lookup latency.
+
+    python benchmarks/bench_barcode_variants.py --sizes 100000 1000000
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+import standin
+from modules.Catalog import Catalog
+from modules.CatalogIndex import GtinIndex, check_digit
+
+
+def make_rows(count, rng):
+    """A mix of stored forms: EAN-13, UPC-A, EAN-13 without check digit, and internal codes."""
+    rows = []
+    for n in range(count):
+        kind = n % 4
+        if kind == 0:
+            body = f"955{n:09d}"
+            barcode = body + str(check_digit(body))
+        elif kind == 1:
+            body = f"0{n:010d}"
+            barcode = body + str(check_digit(body))  # UPC-A
+        elif kind == 2:
+            barcode = f"956{n:09d}"  # Stored without its check digit
+        else:
+            barcode = f"INT-{n:07d}"
+        rows.append((f"IT{n:07d}", "ITEM", "UNIT", 1.0, 0.5, barcode, "HQ", 1.0))
+    return rows
+
+
+def scanned(barcode):
+    """What a scanner sends for a stored barcode."""
+    if barcode.startswith("INT-"):
+        return barcode
+    if len(barcode) == 12 and barcode.startswith("956"):
+        return barcode + str(check_digit(barcode))
+    return barcode.zfill(13)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'items':>9} {'exact hits':>11} {'GTIN hits':>10} {'build ms':>9} {'MB':>6} {'B/row':>6} {'exact us':>9} {'GTIN us':>8}")
+    for size in args.sizes:
+        rng = random.Random(13)
+        rows = make_rows(size, rng)
+        catalog = Catalog.from_rows(rows, False)
+        codes = [scanned(rng.choice(rows)[5]) for _ in range(args.lookups)]
+
+        exact_hits = sum(1 for code in codes if catalog.barcode_index.exact(code))
+        gtin_hits = sum(1 for code in codes if catalog.barcode_lookup.lookup(code))
+
+        gc.collect()
+        tracemalloc.start()
+        started = time.perf_counter()
+        index = GtinIndex(catalog.barcodes)
+        index.build(range(len(catalog)))
+        build = time.perf_counter() - started
+        gc.collect()
+        size_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del index
+
+        started = time.perf_counter()
+        for code in codes:
+            catalog.barcode_index.exact(code)
+        exact_us = (time.perf_counter() - started) * 1e6 / len(codes)
+        started = time.perf_counter()
+        for code in codes:
+            catalog.barcode_lookup.lookup(code)
+        gtin_us = (time.perf_counter() - started) * 1e6 / len(codes)
+
+        assert gtin_hits == len(codes)
+        print(f"{size:>9} {exact_hits / len(codes):>11.0%} {gtin_hits / len(codes):>10.0%} {build * 1000:>9.0f} "
+              f"{size_bytes / 2**20:>6.1f} {size_bytes / size:>6.0f} {exact_us:>9.2f} {gtin_us:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
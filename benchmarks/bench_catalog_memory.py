@@ -0,0 +1,86 @@
+"""
+Compare the memory held by the fetched row lists with the column-oriented Catalog.
+
+Rows are generated the way the drivers hand them over: a fresh string object per text field
+and Decimal prices for SQL Server (money columns), floats for SQLite.
+
+    python benchmarks/bench_catalog_memory.py --sizes 100000 1000000
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from decimal import Decimal
+
+import standin
+from modules.Catalog import Catalog
+
+
+def fresh(text):
+    """A new string object with the same text, like a driver returns for every fetched field."""
+    return text.encode("utf-8").decode("utf-8")
+
+
+def sqlserver_rows(count, rng):
+    rows = []
+    for n in range(count):
+        item_code = f"IT{n // 2:07d}"
+        description = " ".join(rng.choice(standin.WORDS) for _ in range(4))
+        price = Decimal(rng.randrange(50, 50000)) / 100
+        rows.append((
+            item_code, description, fresh(standin.UOMS[n % 2]), price, price * Decimal("0.7"),
+            f"955{n:010d}", fresh("HQ"), price,
+        ))
+    return rows
+
+
+def sqlite_rows(count, rng):
+    return [
+        (f"955{n:010d}", " ".join(rng.choice(standin.WORDS) for _ in range(4)), rng.randrange(50, 50000) / 100)
+        for n in range(count)
+    ]
+
+
+def measure(build):
+    """Bytes still allocated by the object `build` returns, and the build time."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    args = parser.parse_args()
+
+    print(f"{'source':<11} {'rows':>9} {'row list MB':>12} {'catalog MB':>11} {'saved':>7} {'B/row list':>11} {'B/row cat':>10} {'build s':>8}")
+    for use_sqlite, generate in ((False, sqlserver_rows), (True, sqlite_rows)):
+        for size in args.sizes:
+            rows, rows_bytes, _ = measure(lambda: generate(size, random.Random(1)))
+            started = time.perf_counter()
+            Catalog.from_rows(rows, use_sqlite)
+            elapsed = time.perf_counter() - started
+            del rows
+
+            # Measured on its own: the generated rows are freed once built, only what the catalog keeps counts
+            catalog, catalog_bytes, _ = measure(lambda: Catalog.from_rows(generate(size, random.Random(1)), use_sqlite))
+
+            assert len(catalog) == size
+            print(
+                f"{'SQLite' if use_sqlite else 'SQL Server':<11} {size:>9} {rows_bytes / 2**20:>12.1f} "
+                f"{catalog_bytes / 2**20:>11.1f} {1 - catalog_bytes / rows_bytes:>7.1%} "
+                f"{rows_bytes / size:>11.0f} {catalog_bytes / size:>10.0f} {elapsed:>8.2f}"
+            )
+            del catalog
+            gc.collect()
+
+
+if __name__ == "__main__":
+    main()
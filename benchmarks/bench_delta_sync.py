@@ -0,0 +1,94 @@
+"""
+Compare a full catalog reload with a delta sync refresh against the SQLite stand-in.
+
+    python benchmarks/bench_delta_sync.py --items 200000 --changes 50
+"""
+import argparse
+import random
+import time
+
+import standin
+from modules.Catalog import Catalog
+from modules.CatalogQueries import CatalogQueries
+from modules.CatalogSync import DeltaSync
+
+
+def full_reload(queries, location):
+    return Catalog.from_rows(queries.items(location).fetchall(), False)
+
+
+def touch_rows(connection, version, changes, deletes, rng):
+    """Simulate back-office edits: price changes, POS price changes, deleted POS prices and deleted UOMs."""
+    keys = connection.execute("SELECT ItemCode, UOM FROM dbo.ItemUOM").fetchall()
+    for item_code, uom in rng.sample(keys, changes):
+        connection.execute(
+            "UPDATE dbo.ItemUOM SET Price = Price + 1, LastModified = ? WHERE ItemCode = ? AND UOM = ?",
+            (version, item_code, uom),
+        )
+    connection.execute(
+        "UPDATE dbo.PosPricePlan SET Price = Price + 1, LastModified = ? WHERE rowid IN "
+        "(SELECT rowid FROM dbo.PosPricePlan ORDER BY random() LIMIT ?)",
+        (version, max(1, changes // 5)),
+    )
+    connection.execute(
+        "DELETE FROM dbo.PosPricePlan WHERE rowid IN (SELECT rowid FROM dbo.PosPricePlan ORDER BY random() LIMIT ?)",
+        (deletes,),
+    )
+    for item_code, uom in rng.sample(keys, deletes):
+        connection.execute("DELETE FROM dbo.ItemUOM WHERE ItemCode = ? AND UOM = ?", (item_code, uom))
+    connection.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--changes", type=int, default=50)
+    parser.add_argument("--deletes", type=int, default=5)
+    parser.add_argument("--refreshes", type=int, default=10)
+    parser.add_argument("--reconcile-every", type=int, default=5)
+    parser.add_argument("--location", default="HQ")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    connection = standin.connect()
+    rows = standin.populate(connection, args.items)
+    print(f"Stand-in catalog: {args.items} items, {rows} ItemUOM rows")
+
+    sync = DeltaSync("LastModified", args.reconcile_every)
+    queries = CatalogQueries(connection)
+    sync.pending_marks = sync.read_marks(queries)
+    catalog = full_reload(queries, args.location)
+    sync.commit_pending()
+
+    print(f"{'refresh':>7} {'full s':>9} {'full rows':>10} {'delta s':>9} {'delta rows':>10} {'reconciled':>10} {'saved':>7}")
+    total_full = total_delta = 0.0
+    for refresh in range(1, args.refreshes + 1):
+        touch_rows(connection, refresh + 1, args.changes, args.deletes, rng)
+
+        started = time.perf_counter()
+        expected = full_reload(queries, args.location)
+        full_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        changed, live_keys, marks = sync.fetch_changes(queries, args.location)
+        sync.merge(catalog, changed, live_keys)
+        sync.commit(marks)
+        delta_time = time.perf_counter() - started
+
+        total_full += full_time
+        total_delta += delta_time
+        print(
+            f"{refresh:>7} {full_time:>9.3f} {len(expected):>10} {delta_time:>9.3f} {len(changed):>10} "
+            f"{'yes' if live_keys is not None else 'no':>10} {1 - delta_time / full_time:>7.1%}"
+        )
+
+        if live_keys is not None:
+            # After a reconciliation the merged catalog must match a full reload exactly
+            assert sorted(catalog) == sorted(expected), "delta catalog diverged"
+            assert [row[5].lower() for row in catalog] == [row[5].lower() for row in expected], "barcode order diverged"
+
+    print(f"Total: full {total_full:.3f}s, delta {total_delta:.3f}s ({1 - total_delta / total_full:.1%} saved)")
+
+
+if __name__ == "__main__":
+    main()
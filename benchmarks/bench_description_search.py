@@ -0,0 +1,89 @@
+"""
+Description keyword search: the linear scan of filter_items against the inverted word
+index of the Catalog, with and without the trigram index. All must return the same rows
+in the same order.
+
+    python benchmarks/bench_description_search.py --sizes 100000 300000
+"""
+import argparse
+import random
+import time
+
+import standin
+from modules.Catalog import Catalog
+
+QUERIES = [
+    "milo", "cream cracker", "choc", "soy sauce", "full cream milk", "ea", "orange juice water", "xyz",
+    "colate", "kchoc", "ilkbre",
+]
+
+
+def make_brands(count, rng):
+    """Pseudo brand names, so the vocabulary is as large as a real store's."""
+    letters = "abcdefghijklmnoprstuvwy"
+    return list({"".join(rng.choice(letters) for _ in range(rng.randint(4, 9))).upper() for _ in range(count)})
+
+
+def make_rows(count, rng):
+    brands = make_brands(20000, rng)
+    rows = []
+    for n in range(count):
+        words = [rng.choice(brands)] + [rng.choice(standin.WORDS) for _ in range(rng.randint(1, 4))]
+        words.append(f"{rng.randint(1, 2000)}{rng.choice(('G', 'ML', 'KG', 'S'))}")
+        if rng.random() < 0.2:
+            words[1] = words[1] + words[-2]  # Run-together words, e.g. DARKCHOCOLATE
+        rows.append((f"IT{n // 2:07d}", " ".join(words), standin.UOMS[n % 2], 1.0, 0.5, f"955{n:010d}", "HQ", 1.0))
+    return rows
+
+
+def linear_search(catalog, keywords):
+    """filter_items(isUOM=False) before the index."""
+    descriptions = catalog.descriptions
+    return [
+        row_id for row_id in catalog.order
+        if all(keyword in str(descriptions[row_id]).lower() for keyword in keywords)
+    ]
+
+
+def timed(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - started) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 300000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--trigram-budget", type=int, default=64, help="MB")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        rows = make_rows(size, random.Random(5))
+        started = time.perf_counter()
+        catalog = Catalog.from_rows(rows, False)
+        print(f"\n{size} items, catalog with word index built in {time.perf_counter() - started:.2f}s")
+        started = time.perf_counter()
+        trigram_catalog = Catalog.from_rows(rows, False, args.trigram_budget * 2 ** 20)
+        trigrams = trigram_catalog.trigram_index
+        if trigrams.enabled:
+            print(f"with trigram index built in {time.perf_counter() - started:.2f}s, ~{trigrams.size / 2 ** 20:.1f} MB "
+                  f"({len(trigrams.postings)} trigrams)")
+        else:
+            print(f"trigram index exceeded {args.trigram_budget} MB and was turned off")
+        print(f"{'query':<22} {'matches':>8} {'scan ms':>9} {'word ms':>9} {'trigram ms':>11} {'best speedup':>13}")
+
+        for query in QUERIES:
+            keywords = query.split()
+            scan_time, expected = timed(lambda: linear_search(catalog, keywords), max(1, args.repeat // 2))
+            index_time, found = timed(lambda: catalog.search_descriptions(keywords), args.repeat)
+            trigram_time, trigram_found = timed(lambda: trigram_catalog.search_descriptions(keywords), args.repeat)
+            assert list(found) == expected, f"word index and scan disagree on {query!r}"
+            assert list(trigram_found) == expected, f"trigram index and scan disagree on {query!r}"
+            print(f"{query:<22} {len(expected):>8} {scan_time * 1000:>9.1f} {index_time * 1000:>9.2f} "
+                  f"{trigram_time * 1000:>11.2f} {scan_time / min(index_time, trigram_time):>12.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Field-qualified queries (`code:IT00012* desc:milk price:2..5 uom:ctn`): the planner's
+index lookups against checking every row of the catalog.
+
+    python benchmarks/bench_filter_query.py --sizes 100000 1000000
+"""
+import argparse
+import random
+import time
+
+import standin
+from modules.Catalog import Catalog, from_fixed
+from modules.CatalogFilter import explain, parse_query, run_query
+
+QUERIES = [
+    "code:it00012*",
+    "desc:milk price:2..5",
+    "uom:ctn price:..1",
+    "desc:\"cream cracker\" uom:pcs",
+    "code:it0001* desc:choc uom:unit",
+    "bc:9550000012*",
+    "price:99.5..100 milo",
+    "loc:hq desc:tea",
+]
+
+
+def make_rows(count, rng):
+    return [
+        (f"IT{n // 3:07d}", " ".join(rng.choice(standin.WORDS) for _ in range(rng.randint(2, 5))),
+         standin.UOMS[n % 3], rng.randrange(50, 50000) / 100, 0.5, f"955{n:010d}", rng.choice(("HQ", "BR1", "BR2")), 1.0)
+        for n in range(count)
+    ]
+
+
+def scan(catalog, query):
+    """Every row checked against every term, the way a Python filter over all items would."""
+    accepts = [term.accepts(catalog) for term in parse_query(query).terms]
+    return [row_id for row_id in catalog.order if all(accept(row_id) for accept in accepts)]
+
+
+def timed(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - started) * 1000 / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        catalog = Catalog.from_rows(make_rows(size, random.Random(11)), False)
+        started = time.perf_counter()
+        for column in ("unit_prices", "uom_codes", "location_codes"):
+            catalog.index(column)
+        print(f"\n{size} items, price/UOM/location indexes built in {(time.perf_counter() - started) * 1000:.0f} ms")
+        print(f"{'query':<34} {'rows':>7} {'scan ms':>9} {'planned ms':>11} {'speedup':>8}  plan")
+        for query in QUERIES:
+            terms = parse_query(query).terms
+            scan_time, expected = timed(lambda: scan(catalog, query), 1)
+            planned_time, found = timed(lambda: run_query(catalog, terms), args.repeat)
+            assert list(found) == expected, query
+            print(f"{query:<34} {len(found):>7} {scan_time:>9.1f} {planned_time:>11.2f} {scan_time / planned_time:>7.0f}x  {explain(catalog, terms)}")
+
+        low, high = 2 * 10000, 5 * 10000
+        assert all(low <= catalog.unit_prices[row_id] <= high for row_id in run_query(catalog, parse_query("price:2..5").terms))
+        assert from_fixed(catalog.unit_prices[catalog.index("unit_prices").ids[-1]]) <= 500
+
+
+if __name__ == "__main__":
+    main()
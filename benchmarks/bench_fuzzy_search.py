@@ -0,0 +1,58 @@
+"""
+Typo-tolerant search: a per-item edit distance loop against the symmetric-delete index.
+
+    python benchmarks/bench_fuzzy_search.py --items 300000
+"""
+import argparse
+import random
+import time
+
+from bench_description_search import make_rows
+from modules.Catalog import Catalog
+from modules.CatalogIndex import edit_distance
+
+QUERIES = ["biskut", "choclate", "noodel", "shampo", "oragne juise", "cofee"]
+
+
+def naive_search(catalog, keywords):
+    """Every description word of every item compared with every keyword."""
+    matches = []
+    for row_id in catalog.order:
+        words = str(catalog.descriptions[row_id]).lower().split()
+        if all(any(edit_distance(keyword, word, 2) <= 2 for word in words) for keyword in keywords):
+            matches.append(row_id)
+    return matches
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=300000)
+    parser.add_argument("--naive-items", type=int, default=20000, help="the naive loop only runs on this many")
+    args = parser.parse_args()
+
+    rows = make_rows(args.items, random.Random(5))
+    catalog = Catalog.from_rows(rows, False)
+    small = Catalog.from_rows(rows[:args.naive_items], False)
+
+    started = time.perf_counter()
+    catalog.fuzzy_search(["warmup"])
+    print(f"{args.items} items; symmetric-delete dictionary built on first use in {time.perf_counter() - started:.2f}s "
+          f"({len(catalog.fuzzy_index.words)} words, {len(catalog.fuzzy_index.deletes)} deletes)")
+
+    print(f"{'query':<14} {'naive ms @' + str(args.naive_items):>16} {'index ms':>9} {'top-100 of':>11}")
+    for query in QUERIES:
+        keywords = query.split()
+        started = time.perf_counter()
+        naive_search(small, keywords)
+        naive = time.perf_counter() - started
+
+        started = time.perf_counter()
+        found = catalog.fuzzy_search(keywords, 100)
+        indexed = time.perf_counter() - started
+
+        words = catalog.fuzzy_index.lookup(keywords[0], 2)
+        print(f"{query:<14} {naive * 1000:>16.1f} {indexed * 1000:>9.2f} {len(found):>11}   e.g. {sorted(words)[:3]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Infinite scrolling of the item table under the offscreen Qt platform: frame times while
+scrolling down a large result chunk by chunk, how much of each newly fetched chunk was
+already formatted by the prefetch, and the size of the formatted-row cache.
+
+    python benchmarks/bench_infinite_scroll.py --rows 1000000 --chunk 500
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import standin
+from bench_table_render import make_rows
+from PyQt5.QtCore import QModelIndex
+from PyQt5.QtWidgets import QApplication, QTableView
+from modules.Catalog import Catalog
+from modules.ItemTableModel import ItemTableModel
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--chunk", type=int, default=500)
+    parser.add_argument("--steps", type=int, default=3000)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    catalog = Catalog.from_rows(make_rows(args.rows, random.Random(19)), False)
+    model = ItemTableModel()
+    view = QTableView()
+    view.setModel(model)
+    view.verticalHeader().setDefaultSectionSize(30)
+    view.resize(1400, 900)
+    view.show()
+
+    started = time.perf_counter()
+    model.set_items(catalog, 0, len(catalog), chunk=args.chunk)
+    app.processEvents()
+    first_paint = (time.perf_counter() - started) * 1000
+
+    def scrolled():
+        """BarcodeApp.handle_table_scrolled"""
+        first = max(0, view.rowAt(0))
+        last = view.rowAt(view.viewport().height() - 1)
+        if last < 0:
+            last = model.rowCount() - 1
+        model.set_visible(first, last)
+        if last >= model.rowCount() - model.chunk // 2 and model.canFetchMore(QModelIndex()):
+            fetches.append(model.count)
+            prefetched_rows.append(sum(1 for row in range(model.count, min(model.total, model.count + model.chunk)) if row in model.formatted))
+            model.fetchMore(QModelIndex())
+
+    fetches = []
+    prefetched_rows = []
+    bar = view.verticalScrollBar()
+    bar.valueChanged.connect(scrolled)
+    rows_per_step = view.viewport().height() // 30
+    frames = []
+    largest_cache = 0
+    for _ in range(args.steps):
+        started = time.perf_counter()
+        bar.setValue(bar.value() + rows_per_step)
+        view.viewport().repaint()
+        app.processEvents()  # Idle time: the prefetch timer runs here
+        frames.append((time.perf_counter() - started) * 1000)
+        largest_cache = max(largest_cache, len(model.formatted))
+
+    frames.sort()
+    print(f"{args.rows} rows, chunk {args.chunk}: first paint {first_paint:.1f} ms")
+    print(f"scrolled {args.steps} viewports to row {model.rowCount()}: {len(fetches)} fetches, "
+          f"{sum(prefetched_rows) / max(1, sum(min(args.chunk, model.total - count) for count in fetches)):.0%} of fetched rows already formatted")
+    print(f"frames: median {frames[len(frames) // 2]:.2f} ms, p95 {frames[int(len(frames) * 0.95)]:.2f} ms, worst {frames[-1]:.2f} ms")
+    print(f"formatted-row cache: largest {largest_cache} rows (limit {model.cache_limit}), now {len(model.formatted)}")
+
+
+if __name__ == "__main__":
+    main()
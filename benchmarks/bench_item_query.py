@@ -0,0 +1,107 @@
+"""
+Compare the prepared, parameterized catalog query with the old string-built one against the
+SQLite stand-in. Each round runs the item query once per location, the way reloads and
+location changes hit the server.
+
+    python benchmarks/bench_item_query.py --items 50000 --rounds 20
+"""
+import argparse
+import time
+
+import standin
+from modules.CatalogQueries import CatalogQueries
+
+
+def legacy_query(location):
+    """The item query as FetchItemsThread used to build it, with the location pasted into the text."""
+    return f"""
+    WITH BaseItems AS (
+        SELECT
+            u.ItemCode,
+            i.Description AS DescriptionWithUOM,
+            u.UOM,
+            u.Price AS DefaultUnitPrice,
+            u.Cost,
+            ISNULL(NULLIF(u.BarCode, ''), i.ItemCode) AS Barcode,
+            ISNULL(p.Location, 'HQ') AS Location,
+            ISNULL(p.Price, u.Price) AS PosUnitPrice
+        FROM dbo.ItemUOM u
+        LEFT JOIN dbo.Item i ON u.ItemCode = i.ItemCode
+        LEFT JOIN dbo.PosPricePlan p ON u.ItemCode = p.ItemCode AND p.Location = '{location}'
+    )
+    SELECT * FROM BaseItems;
+    """
+
+
+def run_legacy(connection, locations, fetch):
+    rows = 0
+    for location in locations:
+        cursor = connection.cursor()
+        cursor.execute(legacy_query(location))
+        rows += len(cursor.fetchmany(fetch) if fetch else cursor.fetchall())
+        cursor.close()
+    return rows
+
+
+def run_prepared(queries, locations, fetch):
+    rows = 0
+    for location in locations:
+        cursor = queries.items(location)
+        rows += len(cursor.fetchmany(fetch) if fetch else cursor.fetchall())
+    return rows
+
+
+def timed(function, rounds):
+    """First (cold cache) and best (warm) round time."""
+    times = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+    return times[0], min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=50000)
+    parser.add_argument("--locations", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--fetch", type=int, default=100,
+                        help="rows fetched per execution (the first page); 0 fetches everything")
+    args = parser.parse_args()
+
+    locations = [f"L{n:03d}" for n in range(args.locations)]
+    connection = standin.connect()
+    rows = standin.populate(connection, args.items, locations=locations[:4])
+    print(f"Stand-in catalog: {args.items} items, {rows} ItemUOM rows, {len(locations)} locations")
+
+    queries = CatalogQueries(connection)
+    hidden_cost = CatalogQueries(connection, hide_cost=True)
+
+    legacy = timed(lambda: run_legacy(connection, locations, args.fetch), args.rounds)
+    prepared = timed(lambda: run_prepared(queries, locations, args.fetch), args.rounds)
+    projected = timed(lambda: run_prepared(hidden_cost, locations, args.fetch), args.rounds)
+
+    per_query = 1000 / len(locations)
+    print(f"{'path':<28} {'cold ms/query':>13} {'warm ms/query':>13}")
+    for name, (cold, warm) in (
+        ("string-built", legacy),
+        ("prepared", prepared),
+        ("prepared, Cost projected out", projected),
+    ):
+        print(f"{name:<28} {cold * per_query:>13.3f} {warm * per_query:>13.3f}")
+    print(f"Prepared path: {1 - prepared[0] / legacy[0]:.1%} faster cold, {1 - prepared[1] / legacy[1]:.1%} warm, "
+          f"{len(queries.cursors)} statement(s) prepared for {len(locations)} locations")
+
+    # A quote in the location breaks the string-built text (or injects into it) but is plain data when bound
+    tricky = "ST. JOHN'S"
+    try:
+        run_legacy(connection, [tricky], 0)
+        print("String-built query accepted a quoted location")
+    except Exception as e:
+        print(f"String-built query failed on a quoted location: {e}")
+    print(f"Prepared query with quoted location returned {run_prepared(queries, [tricky], 0)} rows without error")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Label rendering: the per-label regex substitution print_barcode used against a template
+compiled once into segments and slots, for the default TSPL and ZPL templates.
+
+    python benchmarks/bench_label_template.py --labels 100000
+"""
+import argparse
+import random
+import re
+import time
+
+import standin
+from modules.LabelTemplate import CompiledTemplate, TemplateCache
+
+TEMPLATES = {
+    "tspl": (
+        "SPEED 2.0 \nDENSITY 7 \nDIRECTION 0 \nSIZE 35MM,25MM \nOFFSET 0.000 \nREFERENCE 0,0 \nCLS \n"
+        "TEXT 320,5,\"2\",0,1,1,\"{{companyName}}\" \nTEXT 310,40,\"2\",0,1,1,\"{{barcode_value}}\" \n"
+        "BLOCK 310,120,\"0\",0,1,1,\"{{description}}\" \nBARCODE 310,60,\"128\",50,0,0,2,10,\"{{barcode_value}}\" \n"
+        "TEXT 310,160,\"4\",0,1,1,\"{{unit_price_integer}}\" \nPRINT {{copies}} \nEOP"
+    ),
+    "zpl fun bake": (
+        "^XA\n^FO0,20^FB600,1,0,C,0^A0N,20,20^FDnama produk / product name^FS\n"
+        "^FO0,50^FB600,1,0,C,0^A0N,30,30^FD{{description}}^FS\n^FO10,95^GB580,2,2^FS\n^FO10,95^GB2,145,2^FS\n"
+        "^FO25,115^A0N,20,20^FDkod produk / product code^FS\n^FO25,140^BY2,3,50^BCN,50,N,N,N^FD{{barcode_value}}^FS\n"
+        "^FO25,200^A0N,20,20^FD{{barcode_value}}^FS\n^FO400,95^GB2,145,2^FS\n^FO415,115^A0N,20,20^FDharga / price^FS\n"
+        "^FO415,160^A0N,30,30^FDRM {{unit_price_integer}}^FS\n^FO590,95^GB2,145,2^FS\n^FO10,240^GB580,2,2^FS\n"
+        "^FO25,260^A0N,20,20^FDexpire date^FS\n^FO25,290^A0N,30,30^FD{{remark}}^FS\n^PQ{{copies}}\n^XZ"
+    ),
+}
+
+
+def legacy_render(template, values):
+    """replace_placeholders before the compiled templates."""
+    def replace(match):
+        key = match.group(1)
+        if key not in values:
+            return f"{{{{{key}}}}}"
+        return str(values[key])
+    return re.sub(r'{{(.*?)}}', replace, template)
+
+
+def make_values(count, rng):
+    return [
+        {
+            "companyName": "ACME MART",
+            "description": " ".join(rng.choice(standin.WORDS) for _ in range(4)),
+            "description_1": "",
+            "description_2": "",
+            "remark": "",
+            "barcode_value": f"955{n:010d}",
+            "unit_price_integer": f"RM {rng.randrange(50, 50000) / 100:.2f}",
+            "copies": "1",
+        }
+        for n in range(count)
+    ]
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--labels", type=int, default=100000)
+    args = parser.parse_args()
+
+    values = make_values(args.labels, random.Random(23))
+    print(f"{args.labels} labels")
+    print(f"{'template':<13} {'regex ms':>9} {'compiled ms':>12} {'speedup':>8} {'labels/s':>10}")
+    for name, text in TEMPLATES.items():
+        template = CompiledTemplate(text)
+        legacy, expected = timed(lambda: [legacy_render(text, row) for row in values])
+        compiled, rendered = timed(lambda: [template.render(row) for row in values])
+        assert rendered == expected
+        print(f"{name:<13} {legacy * 1000:>9.0f} {compiled * 1000:>12.0f} {legacy / compiled:>7.1f}x "
+              f"{args.labels / compiled:>10.0f}")
+
+    cache = TemplateCache()
+    compile_seconds, _ = timed(lambda: cache.get(TEMPLATES["tspl"]))
+    hit_seconds, _ = timed(lambda: cache.get(TEMPLATES["tspl"]))
+    print(f"compile {compile_seconds * 1e6:.0f} us, cached {hit_seconds * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Building print jobs without Qt: labels of selected catalog rows from the PrintJob
+generator against the whole payload built up front from formatted row tuples, like the
+table-cell loop did. Reports labels per second and the peak memory of each.
+
+    python benchmarks/bench_print_job.py --labels 1000 50000
+"""
+import argparse
+import random
+import re
+import time
+import tracemalloc
+
+import standin
+from modules.Catalog import Catalog, format_price
+from modules.CatalogSelection import Selection
+from modules.PrintJob import LabelFormat, PrintJob, split_description
+
+TEMPLATE = (
+    "SPEED 2.0 \nDENSITY 7 \nDIRECTION 0 \nSIZE 35MM,25MM \nOFFSET 0.000 \nREFERENCE 0,0 \nCLS \n"
+    "TEXT 320,5,\"2\",0,1,1,\"{{companyName}}\" \nTEXT 310,40,\"2\",0,1,1,\"{{barcode_value}}\" \n"
+    "BLOCK 310,120,\"0\",0,1,1,\"{{description}}\" \nBARCODE 310,60,\"128\",50,0,0,2,10,\"{{barcode_value}}\" \n"
+    "TEXT 310,160,\"4\",0,1,1,\"{{unit_price_integer}}\" \nPRINT {{copies}} \nEOP"
+)
+
+
+def make_rows(count, rng):
+    return [
+        (f"IT{n // 2:07d}", " ".join(rng.choice(standin.WORDS) for _ in range(4)), standin.UOMS[n % 2],
+         rng.randrange(50, 50000) / 100, 0.5, f"955{n:010d}", "HQ", rng.randrange(50, 50000) / 100)
+        for n in range(count)
+    ]
+
+
+def replace_placeholders(template, values):
+    """The regex substitution print_barcode used per label."""
+    def replace(match):
+        key = match.group(1)
+        return str(values[key]) if key in values else match.group(0)
+    return re.sub(r'{{(.*?)}}', replace, template)
+
+
+def legacy_payload(catalog, selection, label_format):
+    """The old loop: every label from the displayed strings, the whole job held as a list."""
+    payload = []
+    for row_id in selection:
+        _, description, _, _, _, barcode_value, _, location_price = catalog.row(row_id)
+        description = str(description).replace('"', '')
+        description_1, description_2 = split_description(description)
+        payload.append(replace_placeholders(label_format.template.template, {
+            "companyName": label_format.company_name,
+            "description": description,
+            "description_1": description_1,
+            "description_2": description_2,
+            "remark": label_format.remark,
+            "barcode_value": str(barcode_value),
+            "unit_price_integer": format_price(location_price),
+            "copies": str(selection.copies_of(row_id)),
+        }) + label_format.suffix)
+    return payload
+
+
+def streamed(job):
+    """Consume the labels one at a time, as a printer connection would."""
+    sent = 0
+    for label in job.labels():
+        sent += len(label.data)
+    return sent
+
+
+def measure(function):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=200000)
+    parser.add_argument("--labels", type=int, nargs="+", default=[1000, 50000])
+    args = parser.parse_args()
+
+    rng = random.Random(22)
+    catalog = Catalog.from_rows(make_rows(args.size, rng), False)
+    label_format = LabelFormat(TEMPLATE, "CLS", "ACME MART", "")
+
+    print(f"{'labels':>7} {'list labels/s':>14} {'list peak MB':>13} {'stream labels/s':>16} {'stream peak MB':>15}")
+    for count in args.labels:
+        selection = Selection()
+        selection.update(rng.sample(range(args.size), count))
+        for row_id in list(selection)[::7]:
+            selection.set_copies(row_id, 3)
+        job = PrintJob(catalog, selection, label_format, selection.copies)
+
+        assert [label.data for label in job.labels()] == legacy_payload(catalog, selection, label_format)
+        list_seconds, list_peak, payload = measure(lambda: legacy_payload(catalog, selection, label_format))
+        del payload
+        stream_seconds, stream_peak, _ = measure(lambda: streamed(job))
+        print(f"{count:>7} {count / list_seconds:>14.0f} {list_peak / 2 ** 20:>13.1f} "
+              f"{count / stream_seconds:>16.0f} {stream_peak / 2 ** 20:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
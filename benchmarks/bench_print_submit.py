@@ -0,0 +1,178 @@
+"""
+Print submission against a local fake network printer (a TCP server on port 9100, or a
+free port when 9100 is taken): per-label sending as send_wireless_command did it (ping,
+probe connect, then a connect for the clear command and another for the label) against
+one batched stream per job over a single connection.
+
+`ping` is run only when the system has it; without it the per-label numbers leave out
+the two ping processes per label and the difference is understated.
+
+    python benchmarks/bench_print_submit.py --labels 100 500 5000
+"""
+import argparse
+import os
+import random
+import shutil
+import socket
+import subprocess
+import threading
+import time
+
+import standin
+from modules.Catalog import Catalog
+from modules.CatalogSelection import Selection
+from modules.PrintJob import LabelFormat, PrintJob
+from modules.PrintStream import stream_chunks
+
+TEMPLATE = (
+    "SPEED 2.0 \nDENSITY 7 \nDIRECTION 0 \nSIZE 35MM,25MM \nOFFSET 0.000 \nREFERENCE 0,0 \nCLS \n"
+    "TEXT 320,5,\"2\",0,1,1,\"{{companyName}}\" \nTEXT 310,40,\"2\",0,1,1,\"{{barcode_value}}\" \n"
+    "BLOCK 310,120,\"0\",0,1,1,\"{{description}}\" \nBARCODE 310,60,\"128\",50,0,0,2,10,\"{{barcode_value}}\" \n"
+    "TEXT 310,160,\"4\",0,1,1,\"{{unit_price_integer}}\" \nPRINT {{copies}} \nEOP"
+)
+
+
+class FakePrinter:
+    """Accepts connections and swallows what is sent, counting connections and bytes."""
+
+    def __init__(self, port=9100):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            self.server.bind(("127.0.0.1", port))
+        except OSError:
+            self.server.bind(("127.0.0.1", 0))
+        self.server.listen(128)
+        self.port = self.server.getsockname()[1]
+        self.connections = 0
+        self.received = 0
+        self.open = []
+        self.lock = threading.Lock()
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    def serve(self):
+        while True:
+            try:
+                connection, _ = self.server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.drain, args=(connection,), daemon=True).start()
+
+    def drain(self, connection):
+        with connection:
+            with self.lock:
+                self.connections += 1
+                self.open.append(connection)
+            while True:
+                try:
+                    data = connection.recv(65536)
+                except OSError:
+                    data = b""
+                if not data:
+                    with self.lock:
+                        if connection in self.open:
+                            self.open.remove(connection)
+                    return
+                with self.lock:
+                    self.received += len(data)
+
+    def wait_for(self, received, timeout=10):
+        deadline = time.perf_counter() + timeout
+        while self.received < received and time.perf_counter() < deadline:
+            time.sleep(0.001)
+
+    def drop(self):
+        """Close every open connection from the printer side, like a printer restart."""
+        with self.lock:
+            connections = self.open
+            self.open = []
+        for connection in connections:
+            connection.shutdown(socket.SHUT_RDWR)
+
+    def reset(self):
+        with self.lock:
+            self.connections = 0
+            self.received = 0
+
+
+def legacy_send(ip_address, port, command, ping):
+    """send_wireless_command without its message boxes."""
+    socket.inet_aton(ip_address)
+    if ping:
+        ping_command = ["ping", "-n", "1", ip_address] if os.name == "nt" else ["ping", "-c", "1", ip_address]
+        subprocess.run(ping_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.settimeout(3)
+        sock.connect_ex((ip_address, int(port)))
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as client_socket:
+        client_socket.connect((ip_address, int(port)))
+        client_socket.sendall(command.encode('utf-8'))
+
+
+def send_stream(ip_address, port, chunks, timeout=3):
+    """One new connection per job, all chunks sent over it; returns the bytes sent."""
+    sent = 0
+    with socket.create_connection((ip_address, int(port)), timeout=timeout) as client_socket:
+        for chunk in chunks:
+            client_socket.sendall(chunk)
+            sent += len(chunk)
+    return sent
+
+
+def make_rows(count, rng):
+    return [
+        (f"IT{n // 2:07d}", " ".join(rng.choice(standin.WORDS) for _ in range(4)), standin.UOMS[n % 2],
+         rng.randrange(50, 50000) / 100, 0.5, f"955{n:010d}", "HQ", rng.randrange(50, 50000) / 100)
+        for n in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--labels", type=int, nargs="+", default=[100, 500, 5000])
+    parser.add_argument("--legacy-limit", type=int, default=500, help="Largest job sent label by label")
+    args = parser.parse_args()
+
+    ping = shutil.which("ping") is not None
+    printer = FakePrinter()
+    catalog = Catalog.from_rows(make_rows(max(args.labels), random.Random(24)), False)
+    label_format = LabelFormat(TEMPLATE, "CLS", "ACME MART")
+    print(f"fake printer on 127.0.0.1:{printer.port}, ping {'included' if ping else 'not available, left out'}")
+    print(f"{'labels':>7} {'per-label/s':>12} {'connects':>9} {'batched/s':>10} {'connects':>9} {'speedup':>8}")
+
+    for count in args.labels:
+        selection = Selection()
+        selection.update(range(count))
+        job = PrintJob(catalog, selection, label_format, selection.copies)
+
+        legacy_rate = None
+        legacy_connects = 0
+        if count <= args.legacy_limit:
+            printer.reset()
+            started = time.perf_counter()
+            expected = 0
+            for label in job.labels():
+                legacy_send("127.0.0.1", printer.port, label_format.clear, ping)
+                legacy_send("127.0.0.1", printer.port, label.data, ping)
+                expected += len(label_format.clear) + len(label.data.encode('utf-8'))
+            printer.wait_for(expected)
+            legacy_rate = count / (time.perf_counter() - started)
+            legacy_connects = printer.connections
+
+        printer.reset()
+        started = time.perf_counter()
+        sent = send_stream("127.0.0.1", printer.port,
+                           stream_chunks(label_format.clear, (label.data for label in job.labels())))
+        printer.wait_for(sent)
+        batched_rate = count / (time.perf_counter() - started)
+        assert printer.received == sent
+
+        if legacy_rate is None:
+            print(f"{count:>7} {'-':>12} {'-':>9} {batched_rate:>10.0f} {printer.connections:>9} {'-':>8}")
+        else:
+            print(f"{count:>7} {legacy_rate:>12.0f} {legacy_connects:>9} {batched_rate:>10.0f} "
+                  f"{printer.connections:>9} {batched_rate / legacy_rate:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
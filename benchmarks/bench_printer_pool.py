@@ -0,0 +1,84 @@
+"""
+Time to the first label on a network printer: the old send_wireless_command (ping, probe
+connect, connect per command), a new connection per job, and the persistent PrinterPool
+connection once warm. Also checks that the pool reconnects transparently after the
+printer drops the connection.
+
+    python benchmarks/bench_printer_pool.py --trials 200
+"""
+import argparse
+import shutil
+import statistics
+import subprocess
+import time
+
+from bench_print_submit import FakePrinter, TEMPLATE, legacy_send, send_stream
+from modules.PrinterPool import PrinterPool
+from modules.PrintStream import stream_chunks
+
+LABEL = TEMPLATE.replace("{{companyName}}", "ACME MART").replace("{{barcode_value}}", "9551234567890") \
+    .replace("{{description}}", "MILO FULL CREAM").replace("{{unit_price_integer}}", "RM 12.50").replace("{{copies}}", "1")
+
+
+def median_ms(function, trials):
+    times = []
+    for _ in range(trials):
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trials", type=int, default=200)
+    args = parser.parse_args()
+
+    ping = shutil.which("ping") is not None
+    printer = FakePrinter()
+    address = ("127.0.0.1", printer.port)
+    pool = PrinterPool()
+    connection = pool.connection(*address)
+
+    def legacy():
+        legacy_send(*address, "CLS", ping)
+        legacy_send(*address, LABEL, ping)
+
+    def per_job():
+        send_stream(*address, stream_chunks("CLS", [LABEL]))
+
+    def pooled():
+        if connection.reachable():
+            connection.send(stream_chunks("CLS", [LABEL]))
+
+    print(f"fake printer on 127.0.0.1:{printer.port}, ping {'included' if ping else 'not available, left out'}")
+    results = [
+        ("old: ping + probe + connect per command", median_ms(legacy, args.trials)),
+        ("new connection per job", median_ms(per_job, args.trials)),
+    ]
+    pooled()  # Warm up: opens the connection
+    warm_connects = connection.connects
+    results.append(("pooled, warm connection", median_ms(pooled, args.trials)))
+    pooled_connects = connection.connects - warm_connects
+    for name, milliseconds in results:
+        print(f"{name:<42} {milliseconds:>8.3f} ms to first label")
+    print(f"pooled connects during {args.trials} jobs: {pooled_connects}")
+    if not ping and shutil.which("true"):
+        # Lower bound of what each of the two pings per label cost, before any network round trip
+        spawn = median_ms(lambda: subprocess.run(["true"], stdout=subprocess.PIPE, stderr=subprocess.PIPE), 50)
+        print(f"{'one process spawn (least a ping costs)':<42} {spawn:>8.3f} ms")
+
+    # The printer restarts: the next job notices the closed connection and reconnects
+    time.sleep(0.2)  # Let the fake printer finish accepting the connections of the old runs
+    printer.drop()
+    time.sleep(0.05)
+    printer.reset()
+    sent = connection.send(stream_chunks("CLS", [LABEL]))
+    printer.wait_for(sent)
+    assert printer.received == sent and printer.connections == 1
+    print(f"reconnected after a printer-side close: {connection.connects} connects in total")
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
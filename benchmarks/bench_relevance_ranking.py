@@ -0,0 +1,54 @@
+"""
+Relevance ranking of description search results: fully sorting every match against the
+bounded-heap top page of Catalog.rank, and the cost of reading a later page lazily.
+
+    python benchmarks/bench_relevance_ranking.py --sizes 100000 1000000
+"""
+import argparse
+import random
+import time
+
+import standin
+from bench_description_search import make_rows
+from modules.Catalog import Catalog
+
+QUERIES = ["milo", "cream", "choc", "full cream milk", "ea", "soy sauce"]
+PAGE = 100
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return (time.perf_counter() - started) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    args = parser.parse_args()
+
+    print(f"{'items':>9} {'query':<16} {'matches':>8} {'search ms':>10} {'full sort ms':>13} {'top page ms':>12} {'page 2 ms':>10}")
+    for size in args.sizes:
+        rng = random.Random(7)
+        catalog = Catalog.from_rows(make_rows(size, rng), False)
+        popularity = {catalog.barcodes[rng.randrange(size)]: rng.randint(1, 50) for _ in range(1000)}
+        for query in QUERIES:
+            keywords = query.split()
+            search_time, row_ids = timed(lambda: catalog.search_descriptions(keywords))
+
+            def full_sort():
+                ranked = catalog.rank(row_ids, keywords, 0, popularity)
+                return ranked.row_ids
+            sort_time, everything = timed(full_sort)
+            top_time, ranked = timed(lambda: catalog.rank(row_ids, keywords, PAGE, popularity)[:PAGE])
+            view = catalog.rank(row_ids, keywords, PAGE, popularity)
+            view[:PAGE]
+            page_time, _ = timed(lambda: view[PAGE:2 * PAGE])
+
+            assert ranked == [catalog.row(row_id) for row_id in everything[:PAGE]]
+            assert view[PAGE:2 * PAGE] == [catalog.row(row_id) for row_id in everything[PAGE:2 * PAGE]]
+            print(f"{size:>9} {query:<16} {len(row_ids):>8} {search_time:>10.2f} {sort_time:>13.2f} {top_time:>12.2f} {page_time:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Search-as-you-type with and without the refinement cache: every prefix of each query is
+searched as if typed one key at a time, the way the debounced search bar sees it.
+
+    python benchmarks/bench_search_cache.py --items 300000
+"""
+import argparse
+import random
+import time
+
+from bench_description_search import make_rows
+from modules.Catalog import Catalog
+from modules.CatalogSearch import SearchCache
+
+DESCRIPTIONS = ["chocolate", "cream cracker", "soy sauce", "orange juice", "full cream milk"]
+
+
+def keystrokes(text):
+    return [text[:length].strip() for length in range(1, len(text) + 1) if text[:length].strip()]
+
+
+def description_search(catalog, cache, query):
+    if cache is None:
+        return catalog.search_descriptions(query.split())
+    return cache.lookup(
+        catalog, "description", query,
+        lambda text: catalog.search_descriptions(text.split()),
+        lambda cached, text: catalog.narrow_descriptions(cached, text.split()),
+    )
+
+
+def prefix_search(catalog, cache, query):
+    if cache is None:
+        return catalog.prefix_ids(query)
+    return cache.lookup(
+        catalog, "prefix", query,
+        lambda text: catalog.prefix_ids(text),
+        lambda cached, text: catalog.narrow_prefix(cached, text),
+    )
+
+
+def session(catalog, cache, typed):
+    started = time.perf_counter()
+    results = []
+    for search, query in typed:
+        results.append(list(search(catalog, cache, query)))
+    return time.perf_counter() - started, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=300000)
+    args = parser.parse_args()
+
+    rng = random.Random(9)
+    rows = make_rows(args.items, rng)
+    catalog = Catalog.from_rows(rows, False)
+    codes = [rng.choice(rows)[5] for _ in range(5)]
+
+    typed = [(description_search, query) for text in DESCRIPTIONS for query in keystrokes(text)]
+    typed += [(prefix_search, query) for code in codes for query in keystrokes(code)]
+    # The user deletes back and retypes part of the first search: exact hits
+    typed += [(description_search, query) for query in keystrokes(DESCRIPTIONS[0])[-4:]]
+
+    plain, expected = session(catalog, None, typed)
+    cache = SearchCache(report_every=10 ** 9)
+    cached, found = session(catalog, cache, typed)
+    assert found == expected, "cached results differ from fresh searches"
+
+    print(f"{args.items} items, {len(typed)} keystrokes")
+    print(f"without cache: {plain * 1000 / len(typed):.2f} ms per keystroke")
+    print(f"with cache:    {cached * 1000 / len(typed):.2f} ms per keystroke ({1 - cached / plain:.0%} saved)")
+    print(cache.summary())
+
+
+if __name__ == "__main__":
+    main()
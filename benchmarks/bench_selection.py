@@ -0,0 +1,92 @@
+"""
+Cross-page selection: selecting every row of a search result and walking the selection
+for printing, with the Selection flags against a set of row ids sorted before printing.
+Also checks that a selection follows row ids through Catalog.remove and a reload.
+
+    python benchmarks/bench_selection.py --size 1000000 --results 2000 100000 1000000
+"""
+import argparse
+import random
+import sys
+import time
+
+import standin
+from modules.Catalog import Catalog
+from modules.CatalogSelection import Selection
+
+
+def make_rows(count, rng):
+    return [
+        (f"IT{n // 2:07d}", " ".join(rng.choice(standin.WORDS) for _ in range(4)), standin.UOMS[n % 2],
+         rng.randrange(50, 50000) / 100, 0.5, f"955{n:010d}", "HQ", rng.randrange(50, 50000) / 100)
+        for n in range(count)
+    ]
+
+
+def timed(function, repeat=5):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=1000000)
+    parser.add_argument("--results", type=int, nargs="+", default=[2000, 100000, 1000000])
+    args = parser.parse_args()
+
+    rng = random.Random(21)
+    catalog = Catalog.from_rows(make_rows(args.size, rng), False)
+    print(f"{args.size} items")
+    print(f"{'selected':>9} {'set add ms':>11} {'flags add ms':>13} {'grown add ms':>13} {'set walk ms':>12} "
+          f"{'flags walk ms':>14} {'set KB':>8} {'flags KB':>9}")
+    for count in args.results:
+        row_ids = sorted(rng.sample(range(args.size), count))
+
+        def fill_set():
+            selected = set()
+            selected.update(row_ids)
+            return selected
+
+        def fill_flags():
+            selection = Selection()
+            selection.update(row_ids)
+            return selection
+
+        def fill_grown():
+            # Flags already as long as the catalog: the count must not scan all of them
+            selection = Selection()
+            selection.add(args.size - 1)
+            started = time.perf_counter()
+            selection.update(row_ids)
+            return time.perf_counter() - started, selection
+
+        set_add, selected = timed(fill_set)
+        flags_add, selection = timed(fill_flags)
+        grown_add = min(fill_grown()[0] for _ in range(5)) * 1000
+        set_walk, walked = timed(lambda: sorted(selected))
+        flags_walk, flags_walked = timed(lambda: list(selection))
+        assert walked == flags_walked == row_ids and len(selection) == count
+        print(f"{count:>9} {set_add:>11.2f} {flags_add:>13.2f} {grown_add:>13.2f} {set_walk:>12.2f} {flags_walk:>14.2f} "
+              f"{sys.getsizeof(selected) / 1024:>8.0f} {sys.getsizeof(selection.flags) / 1024:>9.0f}")
+
+    # The selection follows its rows when other rows are removed or the catalog is reloaded
+    catalog.selection.update([0, 5, 9, args.size - 1])
+    catalog.selection.set_copies(9, 3)
+    barcodes = [catalog.barcodes[row_id] for row_id in catalog.selection]
+    catalog.remove([1, 2, 6])
+    assert [catalog.barcodes[row_id] for row_id in catalog.selection] == barcodes
+    assert catalog.selection.copies_of(6) == 3  # Row 9 moved down by three
+    reloaded = Catalog.from_rows(make_rows(args.size, random.Random(21)), False)
+    assert reloaded.carry_selection(catalog) == 4
+    assert sorted(reloaded.barcodes[row_id] for row_id in reloaded.selection) == sorted(barcodes)
+    assert reloaded.selection.copies_of(9) == 3
+    print("selection survives remove and reload")
+
+
+if __name__ == "__main__":
+    main()
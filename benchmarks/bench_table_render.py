@@ -0,0 +1,125 @@
+"""
+Rendering the item table under the offscreen Qt platform: the old QTableWidget fill (ten
+QTableWidgetItems per row, a BarcodeConfig per call, column widths re-read) against the
+ItemTableModel behind a QTableView, and scrolling through 100k rows of the model.
+
+    python benchmarks/bench_table_render.py --rows 100 1000 10000 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import standin
+from PyQt5.QtCore import QSettings, Qt
+from PyQt5.QtGui import QBrush, QColor
+from PyQt5.QtWidgets import QApplication, QTableView, QTableWidget, QTableWidgetItem
+from modules.Catalog import Catalog
+from modules.Configurations import BarcodeConfig
+from modules.ItemTableModel import HEADERS, ItemTableModel
+
+LEGACY_LIMIT = 10000  # The widget fill takes minutes beyond this
+
+
+def make_rows(count, rng):
+    return [
+        (f"IT{n // 2:07d}", " ".join(rng.choice(standin.WORDS) for _ in range(4)), standin.UOMS[n % 2],
+         rng.randrange(50, 50000) / 100, 0.5, f"955{n:010d}", "HQ", rng.randrange(50, 50000) / 100)
+        for n in range(count)
+    ]
+
+
+def legacy_fill(table, items, settings):
+    """display_items before the model, for one page of `items`."""
+    table.setRowCount(len(items))
+    barcode_config = BarcodeConfig()
+    for row_number, item in enumerate(items):
+        checkbox_item = QTableWidgetItem()
+        checkbox_item.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
+        checkbox_item.setCheckState(Qt.Unchecked)
+        table.setItem(row_number, 0, checkbox_item)
+        table.item(row_number, 0).setTextAlignment(Qt.AlignLeft)
+        item_code, description, uom, unit_price, unit_cost, barcode_value, location, location_price = item
+        formatted_unit_price = f"RM {float(unit_price):.2f}" if unit_price is not None else "RM 0.00"
+        formatted_unit_cost = "RM 0.00"
+        if not barcode_config.get_hide_cost():
+            formatted_unit_cost = f"RM {float(unit_cost):.2f}" if unit_cost is not None else "RM 0.00"
+        formatted_location_price = f"RM {float(location_price):.2f}" if location_price is not None else "RM 0.00"
+        for col_number, value in enumerate([item_code, description, uom, formatted_unit_price, formatted_unit_cost,
+                                            barcode_value, location, formatted_location_price], start=1):
+            table_item = QTableWidgetItem(str(value))
+            table_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+            table_item.setTextAlignment(Qt.AlignCenter)
+            table.setItem(row_number, col_number, table_item)
+        copies_item = QTableWidgetItem("1")
+        copies_item.setFlags(Qt.ItemIsEditable | Qt.ItemIsEnabled)
+        copies_item.setTextAlignment(Qt.AlignCenter)
+        table.setItem(row_number, 9, copies_item)
+        if row_number % 2 == 0:
+            for col_number in range(table.columnCount()):
+                table.item(row_number, col_number).setBackground(QBrush(QColor(230, 238, 255)))
+    for i in range(table.columnCount()):
+        width = settings.value(f"column_width_{i}", type=int)
+        if width:
+            table.setColumnWidth(i, width)
+
+
+def timed(function):
+    started = time.perf_counter()
+    function()
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--scroll-steps", type=int, default=200)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    settings = QSettings("BarcodePrinterBenchmark", "TableRender")
+    catalog = Catalog.from_rows(make_rows(max(args.rows), random.Random(17)), False)
+
+    widget = QTableWidget()
+    widget.setColumnCount(len(HEADERS))
+    widget.setHorizontalHeaderLabels(HEADERS)
+    widget.resize(1400, 900)
+    widget.show()
+
+    model = ItemTableModel()
+    view = QTableView()
+    view.setModel(model)
+    view.verticalHeader().setDefaultSectionSize(30)
+    view.resize(1400, 900)
+    view.show()
+    app.processEvents()
+
+    print(f"{'rows':>7} {'widget fill+paint ms':>21} {'model reset+paint ms':>21} {'speedup':>8}")
+    for count in args.rows:
+        legacy = None
+        if count <= LEGACY_LIMIT:
+            legacy = timed(lambda: (legacy_fill(widget, catalog[:count], settings), widget.viewport().repaint()))
+        modeled = timed(lambda: (model.set_items(catalog, 0, count), view.viewport().repaint()))
+        print(f"{count:>7} {legacy if legacy is not None else float('nan'):>21.1f} {modeled:>21.1f} "
+              f"{legacy / modeled if legacy is not None else float('nan'):>7.0f}x")
+
+    # Smooth scrolling: one viewport of rows per step across the largest table
+    count = max(args.rows)
+    model.set_items(catalog, 0, count)
+    bar = view.verticalScrollBar()
+    app.processEvents()
+    frames = []
+    for step in range(args.scroll_steps):
+        bar.setValue(bar.maximum() * step // args.scroll_steps)
+        frames.append(timed(view.viewport().repaint))
+    frames.sort()
+    print(f"\nscrolling {count} rows: {len(frames)} frames, median {frames[len(frames) // 2]:.2f} ms, "
+          f"p95 {frames[int(len(frames) * 0.95)]:.2f} ms, worst {frames[-1]:.2f} ms; "
+          f"{len(model.formatted)} rows formatted")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+"Get UOM" latency: the old scans of every row against the item code groups of the Catalog.
+
+    python benchmarks/bench_uom_lookup.py --sizes 100000 1000000
+"""
+import argparse
+import random
+import time
+
+import standin
+from modules.Catalog import Catalog
+
+
+def make_rows(count, rng):
+    """Two or three UOM rows per item code, like ItemUOM."""
+    rows = []
+    item = 0
+    while len(rows) < count:
+        for uom in standin.UOMS[:rng.choice((2, 3))]:
+            rows.append((f"IT{item:07d}", " ".join(rng.choice(standin.WORDS) for _ in range(3)), uom,
+                         1.0, 0.5, f"955{rng.randrange(10 ** 10):010d}", "HQ", 1.0))
+        item += 1
+    return rows[:count]
+
+
+def legacy_uom(catalog, keywords, use_sqlite):
+    """filter_items(isUOM=True) before the groups: one or two passes over every row."""
+    if use_sqlite:
+        barcodes = catalog.barcodes
+        row_ids = [row_id for row_id in catalog.order if all(keyword in str(barcodes[row_id]).lower() for keyword in keywords)]
+        if row_ids:
+            barcode = str(barcodes[row_ids[0]]).lower()
+            row_ids = [row_id for row_id in catalog.order if str(barcodes[row_id]).lower() == barcode]
+        return row_ids
+    item_codes = catalog.item_codes
+    return [row_id for row_id in catalog.order if all(keyword in str(item_codes[row_id]).lower() for keyword in keywords)]
+
+
+def timed(function, queries):
+    started = time.perf_counter()
+    results = [function(query) for query in queries]
+    return (time.perf_counter() - started) * 1000 / len(queries), results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--queries", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'items':>9} {'query':<12} {'legacy ms':>10} {'groups ms':>10} {'speedup':>8}")
+    for size in args.sizes:
+        rng = random.Random(5)
+        rows = make_rows(size, rng)
+        catalog = Catalog.from_rows(rows, False)
+        picks = [rng.choice(rows) for _ in range(args.queries)]
+        cases = [
+            ("item code", [[row[0].lower()] for row in picks], False),
+            ("barcode", [[row[5]] for row in picks], True),  # SQLite: the scanned barcode
+            ("code part", [[row[0][-5:].lower()] for row in picks], False),
+        ]
+        for name, queries, use_sqlite in cases:
+            legacy, expected = timed(lambda keywords: legacy_uom(catalog, keywords, use_sqlite), queries)
+            grouped, found = timed(lambda keywords: catalog.uom_search(keywords, not use_sqlite), queries)
+            assert [list(result) for result in expected] == [list(result) for result in found]
+            print(f"{size:>9} {name:<12} {legacy:>10.2f} {grouped:>10.3f} {legacy / grouped:>7.0f}x")
+
+        sibling = picks[0]
+        assert set(catalog.sibling_barcodes(sibling[0])) == {row[5] for row in rows if row[0] == sibling[0]}
+        assert [catalog.item_codes[row_id] for row_id in catalog.siblings(catalog.barcode_ids(sibling[5]))] == \
+            [sibling[0]] * len(catalog.item_rows(sibling[0]))
+
+
+if __name__ == "__main__":
+    main()
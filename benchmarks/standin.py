@@ -0,0 +1,106 @@
+"""
+Local SQLite stand-in for the SQL Server catalog schema used by the benchmarks.
+
+The tables live in an attached database called `dbo`, so the production queries
+(`dbo.ItemUOM`, `dbo.Item`, `dbo.PosPricePlan`) run unchanged. SQLite parses ISNULL as
+an operator, so cursors translate the T-SQL ISNULL() function to IFNULL().
+"""
+import os
+import random
+import re
+import sqlite3
+import sys
+
+# Make the repository root importable when a benchmark is run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+UOMS = ["UNIT", "PCS", "CTN", "BOX", "PACK"]
+WORDS = [
+    "MILO", "NESCAFE", "COCA", "COLA", "DARK", "CHOCOLATE", "BISCUIT", "CREAM", "CRACKER",
+    "MILK", "FULL", "CREAM", "SUGAR", "RICE", "FRAGRANT", "OIL", "PALM", "SOY", "SAUCE",
+    "NOODLE", "CURRY", "CHICKEN", "BEEF", "TEA", "GREEN", "ORANGE", "JUICE", "WATER",
+    "MINERAL", "SOAP", "SHAMPOO", "TOOTHPASTE", "BREAD", "BUTTER", "CHEESE", "EGG",
+]
+
+
+ISNULL_PATTERN = re.compile(r"\bISNULL\s*\(", re.IGNORECASE)
+
+
+def translate(sql):
+    return ISNULL_PATTERN.sub("IFNULL(", sql)
+
+
+class StandinCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        return super().execute(translate(sql), parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return super().executemany(translate(sql), seq_of_parameters)
+
+
+class StandinConnection(sqlite3.Connection):
+    def cursor(self, factory=StandinCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return super().execute(translate(sql), parameters)
+
+
+def connect(path=":memory:"):
+    connection = sqlite3.connect(path, check_same_thread=False, factory=StandinConnection)
+    connection.execute("ATTACH DATABASE ':memory:' AS dbo")
+    connection.executescript("""
+        CREATE TABLE dbo.Item (
+            ItemCode TEXT PRIMARY KEY,
+            Description TEXT,
+            LastModified INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE dbo.ItemUOM (
+            ItemCode TEXT NOT NULL,
+            UOM TEXT NOT NULL,
+            Price NUMERIC,
+            Cost NUMERIC,
+            BarCode TEXT,
+            LastModified INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (ItemCode, UOM)
+        );
+        CREATE TABLE dbo.PosPricePlan (
+            ItemCode TEXT NOT NULL,
+            Location TEXT NOT NULL,
+            Price NUMERIC,
+            LastModified INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX dbo.IX_ItemUOM_LastModified ON ItemUOM (LastModified);
+        CREATE INDEX dbo.IX_Item_LastModified ON Item (LastModified);
+        CREATE INDEX dbo.IX_PosPricePlan_Item ON PosPricePlan (ItemCode, Location);
+        CREATE INDEX dbo.IX_PosPricePlan_LastModified ON PosPricePlan (LastModified);
+    """)
+    return connection
+
+
+def description(rng):
+    return " ".join(rng.sample(WORDS, rng.randint(2, 4))) + f" {rng.randint(1, 999)}G"
+
+
+def populate(connection, item_count, uoms_per_item=2, price_plan_ratio=0.3, locations=("HQ", "KL"), seed=42):
+    """Fill the stand-in with `item_count` items, each with `uoms_per_item` UOM rows."""
+    rng = random.Random(seed)
+    items = []
+    item_uoms = []
+    price_plans = []
+    for n in range(item_count):
+        item_code = f"IT{n:07d}"
+        items.append((item_code, description(rng), 1))
+        for uom in UOMS[:uoms_per_item]:
+            price = round(rng.uniform(0.5, 200), 2)
+            barcode = "" if rng.random() < 0.05 else f"955{rng.randrange(10**9, 10**10)}"
+            item_uoms.append((item_code, uom, price, round(price * 0.7, 2), barcode, 1))
+        if rng.random() < price_plan_ratio:
+            for location in locations:
+                price_plans.append((item_code, location, round(rng.uniform(0.5, 200), 2), 1))
+
+    connection.executemany("INSERT INTO dbo.Item VALUES (?, ?, ?)", items)
+    connection.executemany("INSERT INTO dbo.ItemUOM VALUES (?, ?, ?, ?, ?, ?)", item_uoms)
+    connection.executemany("INSERT INTO dbo.PosPricePlan VALUES (?, ?, ?, ?)", price_plans)
+    connection.commit()
+    return len(item_uoms)
@@ -9,8 +9,9 @@ import json
 import usb
 import os
 import socket
-import pyodbc
 from modules.logger_config import setup_logger 
+from modules.Configurations import BarcodeConfig
+from modules.ConnectionPool import CHECK_TIMEOUT, get_pool
 from version import __version__
 
 class DashboardWindow(QMainWindow):
@@ -153,41 +154,25 @@ class DashboardWindow(QMainWindow):
             self.lbl_resultConnectivity.setText("❌")
 
     def can_connect_to_database(self):
-        try:
-            # Load configuration
-            with open(self.config_path, 'r') as f:
-                config = json.load(f)
-
-            # Prepare the connection string
-            connection_string = (
-                f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-                f"SERVER={config['server']};"
-                f"DATABASE={config['database']};"
-                f"UID={config['username']};"
-                f"PWD={config['password']};"
-            )
-
-            # Try to establish a connection to the database
-            with pyodbc.connect(connection_string, timeout=5) as connection:
-                # Connection successful
-                self.logger.info("Successfully connected to the database.")
-                self.lbl_resultDatabase.setText("✅️")
-
-        except FileNotFoundError:
-            self.logger.error(f"Configuration file not found at {self.config_path}")
-            QMessageBox.critical(self, 'Config Error', f'Configuration file not found at {self.config_path}')
-
-        except json.JSONDecodeError:
-            self.logger.error("Error parsing the configuration file.")
-            QMessageBox.critical(self, 'Config Error', 'Error parsing the configuration file.')
+        config = BarcodeConfig()
+        required = {"server": config.get_server(), "database": config.get_database()}
+        if not config.get_trusted_connection():
+            required.update(username=config.get_username(), password=config.get_password())
+        missing = [key for key, value in required.items() if not str(value or "").strip()]
+        if missing:
+            self.logger.error(f"Missing database settings: {', '.join(missing)}")
+            QMessageBox.critical(self, 'Config Error', f"Missing database settings: {', '.join(missing)}")
+            self.lbl_resultDatabase.setText("❌")
+            return
 
-        except KeyError as e:
-            self.logger.error(f"Missing key in configuration file: {e}")
-            QMessageBox.critical(self, 'Config Error', f'Missing key in configuration file: {e}')
-            
-        except pyodbc.Error as e:
-            self.logger.error(f"Database connection failed: {e}")
-            print(f"Connection failed: {e}")
+        # Ping through the shared pool; a short login timeout, as the check runs on the UI thread
+        pool = get_pool(config)
+        if pool.ping(CHECK_TIMEOUT):
+            self.logger.info("Successfully connected to the database.")
+            self.lbl_resultDatabase.setText("✅️")
+        else:
+            self.logger.error(f"Database connection failed: {pool.last_error}")
+            print(f"Connection failed: {pool.last_error}")
             self.lbl_resultDatabase.setText("❌")
 
     def check_config_file(self):
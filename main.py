@@ -1,141 +1,229 @@
 import os
-import re
+import json
 import sys
+import threading
+import time
+from collections import Counter
 import pyodbc
-from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QPushButton, QLineEdit, QTableWidget, QTableWidgetItem, QMessageBox, QGridLayout, QHBoxLayout, QAction, QMainWindow, QProgressBar, QComboBox, QCheckBox
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QSettings
-from PyQt5.QtGui import QIcon, QBrush, QColor
+from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QPushButton, QLineEdit, QTableView, QMessageBox, QGridLayout, QHBoxLayout, QAction, QMainWindow, QProgressBar, QComboBox, QCheckBox
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QSettings, QModelIndex
+from PyQt5.QtGui import QIcon
 import usb
 import usb.core
 import usb.util
 import usb.backend.libusb1
 import requests
-from bisect import bisect_left, bisect_right
 from check_password import PasswordCheck
 from dashboard import DashboardWindow
 from modules import Configurations
 from modules.logger_config import setup_logger
 from modules.SendCommand import SendCommand
 from modules.Configurations import BarcodeConfig
+from modules.Catalog import Catalog
+from modules.CatalogSync import DeltaSync
+from modules.CatalogQueries import CatalogQueries, quote_identifier
+from modules.CatalogSearch import CancelToken, SearchCache, SearchCancelled
+from modules.CatalogFilter import QueryError, explain, parse_query, run_query
+from modules.ItemTableModel import ItemTableModel
+from modules.LabelTemplate import TEMPLATE_KEYS, TemplateCache
+from modules.PrintJob import LabelFormat, PrintJob
+from modules.PrinterPool import get_printer_pool
+from modules.CatalogSnapshot import CatalogSnapshot
+from modules.ConnectionPool import get_pool
 from remark import RemarkDialog
 from version import __version__
 import subprocess
 import sqlite3
 
 
-class FilterItemsBinaryThread(QThread):
-    items_filtered = pyqtSignal(list)  # Signal to emit filtered items
+SCANNER_MIN_LENGTH = 6  # Shortest burst treated as a scanned code
+PRINT_COUNT_LIMIT = 5000  # Barcodes whose print counts are kept between sessions
 
-    def __init__(self, all_items, search_text, sort_by='barcode'):
-        super().__init__()
-        self.all_items = all_items
-        self.search_text = search_text.lower()
-        self.sort_by = sort_by
 
-    def binary_search(self, items, target: str):
-        """Perform binary search for the target on pre-sorted items."""
-        if self.sort_by == 'description':
-            item_codes = [str(item[1]).lower() for item in items]
-        elif self.sort_by == 'barcode':
-            item_codes = [str(item[4]).lower() for item in items]
+class SearchWorker(QThread):
+    """
+    One long-lived thread that runs the searches, newest request first.
+
+    submit() hands over a search callable and returns its generation number. A newer submit
+    cancels the running search through its CancelToken and replaces any request still waiting,
+    so typing never starts a thread and never forcibly stops one. Results carry their generation;
+    the receiver ignores any that is not the latest.
+    """
+    result_ready = pyqtSignal(int, object)  # Generation, search result
+    search_failed = pyqtSignal(int, str)  # Generation, error message
 
-        index = bisect_left(item_codes, target)
+    def __init__(self):
+        super().__init__()
+        self.logger = setup_logger('SearchWorker')
+        self.condition = threading.Condition()
+        self.pending = None
+        self.token = None
+        self.generation = 0
+        self.running = True
+
+    def submit(self, search):
+        """
+        Queue search(token) in place of any earlier request.
 
-        if index < len(item_codes) and item_codes[index] == target:
-            return [items[index]]  # Return found item as a single-item list for uniform display
-        return []
+        Returns:
+            int: The generation number its result will be emitted with.
+        """
+        with self.condition:
+            self.generation += 1
+            if self.token is not None:
+                self.token.cancel()
+            self.token = CancelToken()
+            self.pending = (self.generation, search, self.token)
+            self.condition.notify()
+            return self.generation
+
+    def cancel(self):
+        """Cancel the running and waiting searches without submitting a new one."""
+        with self.condition:
+            self.generation += 1
+            if self.token is not None:
+                self.token.cancel()
+            self.pending = None
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            if self.token is not None:
+                self.token.cancel()
+            self.condition.notify()
+        self.wait()
 
     def run(self):
-        # Sort items before binary search
-        if self.sort_by == "description":
-            sorted_items = sorted(self.all_items, key=lambda x: x[1].lower())
-        elif self.sort_by == 'barcode':
-            sorted_items = sorted(self.all_items, key=lambda x: x[4].lower())
-
-        # Apply binary search if there is search text; otherwise return all items
-        if self.search_text:
-            filtered_items = self.binary_search(sorted_items, self.search_text)
-        else:
-            filtered_items = sorted_items
+        while True:
+            with self.condition:
+                while self.pending is None and self.running:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                generation, search, token = self.pending
+                self.pending = None
+
+            try:
+                result = search(token)
+            except SearchCancelled:
+                self.logger.info(f"Search {generation} cancelled by a newer search.")
+                continue
+            except Exception as e:
+                self.search_failed.emit(generation, str(e))
+                continue
+            if not token.cancelled:
+                self.result_ready.emit(generation, result)
 
-        # Emit the filtered items
-        self.items_filtered.emit(filtered_items)
 
 class FetchItemsThread(QThread):
     items_fetched = pyqtSignal(list)
+    items_batch_fetched = pyqtSignal(list)  # Emitted per fetchmany() chunk in streaming mode
+    fetch_finished = pyqtSignal(int)  # Total rows streamed
+    delta_fetched = pyqtSignal(list, object, object)  # Changed rows, live keys or None, new marks
+    marks_fetched = pyqtSignal(object)  # High-water marks read before a full fetch
+    snapshot_saved = pyqtSignal(object)  # crc32 of the new catalog snapshot, None if saving failed
     error_occurred = pyqtSignal(str)
 
-    def __init__(self, db_path_or_connection, location, use_sqlite):
+    def __init__(self, db_path_or_pool, location, use_sqlite, batch_size=0, delta_sync=None,
+                 snapshot=None, sort_key=None):
         super().__init__()
+        self.logger = setup_logger('FetchItemsThread')
         self.config = BarcodeConfig()
-        self.db_source = db_path_or_connection  # Can be path or pyodbc connection
+        self.db_source = db_path_or_pool  # SQLite path, or the shared SQL Server ConnectionPool
         self.location = location
         self.use_sqlite = use_sqlite
+        self.batch_size = batch_size  # 0 disables streaming and emits everything at once
+        self.delta_sync = delta_sync  # SQL Server only; None always runs the full query
+        self.snapshot = snapshot  # CatalogSnapshot rewritten after every full fetch
+        self.sort_key = sort_key
+
+    def emit_rows(self, cursor):
+        """
+        Emit the result set either in one go or in fetchmany() batches.
+
+        Returns:
+            list: The rows sorted for the snapshot, or None when no snapshot is saved. Streamed
+                rows are only kept for the snapshot, so with it off they are freed batch by batch.
+        """
+        if self.batch_size <= 0:
+            items = cursor.fetchall()
+            self.logger.debug(f"Retrieved {len(items)} items")
+            self.items_fetched.emit(items)
+            if self.snapshot is None:
+                return None
+            # The emitted list is read by the UI thread, so sort a copy of it
+            return sorted(items, key=self.sort_key)
+
+        cursor.arraysize = self.batch_size
+        items = [] if self.snapshot is not None else None
+        total = 0
+        while True:
+            batch = cursor.fetchmany(self.batch_size)
+            if not batch:
+                break
+            total += len(batch)
+            if items is not None:
+                items.extend(batch)
+            self.items_batch_fetched.emit(batch)
+        self.logger.debug(f"Streamed {total} items in batches of {self.batch_size}")
+        self.fetch_finished.emit(total)
+        if items is not None:
+            items.sort(key=self.sort_key)  # Only this thread holds the list
+        return items
+
+    def save_snapshot(self, items):
+        if self.snapshot is None or not items:
+            return
+        try:
+            self.snapshot_saved.emit(self.snapshot.save(items))
+        except Exception as e:
+            print(f"Error saving catalog snapshot: {e}")
+            self.snapshot_saved.emit(None)
 
     def run(self):
         print("[DEBUG] FetchItemsThread started")
 
         if not self.use_sqlite:
-            # SQL Server (pyodbc)
-            cursor = None
+            # SQL Server (pyodbc); a pooled connection of this worker, whose cursors stay prepared between fetches
             try:
-                connection = self.db_source  # pyodbc connection
-                cursor = connection.cursor()
-                query = f"""
-                WITH BaseItems AS (
-                    SELECT
-                        u.ItemCode,
-                        i.Description AS DescriptionWithUOM,
-                        u.UOM,
-                        u.Price AS DefaultUnitPrice,
-                        u.Cost,
-                        ISNULL(NULLIF(u.BarCode, ''), i.ItemCode) AS Barcode,
-                        ISNULL(p.Location, 'HQ') AS Location,
-                        ISNULL(p.Price, u.Price) AS PosUnitPrice
-                    FROM dbo.ItemUOM u
-                    LEFT JOIN dbo.Item i ON u.ItemCode = i.ItemCode
-                    LEFT JOIN dbo.PosPricePlan p ON u.ItemCode = p.ItemCode AND p.Location = '{self.location}'
-                )
-                SELECT * FROM BaseItems;
-                """
-                cursor.execute(query)
-                items = cursor.fetchall()
-                self.items_fetched.emit(items)
+                with self.db_source.checkout() as pooled:
+                    queries = CatalogQueries.for_connection(pooled, self.config.get_hide_cost())
+
+                    if self.delta_sync is not None:
+                        if self.delta_sync.primed:
+                            changed, live_keys, marks = self.delta_sync.fetch_changes(queries, self.location)
+                            self.logger.debug(f"Delta sync fetched {len(changed)} changed items")
+                            self.delta_fetched.emit(changed, live_keys, marks)
+                            return
+                        # Read the marks before the full fetch so nothing written meanwhile is skipped later
+                        self.marks_fetched.emit(self.delta_sync.read_marks(queries))
+
+                    cursor = queries.items(self.location)
+                    items = self.emit_rows(cursor)
+                self.save_snapshot(items)
             except pyodbc.Error as e:
                 self.error_occurred.emit(f"Error fetching items from SQL Server: {e}")
             except Exception as e:
                 self.error_occurred.emit(f"Unexpected error in SQL Server fetch: {e}")
-            finally:
-                if cursor:
-                    try:
-                        cursor.close()
-                    except Exception as e:
-                        print(f"Error closing SQL Server cursor: {e}")
         else:
             # SQLite (must create connection inside thread)
             print("[DEBUG] Using SQLite mode for fetching items")
-            cursor = None
+            queries = None
             connection = None
             try:
                 connection = sqlite3.connect(self.db_source)  # Create connection in this thread
-                cursor = connection.cursor()
-                print("[DEBUG] SQLite cursor created")
-                query = "SELECT barCode, name, price FROM Tbl_Plu;"
-                cursor.execute(query)
+                queries = CatalogQueries(connection)
+                cursor = queries.sqlite_items()
                 print("[DEBUG] Query executed")
-                items = cursor.fetchall()
-                print(f"[DEBUG] Retrieved {len(items)} items from SQLite")
-                self.items_fetched.emit(items)
+                items = self.emit_rows(cursor)
                 print("[DEBUG] Emitted items to main thread")
+                self.save_snapshot(items)
             except Exception as e:
                 print(f"[DEBUG] Exception occurred in SQLite block: {e}")
                 self.error_occurred.emit(f"SQLite error: {e}")
             finally:
-                if cursor:
-                    try:
-                        cursor.close()
-                    except Exception as e:
-                        print(f"Error closing SQLite cursor: {e}")
+                if queries:
+                    queries.close()
                 if connection:
                     connection.close()
 
@@ -157,19 +245,46 @@ class BarcodeApp(QMainWindow):
         self.input_timer.setSingleShot(True)
         self.input_timer.timeout.connect(self.filter_items_binary)
         self.config.setting_changed.connect(self.handle_config_change)
+        self.config.setting_changed.connect(self.handle_source_setting_changed)
+        self.label_templates = TemplateCache()  # Label templates compiled once, until their setting changes
+        self.config.setting_changed.connect(self.handle_template_setting_changed)
         self.backend = usb.backend.libusb1.get_backend(find_library=self.resource_path('libusb-1.0.ddl'))
         self.setWindowIcon(QIcon(self.resource_path(("images/logo.ico"))))
         self.db_connected = False
         self.connection = None
+        self.pool = None
         self.sqlite_connection = None
         self.warning_shown = False
         self.settings = QSettings("MyCompany", "MyApp")  # Customize organization and app names
         self.restore_column_widths() 
+        self.fetch_items_thread = None
+        self.catalog = None
+        self.incoming_catalog = None
+        self.replaced_catalog = None  # Catalog shown before a streamed reload, to carry its selection over
+        self.uncarried_ids = []  # Its selected rows the streamed catalog had no match for yet
+        self.search_cache = SearchCache()  # Only used from the search worker thread
+        self.search_worker = SearchWorker()
+        self.search_worker.result_ready.connect(self.handle_search_result)
+        self.search_worker.search_failed.connect(self.handle_search_failed)
+        self.search_worker.start()
+        self.last_search = None
+        self.searched_catalog = None
+        self.last_input = ""
+        self.last_key_time = 0.0
+        self.burst_length = 0  # Trailing characters of the input typed as one fast burst
+        self.print_counts = self.load_print_counts()  # Barcode -> labels printed, boosts search ranking
+        # Network printer connections stay open between jobs, but not for so long that other tills are locked out
+        self.printer_idle_timer = QTimer(self)
+        self.printer_idle_timer.timeout.connect(get_printer_pool().close_idle)
+        self.printer_idle_timer.start(30000)
+        self.delta_sync = None
+        self.snapshot = None
+        self.snapshot_shown = False
+        self.snapshot_check_pending = False
+        self.show_catalog_snapshot()
         self.connect_to_database()
         self.loadStylesheet()
         self.showMaximized()
-        self.fetch_items_thread = None
-        self.items = []
 
         # Start fetching items on a separate thread
         self.start_fetch_items()
@@ -180,8 +295,68 @@ class BarcodeApp(QMainWindow):
         self.logger.info("Logging configuration updated.")
     
     def start_timer(self):
+        self.track_keystroke()
         self.input_timer.start(400)
 
+    def track_keystroke(self):
+        """Count how many characters at the end of the input arrived as one fast burst, like a scanner types."""
+        now = time.perf_counter()
+        text = self.item_code_input.text()
+        interval = self.config.get_scanner_key_interval() / 1000
+        if len(text) == len(self.last_input) + 1 and text.startswith(self.last_input):
+            self.burst_length = self.burst_length + 1 if now - self.last_key_time <= interval else 1
+        else:
+            self.burst_length = 1 if len(text) == 1 else 0  # Pasted, deleted or replaced text
+        self.last_input = text
+        self.last_key_time = now
+
+    def scanned_code(self):
+        """The code a scanner just typed, or None when the input was typed by hand."""
+        text = self.item_code_input.text()
+        interval = self.config.get_scanner_key_interval() / 1000
+        if self.burst_length < SCANNER_MIN_LENGTH or time.perf_counter() - self.last_key_time > interval:
+            return None
+        return text[-self.burst_length:].strip() or None
+
+    def handle_return_pressed(self):
+        code = self.scanned_code() if self.config.get_scanner_fast_path() else None
+        if code is None:
+            self.filter_items(False)
+        else:
+            self.scan_barcode(code)
+
+    def scan_barcode(self, code):
+        """
+        Show the rows of a scanned barcode straight away: no debounce, no worker, one
+        dictionary lookup. Codes that are not a known barcode fall back to the Enter search.
+        """
+        started = time.perf_counter()
+        if not self.db_connected or self.catalog is None:
+            self.filter_items(False)
+            return
+
+        self.input_timer.stop()
+        row_ids = self.catalog.barcode_ids(code)
+        if not row_ids:
+            self.logger.info(f"Scanned code '{code}' is not a known barcode, searching instead.")
+            self.filter_items(False)
+            return
+
+        self.search_worker.cancel()  # A search still running must not replace the scanned rows
+        if self.item_code_input.text() != code:
+            # The scan was typed after older text; keep only the code
+            self.item_code_input.blockSignals(True)
+            self.item_code_input.setText(code)
+            self.item_code_input.blockSignals(False)
+            self.last_input = code
+        self.item_code_input.selectAll()  # The next scan replaces this one
+
+        self.current_page = 1
+        self.display_items(self.catalog.view(row_ids))
+        if self.config.get_scanner_auto_check():
+            self.item_model.select(row_ids)
+        self.logger.info(f"Scanned '{code}': {len(row_ids)} items shown in {(time.perf_counter() - started) * 1000:.1f} ms")
+
     def handle_config_change(self):
         """
         Handle changes in the JSON config file.
@@ -198,9 +373,10 @@ class BarcodeApp(QMainWindow):
             self.check_version()
             self.progressBar.setValue(35)
 
-            if self.db_connected:
+            if self.db_connected and self.config.get_useSqlite():
                 self.logger.info("Closing existing database connection...")
                 self.connection.close()
+            # Pooled SQL Server connections are replaced by get_pool() when the server settings changed
             self.progressBar.setValue(50)
 
             self.logger.info("Reconnecting to the database...")
@@ -311,7 +487,7 @@ class BarcodeApp(QMainWindow):
         self.item_code_input = QLineEdit(self)
         self.item_code_input.setPlaceholderText('Enter Item Code')
         self.item_code_input.textChanged.connect(self.start_timer)
-        self.item_code_input.returnPressed.connect(lambda: self.filter_items(False))
+        self.item_code_input.returnPressed.connect(self.handle_return_pressed)
 
         # Search button
         self.search_for_uom = QPushButton("Get UOM", self)
@@ -352,6 +528,26 @@ class BarcodeApp(QMainWindow):
         }
         """)
         self.search_by_description.clicked.connect(lambda: self.filter_items(False))
+        self.fuzzy_search_button = QPushButton("Fuzzy", self)
+        self.fuzzy_search_button.setToolTip("Search descriptions allowing small typos")
+        self.fuzzy_search_button.setCursor(Qt.PointingHandCursor)
+        self.fuzzy_search_button.setStyleSheet("""
+        QPushButton {
+            background: qlineargradient(spread:pad, x1:0.148, y1:1, x2:1, y2:1, stop:0.233503 rgba(53, 132, 228, 255), stop:1 rgba(26, 95, 180, 255));
+            color: white;
+            border-top-left-radius: 8px;
+            border-bottom-right-radius: 8px;
+            font-style: italic;
+            font-weight: bold;
+            qproperty-cursor: pointingHandCursor;
+        }
+        QPushButton:hover {
+            background: white;
+            border: 2px solid rgb(53, 132, 228);
+            color: black;
+        }
+        """)
+        self.fuzzy_search_button.clicked.connect(self.fuzzy_search)
 
         self.barcode_size = QComboBox(self)
         self.options = ["size1", "size2", "size3", "Fun Bake"]
@@ -381,6 +577,7 @@ class BarcodeApp(QMainWindow):
         search_layout.addWidget(self.barcode_size)
         search_layout.addWidget(self.search_for_uom)
         search_layout.addWidget(self.search_by_description)
+        search_layout.addWidget(self.fuzzy_search_button)
 
         # Add search layout to the grid layout
         grid_layout.addLayout(search_layout, 0, 0, 1, 3)
@@ -388,14 +585,15 @@ class BarcodeApp(QMainWindow):
         self.logger.debug("Search bar section initialized.")
 
         # === Item Table Section ===
-        self.item_table = QTableWidget(self)
-        self.item_table.setColumnCount(10)
-        self.item_table.setHorizontalHeaderLabels([
-            "*", "Item Code", "Description", "UOM", "Unit Price", "Unit Cost",
-            "Barcode", "Location", "Price", "Copies"
-        ])
-        self.item_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.item_table.setSelectionMode(QTableWidget.NoSelection)
+        # Cells are formatted on demand by the model, nothing is created per cell
+        self.item_model = ItemTableModel(self)
+        self.item_table = QTableView(self)
+        self.item_table.setModel(self.item_model)
+        self.item_table.verticalHeader().setDefaultSectionSize(30)
+        self.item_table.setSelectionBehavior(QTableView.SelectRows)
+        self.item_table.setSelectionMode(QTableView.NoSelection)
+        self.item_table.verticalScrollBar().valueChanged.connect(self.handle_table_scrolled)
+        self.item_model.rowsInserted.connect(self.update_pagination_buttons)
 
         # Add table to the grid layout
         grid_layout.addWidget(self.item_table, 1, 0, 1, 3)
@@ -463,10 +661,10 @@ class BarcodeApp(QMainWindow):
         self.next_button.setCursor(Qt.PointingHandCursor)
         
         # Items per page selector
-        items_per_page_label = QLabel('Items per page:')
-        items_per_page_label.setStyleSheet("font-weight: bold;")
+        self.items_per_page_label = QLabel('Items per page:')
+        self.items_per_page_label.setStyleSheet("font-weight: bold;")
         self.items_per_page_combo = QComboBox(self)
-        self.items_per_page_combo.addItems(['50', '100', '200', '500'])
+        self.items_per_page_combo.addItems(['50', '100', '200', '500', '1000', '10000', '100000'])
         self.items_per_page_combo.setCurrentText(str(self.items_per_page))
         self.items_per_page_combo.currentTextChanged.connect(self.change_items_per_page)
         self.items_per_page_combo.setStyleSheet("""
@@ -482,7 +680,7 @@ class BarcodeApp(QMainWindow):
         pagination_layout.addWidget(self.page_label)
         pagination_layout.addWidget(self.next_button)
         pagination_layout.addStretch(1)  # Push the combo box to the right
-        pagination_layout.addWidget(items_per_page_label)
+        pagination_layout.addWidget(self.items_per_page_label)
         pagination_layout.addWidget(self.items_per_page_combo)
         
         # Add pagination layout to the grid layout (row 2)
@@ -553,8 +751,17 @@ class BarcodeApp(QMainWindow):
         }
         """)
         
+        # Selection Buttons: the selection spans every page and search until cleared
+        self.select_all_button = QPushButton('Select All Matching', self)
+        self.select_all_button.setStyleSheet(self.reload_button.styleSheet())
+        self.clear_selection_button = QPushButton('Clear Selection', self)
+        self.clear_selection_button.setStyleSheet(self.reload_button.styleSheet())
+        self.selection_label = QLabel('0 selected', self)
+
         # Set cursors
         self.print_button.setCursor(Qt.PointingHandCursor)
+        self.select_all_button.setCursor(Qt.PointingHandCursor)
+        self.clear_selection_button.setCursor(Qt.PointingHandCursor)
         self.reload_button.setCursor(Qt.PointingHandCursor)
         self.update_button.setCursor(Qt.PointingHandCursor)
         
@@ -562,10 +769,16 @@ class BarcodeApp(QMainWindow):
         self.print_button.clicked.connect(self.print_barcode)
         self.reload_button.clicked.connect(self.handle_config_change)
         self.update_button.clicked.connect(self.runUpdater)
+        self.select_all_button.clicked.connect(self.select_all_matching)
+        self.clear_selection_button.clicked.connect(self.clear_selection)
+        self.item_model.selection_changed.connect(self.update_selection_label)
         
         # Add widgets to buttons layout
         buttons_layout.addWidget(self.update_button)
         buttons_layout.addStretch(1)
+        buttons_layout.addWidget(self.selection_label)
+        buttons_layout.addWidget(self.select_all_button)
+        buttons_layout.addWidget(self.clear_selection_button)
         buttons_layout.addWidget(self.progressBar)
         buttons_layout.addWidget(self.reload_button)
         buttons_layout.addWidget(self.print_button)
@@ -597,10 +810,46 @@ class BarcodeApp(QMainWindow):
 
     def update_pagination_buttons(self):
         """Update the state of pagination buttons based on current page"""
+        paged = not self.item_model.chunk
+        for widget in (self.prev_button, self.next_button, self.items_per_page_label, self.items_per_page_combo):
+            widget.setVisible(paged)
+        if not paged:
+            self.page_label.setText(f'Showing {self.item_model.rowCount()} of {self.item_model.total} items')
+            return
         self.prev_button.setEnabled(self.current_page > 1)
         self.next_button.setEnabled(self.current_page < self.total_pages)
         self.page_label.setText(f'Page {self.current_page} of {self.total_pages}')
 
+    def handle_table_scrolled(self):
+        """Track the visible rows, and load the next chunk before the end of the loaded rows is reached."""
+        viewport = self.item_table.viewport()
+        first = max(0, self.item_table.rowAt(0))
+        last = self.item_table.rowAt(viewport.height() - 1)
+        if last < 0:
+            last = self.item_model.rowCount() - 1
+        self.item_model.set_visible(first, last)
+        if self.item_model.chunk and last >= self.item_model.rowCount() - self.item_model.chunk // 2:
+            if self.item_model.canFetchMore(QModelIndex()):
+                self.item_model.fetchMore(QModelIndex())
+
+    def select_all_matching(self):
+        """Select every row of the current result, on all pages, not just the loaded ones."""
+        if self.catalog is None or not len(self.current_displayed_items):
+            return
+        started = time.perf_counter()
+        added = self.item_model.select(self.current_displayed_items.all_ids())
+        self.logger.info(
+            f"Selected {added} more items ({len(self.catalog.selection)} in total) "
+            f"in {(time.perf_counter() - started) * 1000:.1f} ms."
+        )
+
+    def clear_selection(self):
+        self.item_model.clear_selection()
+        self.logger.info("Selection cleared.")
+
+    def update_selection_label(self, count):
+        self.selection_label.setText(f'{count} selected')
+
     def previous_page(self):
         """Go to the previous page"""
         if self.current_page > 1:
@@ -659,7 +908,7 @@ class BarcodeApp(QMainWindow):
             stylesheet = """
             QLabel { font-size: 20px; font-weight: bold; }
             QLineEdit { font-size: 18px; padding: 8px; border: 2px solid rgb(53, 132, 228);border-radius: 10px; }
-            QTableWidget { font-size: 16px; padding: 4px; border: 1px solid black; border-radius: 12px; }
+            QTableView { font-size: 16px; padding: 4px; border: 1px solid black; border-radius: 12px; }
             QPushButton { padding: 10px 20px; font-size: 20px; margin: 10px; }
             QPushButton:hover { background-color: rgb(0, 106, 255); }
             QPushButton:pressed { background-color: #000099; }
@@ -682,23 +931,8 @@ class BarcodeApp(QMainWindow):
             try:
                 self.logger.info("Attempting to connect to SQL Server...")
 
-                if self.config.get_trusted_connection():
-                    self.connection = pyodbc.connect(
-                        f'DRIVER={{ODBC Driver 17 for SQL Server}};'
-                        f'SERVER={self.config.get_server()};'
-                        f'DATABASE={self.config.get_database()};'
-                        f'UID={self.config.get_username()};'
-                        f'PWD={self.config.get_password()};'
-                        'Trusted_Connection=yes;'
-                    )
-                else:
-                    self.connection = pyodbc.connect(
-                        f'DRIVER={{ODBC Driver 17 for SQL Server}};'
-                        f'SERVER={self.config.get_server()};'
-                        f'DATABASE={self.config.get_database()};'
-                        f'UID={self.config.get_username()};'
-                        f'PWD={self.config.get_password()}'
-                    )
+                self.pool = get_pool(self.config)
+                self.connection = self.pool.connection()
 
                 if self.connection:
                     self.db_connected = True
@@ -721,47 +955,168 @@ class BarcodeApp(QMainWindow):
                 print(f"Error connecting to SQLite database: {e}")
                 self.db_connected = False
 
-    def replace_placeholders(self, template, **kwargs):
-        def replace(match):
-            key = match.group(1)
-            if key not in kwargs:
-                self.logger.warning(f"Missing placeholder for: {key}")
-                return f"{{{{{key}}}}}"  # Or raise an exception if needed
-            return str(kwargs[key])
-        return re.sub(r'{{(.*?)}}', replace, template)
-
-    def split_description(self, description, max_chars=25):
-        """Split description into two lines for printer labels."""
-        if len(description) <= max_chars:
-            return description, ""
-        
-        split_pos = description.rfind(' ', 0, max_chars + 1)
-        if split_pos == -1:
-            split_pos = max_chars
-            
-        return description[:split_pos].strip(), description[split_pos:].strip()
+    def label_format(self, remark_text):
+        """The template and commands of the chosen printer language and label size, read once per job."""
+        if not self.config.get_use_zpl():
+            template = self.config.get_tpsl_template()
+            if self.config.get_tpslSize() == self.options[1]:
+                template = self.config.get_tpsl_size80_template()
+            elif self.config.get_tpslSize() == self.options[2]:
+                template = self.config.get_tpsl_size3_template()
+            elif self.config.get_tpslSize() == self.options[3]: # Fun Bake
+                template = self.config.get_tpsl_funbake_template()
+            return LabelFormat(template, "CLS", self.config.get_company_name(), remark_text, templates=self.label_templates)
+
+        template = self.config.get_zpl_template()
+        if self.config.get_zplSize() == self.options[1]:
+            template = self.config.get_zpl_size80_template()
+        elif self.config.get_zplSize() == self.options[2]:
+            template = self.config.get_zpl_size3_template()
+        elif self.config.get_zplSize() == self.options[3]: # Fun Bake
+            template = self.config.get_zpl_funbake_template()
+        suffix = ""
+        # Add remark to ZPL command (only if not Fun Bake, as it's built-in)
+        if remark_text and self.config.get_zplSize() != self.options[3]:
+            suffix = f"\n^FO10,180^A0N,15,20^FDRemark: {remark_text}^FS"
+        return LabelFormat(template, "^XA^CLS^XZ", self.config.get_company_name(), remark_text, suffix, self.label_templates)
+
+    def counted_labels(self, job, printed):
+        """The label texts of a job, counting each barcode into `printed` as its label is streamed."""
+        for label in job.labels():
+            printed[label.barcode_value] += 1
+            yield label.data
+
+    def handle_template_setting_changed(self, key, value):
+        """Drop the compiled label templates when one of the templates is edited."""
+        if key in TEMPLATE_KEYS and len(self.label_templates):
+            self.label_templates.clear()
+            self.logger.info(f"Label template '{key}' changed, compiled templates cleared.")
 
     def start_fetch_items(self):
         print("[DEBUG] start_fetch_items() called")
 
         if not self.db_connected:
+            if self.snapshot_shown:
+                self.logger.warning('Database is not connected. Showing the last saved catalog.')
+                QMessageBox.warning(self, 'Database Error', 'Database is not connected. Showing the last saved catalog.')
+                return
             self.logger.error('Database is not connected. Items will not be shown.')
             QMessageBox.critical(self, 'Database Error', 'Database is not connected. Items will not be shown.')
             return
 
         self.logger.info(f"Fetching items for location: {self.config.get_location()}")
 
+        batch_size = self.config.get_fetch_batch_size() if self.config.get_stream_fetch() else 0
+        self.streamed_count = 0
+        snapshot = CatalogSnapshot.for_config(self.config) if self.config.get_catalog_snapshot() else None
+
         if self.config.get_useSqlite():
             db_path = self.config.get_sqlPath()
-            self.fetch_items_thread = FetchItemsThread(db_path, self.config.get_location(), True)
+            self.fetch_items_thread = FetchItemsThread(
+                db_path, self.config.get_location(), True, batch_size,
+                snapshot=snapshot, sort_key=self.barcode_sort_key()
+            )
+            if self.delta_sync is not None:
+                self.delta_sync.reset()  # Marks belong to the SQL Server catalog being replaced
         else:
-            self.fetch_items_thread = FetchItemsThread(self.connection, self.config.get_location(), False)
+            self.fetch_items_thread = FetchItemsThread(
+                self.pool, self.config.get_location(), False, batch_size, self.prepare_delta_sync(),
+                snapshot=snapshot, sort_key=self.barcode_sort_key()
+            )
 
         self.fetch_items_thread.items_fetched.connect(self.handle_items_fetched)
+        self.fetch_items_thread.items_batch_fetched.connect(self.handle_items_batch_fetched)
+        self.fetch_items_thread.fetch_finished.connect(self.handle_fetch_finished)
+        self.fetch_items_thread.delta_fetched.connect(self.handle_delta_fetched)
+        self.fetch_items_thread.marks_fetched.connect(self.handle_marks_fetched)
+        self.fetch_items_thread.snapshot_saved.connect(self.handle_snapshot_saved)
         self.fetch_items_thread.error_occurred.connect(self.handle_fetch_error)
         self.fetch_items_thread.start()
 
     
+    def show_catalog_snapshot(self):
+        """Show the catalog saved by the last session while the database is still being reached."""
+        if not self.config.get_catalog_snapshot():
+            return
+
+        self.snapshot = CatalogSnapshot.for_config(self.config)
+        rows = self.snapshot.load()
+        if not rows:
+            return
+
+        self.catalog = Catalog.for_config(self.config)
+        self.catalog.extend(rows, self.config.get_useSqlite())
+        self.snapshot_shown = True
+        self.display_items(self.catalog)
+        self.logger.info(f"Showing {len(rows)} items from the catalog snapshot until the database refresh completes.")
+
+        # Paint the table before the (possibly slow) database connection blocks the event loop
+        self.showMaximized()
+        QApplication.processEvents()
+
+    def handle_source_setting_changed(self, key, value):
+        """Drop the snapshot of the old catalog source when server, database or location change."""
+        if key not in ("server", "database", "location"):
+            return
+        if self.snapshot is not None:
+            self.snapshot.invalidate()
+        self.snapshot = CatalogSnapshot.for_config(self.config)
+
+    def handle_snapshot_saved(self, checksum):
+        if self.sender() is not self.fetch_items_thread:
+            return
+
+        if self.snapshot_check_pending and self.snapshot is not None and self.snapshot.checksum is not None:
+            if checksum == self.snapshot.checksum:
+                self.logger.info("Catalog snapshot matches the database.")
+            else:
+                self.logger.info("Catalog snapshot was out of date, the refreshed catalog replaced it.")
+        self.snapshot_check_pending = False
+        self.snapshot = CatalogSnapshot.for_config(self.config)
+        self.snapshot.checksum = checksum
+
+    def prepare_delta_sync(self):
+        """Return the DeltaSync to use for the next SQL Server fetch, or None when delta sync is off."""
+        column = self.config.get_delta_sync_column().strip()
+        if not column:
+            self.delta_sync = None
+            return None
+        try:
+            quote_identifier(column)
+        except ValueError as e:
+            self.logger.error(f"Delta sync disabled, falling back to full reloads: {e}")
+            self.delta_sync = None
+            return None
+
+        if self.delta_sync is None or self.delta_sync.column != column:
+            self.delta_sync = DeltaSync(column, self.config.get_delta_reconcile_interval())
+        self.delta_sync.reconcile_every = max(1, self.config.get_delta_reconcile_interval())
+        self.delta_sync.prepare((
+            self.config.get_server(), self.config.get_database(), self.config.get_location(), self.config.get_hide_cost()
+        ))
+
+        if self.catalog is None:
+            self.delta_sync.reset()  # Nothing to merge into yet
+        return self.delta_sync
+
+    def handle_marks_fetched(self, marks):
+        if self.sender() is self.fetch_items_thread and self.delta_sync is not None:
+            self.delta_sync.pending_marks = marks
+
+    def handle_delta_fetched(self, changed, live_keys, marks):
+        if self.sender() is not self.fetch_items_thread or self.delta_sync is None:
+            return
+
+        upserted, removed = self.delta_sync.merge(self.catalog, changed, live_keys)
+        self.delta_sync.commit(marks)
+        self.logger.info(f"Delta sync applied: {upserted} rows upserted, {removed} rows removed, {len(self.catalog)} items total.")
+
+        if removed:
+            # Removing rows renumbers the ones after them, so a search result must be found again
+            self.redisplay_catalog()
+        elif upserted and not self.item_code_input.text().strip():
+            self.display_items(self.catalog)
+
     def handle_fetch_error(self, message):
         print(f"[ERROR] {message}")
         QMessageBox.critical(self, "Fetch Error", message)
@@ -779,21 +1134,132 @@ class BarcodeApp(QMainWindow):
             print(f"Fetched {len(items)} items")
             self.logger.info(f"Fetched {len(items)} items.")
 
-            self.items = items
+            catalog = Catalog.for_config(self.config)
+            catalog.extend(items, self.config.get_useSqlite())
+            self.replace_catalog(catalog)
+            self.check_trigram_budget()
+            if self.delta_sync is not None and self.sender() is self.fetch_items_thread:
+                self.delta_sync.commit_pending()
 
-            if self.config.get_useSqlite():
-                # SQLite: barCode is at index 0
-                self.all_items = sorted(self.items, key=lambda x: str(x[0]).lower())
-            else:
-                # SQL Server: barCode is at index 5
-                self.all_items = sorted(self.items, key=lambda x: str(x[5]).lower())
+            if self.snapshot_shown:
+                # handle_snapshot_saved logs whether the snapshot was still current
+                self.snapshot_shown = False
+                self.snapshot_check_pending = True
 
-            self.display_items(self.all_items)
+            self.redisplay_catalog()
             self.logger.info("Items successfully displayed.")
         else:
             self.logger.warning("No items fetched from the database.")
             QMessageBox.warning(self, "No items", "No items were fetched from the database.")
 
+    def replace_catalog(self, catalog, missing=None):
+        """
+        Make a freshly loaded catalog the current one, keeping the rows selected in the old one.
+
+        Args:
+            missing: A list the old row ids without a match in `catalog` are appended to.
+        """
+        if self.catalog is not None and catalog is not self.catalog and len(self.catalog.selection):
+            carried = catalog.carry_selection(self.catalog, missing=missing)
+            self.logger.info(f"Carried {carried} of {len(self.catalog.selection)} selected items over to the reloaded catalog.")
+        self.catalog = catalog
+        self.update_selection_label(len(catalog.selection))
+
+    def redisplay_catalog(self):
+        """
+        Show the current catalog again, re-running the active search against it.
+
+        The table must be rebound whenever the catalog is replaced or loses rows: the rows it
+        shows and the checks made in it go by row id, into the catalog it was given.
+        """
+        if self.item_code_input.text().strip() and self.last_search is not None:
+            self.start_search(*self.last_search)
+        else:
+            self.display_items(self.catalog)
+
+    def check_trigram_budget(self):
+        if self.config.get_trigram_memory_budget() > 0 and not self.catalog.trigram_index.enabled:
+            self.logger.warning(
+                f"Description trigram index exceeds {self.config.get_trigram_memory_budget()} MB and was turned off; "
+                "substring search uses the word index."
+            )
+
+    def barcode_sort_key(self):
+        """Sort key of fetched (not yet normalized) rows, used to save the snapshot in table order."""
+        if self.config.get_useSqlite():
+            # SQLite: barCode is at index 0
+            return lambda x: str(x[0]).lower()
+        # SQL Server: barCode is at index 5
+        return lambda x: str(x[5]).lower()
+
+    def handle_items_batch_fetched(self, batch):
+        """Merge a streamed chunk into the sorted catalog as soon as it arrives."""
+        if self.sender() is not self.fetch_items_thread:
+            return  # Chunk from a fetch that has since been superseded
+
+        if self.streamed_count == 0:
+            self.incoming_catalog = Catalog.for_config(self.config)
+        self.incoming_catalog.extend(batch, self.config.get_useSqlite())
+        self.streamed_count += len(batch)
+        self.logger.debug(f"Merged batch of {len(batch)} items ({self.streamed_count} so far).")
+
+        if self.snapshot_shown:
+            return  # Keep the snapshot on screen until the refreshed catalog is complete
+
+        if self.catalog is not self.incoming_catalog:
+            # Selected rows that have not arrived yet are carried over once the fetch finishes
+            self.replaced_catalog = self.catalog
+            self.uncarried_ids = []
+            self.replace_catalog(self.incoming_catalog, self.uncarried_ids)
+            if self.item_code_input.text().strip():
+                # The result on screen has row ids of the replaced catalog
+                self.redisplay_catalog()
+                return
+
+        if self.item_code_input.text().strip():
+            return  # Don't overwrite the results of an active search
+
+        if self.streamed_count == len(batch):
+            # First batch: show the first page right away
+            self.current_page = 1
+            self.display_items(self.catalog)
+        else:
+            # Later batches only grow the page count; the full repaint happens when the fetch finishes
+            self.current_displayed_items = self.catalog
+            self.total_pages = max(1, (len(self.catalog) + self.items_per_page - 1) // self.items_per_page)
+            self.update_pagination_buttons()
+
+    def handle_fetch_finished(self, total):
+        if self.sender() is not self.fetch_items_thread:
+            return
+
+        if total == 0:
+            self.logger.warning("No items fetched from the database.")
+            QMessageBox.warning(self, "No items", "No items were fetched from the database.")
+            return
+
+        print(f"Fetched {total} items")
+        self.logger.info(f"Fetched {total} items.")
+        if self.replaced_catalog is not None:
+            if self.uncarried_ids:
+                # Only the rows missing at the first batch: the others may have been unchecked since
+                self.incoming_catalog.carry_selection(self.replaced_catalog, self.uncarried_ids)
+            self.replaced_catalog = None
+            self.uncarried_ids = []
+        self.replace_catalog(self.incoming_catalog)
+        self.incoming_catalog = None
+        self.check_trigram_budget()
+        if self.delta_sync is not None:
+            self.delta_sync.commit_pending()
+
+        if self.snapshot_shown:
+            # handle_snapshot_saved logs whether the snapshot was still current
+            self.snapshot_shown = False
+            self.snapshot_check_pending = True
+
+        self.redisplay_catalog()
+        self.logger.info("Items successfully displayed.")
+
     def open_settings(self):
         try:
             self.logger.info("Attempting to open the Settings window.")
@@ -819,17 +1285,34 @@ class BarcodeApp(QMainWindow):
     def closeEvent(self, event):
         """Override the close event to save column widths."""
         self.save_column_widths()
+        self.search_worker.stop()
+        self.save_print_counts()
+        get_printer_pool().close()
+        self.logger.info(self.search_cache.summary())
         super().closeEvent(event)
 
     def save_column_widths(self):
         """Save column widths to QSettings."""
-        for i in range(self.item_table.columnCount()):
+        for i in range(self.item_model.columnCount()):
             self.settings.setValue(f"column_width_{i}", self.item_table.columnWidth(i))
         print("Column widths saved.")
 
+    def load_print_counts(self):
+        """Restore how often each barcode was printed from QSettings."""
+        try:
+            return Counter(json.loads(self.settings.value("print_counts", "{}")))
+        except (TypeError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable print counts: {e}")
+            return Counter()
+
+    def save_print_counts(self):
+        """Save the print counts of the most printed barcodes to QSettings."""
+        most_printed = dict(self.print_counts.most_common(PRINT_COUNT_LIMIT))
+        self.settings.setValue("print_counts", json.dumps(most_printed))
+
     def restore_column_widths(self):
         """Restore column widths from QSettings."""
-        for i in range(self.item_table.columnCount()):
+        for i in range(self.item_model.columnCount()):
             width = self.settings.value(f"column_width_{i}", type=int)
             if width:
                 self.item_table.setColumnWidth(i, width)
@@ -841,8 +1324,19 @@ class BarcodeApp(QMainWindow):
             # Store the current filtered items
             self.current_displayed_items = items
             
-            # Calculate pagination
             total_items = len(items)
+            selection = self.catalog.selection if self.catalog is not None else None
+            if self.config.get_infinite_scroll():
+                # One table over the whole result, loaded a chunk at a time as it scrolls
+                self.current_page = 1
+                self.total_pages = 1
+                self.item_model.set_items(items, 0, total_items, self.config.get_hide_cost(), self.config.get_scroll_chunk_size(), selection)
+                self.item_table.scrollToTop()
+                self.logger.info(f"Displaying {self.item_model.rowCount()} of {total_items} items, more load on scroll.")
+                self.update_pagination_buttons()
+                return
+
+            # Calculate pagination
             self.total_pages = max(1, (total_items + self.items_per_page - 1) // self.items_per_page)
             
             # Ensure current page is within valid range
@@ -853,78 +1347,16 @@ class BarcodeApp(QMainWindow):
             start_index = (self.current_page - 1) * self.items_per_page
             end_index = min(start_index + self.items_per_page, total_items)
             
-            # Get items for current page
-            page_items = items[start_index:end_index]
-            
             self.logger.info(f"Displaying page {self.current_page}: items {start_index + 1}-{end_index} of {total_items}")
             
-            # Clear and setup table
-            self.item_table.setRowCount(len(page_items))
-
-            barcode_config = Configurations.BarcodeConfig()
-
-            for row_number, item in enumerate(page_items):
-                checkbox_item = QTableWidgetItem()
-                checkbox_item.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
-                checkbox_item.setCheckState(Qt.Unchecked)
-                self.item_table.setItem(row_number, 0, checkbox_item)
-                self.item_table.item(row_number, 0).setTextAlignment(Qt.AlignLeft)
-
-                if self.config.get_useSqlite():
-                    # SQLite data: (barCode, name, price)
-                    barcode_value, description, price = item
-                    item_code = "-"
-                    uom = "-"
-                    unit_price = price
-                    unit_cost = 0.00
-                    location = "-"
-                    location_price = price
-                else:
-                    # SQL Server data: (item_code, description, uom, unit_price, unit_cost, barcode, location, location_price)
-                    item_code, description, uom, unit_price, unit_cost, barcode, location, location_price = item
-                    barcode_value = item_code if barcode is None else barcode
-
-                # Format values
-                formatted_unit_price = f"RM {float(unit_price):.2f}" if unit_price is not None else "RM 0.00"
-                formatted_unit_cost = "RM 0.00"
-                if not barcode_config.get_hide_cost():
-                    formatted_unit_cost = f"RM {float(unit_cost):.2f}" if unit_cost is not None else "RM 0.00"
-                elif barcode_config.get_hide_cost():
-                    formatted_unit_cost = '***'
-                formatted_location_price = f"RM {float(location_price):.2f}" if location_price is not None else "RM 0.00"
-
-                # Set data for table
-                for col_number, value in enumerate([
-                    item_code,
-                    description,
-                    uom,
-                    formatted_unit_price,
-                    formatted_unit_cost,
-                    barcode_value,
-                    location,
-                    formatted_location_price
-                ], start=1):
-                    table_item = QTableWidgetItem(str(value))
-                    table_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-                    table_item.setTextAlignment(Qt.AlignCenter)
-                    self.item_table.setItem(row_number, col_number, table_item)
-
-                # Copies column
-                copies_item = QTableWidgetItem("1")
-                copies_item.setFlags(Qt.ItemIsEditable | Qt.ItemIsEnabled)
-                copies_item.setTextAlignment(Qt.AlignCenter)
-                self.item_table.setItem(row_number, 9, copies_item)
-
-                # Background color for even rows
-                if row_number % 2 == 0:
-                    for col_number in range(self.item_table.columnCount()):
-                        self.item_table.item(row_number, col_number).setBackground(QBrush(QColor(230, 238, 255)))
+            # Hand the page to the model; cells are formatted when the view paints them
+            self.item_model.set_items(items, start_index, end_index, self.config.get_hide_cost(), selection=selection)
+            self.item_table.scrollToTop()
 
             # Update pagination controls
             self.update_pagination_buttons()
-            self.restore_column_widths()
             
-            self.logger.info(f"Finished displaying page {self.current_page} with {len(page_items)} items.")
+            self.logger.info(f"Finished displaying page {self.current_page} with {end_index - start_index} items.")
             
         except Exception as e:
             self.logger.error(f"Error displaying items: {e}")
@@ -933,11 +1365,11 @@ class BarcodeApp(QMainWindow):
     def start_filter_items_thread(self):
         try:
             # Ensure database is connected
-            if not self.db_connected or not hasattr(self, 'all_items'):
+            if not self.db_connected or self.catalog is None:
                 if not self.warning_shown:
                     QMessageBox.warning(self, 'Database Error', 'Database is not connected. Searched items will not be shown.')
                     self.warning_shown = True
-                self.logger.warning("Database is not connected or 'all_items' is not available.")
+                self.logger.warning("Database is not connected or the catalog is not available.")
                 return
 
             # Get the current text and selected sortBy option
@@ -946,38 +1378,81 @@ class BarcodeApp(QMainWindow):
 
             self.logger.info(f"Starting filter for items with search text: {search_text}, sorted by: {sort_by}")
 
-            # Terminate any running thread to prevent overlap
-            if hasattr(self, 'filter_items_thread') and self.filter_items_thread.isRunning():
-                self.logger.info("Terminating any running filter thread.")
-                self.filter_items_thread.terminate()
+            # The catalog keeps its sorted indexes up to date, nothing is re-sorted per search
+            def search(catalog, token):
+                index = catalog.barcode_index if sort_by == 'barcode' else catalog.index("descriptions")
+                return catalog.view(index.exact(search_text) if search_text else index.ids)
 
-            # Start a new thread for filtering items
-            self.filter_items_thread = FilterItemsBinaryThread(self.all_items, search_text, sort_by)
-            self.filter_items_thread.items_filtered.connect(self.display_items)
-            self.filter_items_thread.start()
+            self.start_search(search, search_text)
 
-            self.logger.info("Started new filter thread for items.")
-        
         except Exception as e:
             self.logger.error(f"Error in start_filter_items_thread: {e}")
             QMessageBox.critical(self, 'Error', f"Error filtering items: {e}")
 
-    def binary_search(self, items, target: str):
-        try:
-            if self.config.get_useSqlite():
-                # SQLite: barcode is at index 0
-                item_codes = [str(item[0]).lower() for item in items]
-            else:
-                # SQL Server: barcode is at index 5
-                item_codes = [str(item[5]).lower() for item in items]
+    def start_search(self, search, search_text):
+        """
+        Run search(token) on the search worker; its result replaces the displayed items.
+
+        A newer search cancels this one, and a result that is no longer the latest is dropped,
+        so a slow search can never overwrite the result of a later keystroke.
 
-            index = bisect_left(item_codes, target.lower())
-            end_index = bisect_right(item_codes, target.lower())
+        Args:
+            search: search(catalog, token) -> CatalogView, or None when nothing matches. Runs on
+                the worker thread, holding the catalog's lock: it must not touch widgets or settings.
+                It is given the current catalog, so it can be run again after a reload.
+            search_text: The query, for the log.
+        """
+        catalog = self.catalog
+        version = catalog.version
+        self.last_search = (search, search_text)
+        self.searched_catalog = (catalog, version)
+
+        def run(token):
+            # The UI thread changes the catalog under the same lock, so the search reads it whole
+            with catalog.lock:
+                return catalog, version, search(catalog, token)
+
+        generation = self.search_worker.submit(run)
+        self.logger.info(f"Search {generation} submitted for '{search_text}'.")
+
+    def handle_search_result(self, generation, result):
+        if generation != self.search_worker.generation:
+            self.logger.info(f"Dropping stale result of search {generation}.")
+            return
 
-            self.logger.debug(f"Binary search index found: {index}")
+        catalog, version, found_items = result
+        if catalog is not self.catalog or catalog.version != version:
+            # The catalog changed while the search ran: its row ids may point elsewhere now
+            self.logger.info(f"Catalog changed during search {generation}, searching again.")
+            self.start_search(*self.last_search)
+            return
 
-            if index < end_index:
-                matching_items = items[index:end_index]
+        if found_items:
+            self.logger.info(f"Search {generation} found {len(found_items)} items.")
+            self.display_items(found_items)
+        else:
+            self.logger.warning(f"No items found for search text: {self.last_search[1]}")
+            self.display_items([])
+
+    def handle_search_failed(self, generation, message):
+        if generation != self.search_worker.generation:
+            return
+        catalog, version = self.searched_catalog
+        if catalog is not self.catalog or catalog.version != version:
+            # Most likely read the catalog mid-update
+            self.logger.info(f"Search {generation} failed while the catalog changed, searching again.")
+            self.start_search(*self.last_search)
+            return
+        self.logger.error(f"Error during search {generation}: {message}")
+        QMessageBox.critical(self, 'Error', f"Error filtering items: {message}")
+
+    def binary_search(self, catalog, target: str):
+        try:
+            # Hash lookup that also finds the code stored with or without leading zeros or check digit
+            row_ids = catalog.barcode_ids(target)
+
+            if row_ids:
+                matching_items = catalog.view(row_ids)
                 self.logger.info(f"Found {len(matching_items)} matching items for target: '{target}'")
                 return matching_items
 
@@ -987,9 +1462,36 @@ class BarcodeApp(QMainWindow):
             self.logger.error(f"Error during binary search: {e}")
             return None
 
+    def prefix_search(self, catalog, prefix: str, item_codes=True, token=None):
+        """
+        Rows whose barcode or item code starts with the prefix.
+
+        Barcode matches come first in barcode order, followed by the item code matches not
+        already listed. Each column is one contiguous range of its sorted index; while the
+        user keeps typing, the cached result of the shorter prefix is narrowed instead.
+
+        Args:
+            item_codes: Also match item codes; SQLite rows have none.
+            token: CancelToken checked while narrowing.
+
+        Returns:
+            CatalogView: The matching rows, or None when nothing matches.
+        """
+        row_ids = self.search_cache.lookup(
+            catalog, ("prefix", item_codes), prefix.lower(),
+            lambda query: catalog.prefix_ids(query, item_codes),
+            lambda cached, query: catalog.narrow_prefix(cached, query, item_codes, token),
+        )
+
+        if not row_ids:
+            self.logger.info(f"No barcode or item code starts with '{prefix}'.")
+            return None
+        self.logger.info(f"Found {len(row_ids)} items starting with '{prefix}'")
+        return catalog.view(row_ids)
+
     def filter_items_binary(self):
         """Update filtering to reset to page 1 when filtering"""
-        if not self.db_connected or not hasattr(self, 'all_items'):
+        if not self.db_connected or self.catalog is None:
             if not self.warning_shown:
                 QMessageBox.warning(self, 'Database Error', 'Database is not connected. Searched items will not be shown.')
                 self.warning_shown = True
@@ -1003,21 +1505,25 @@ class BarcodeApp(QMainWindow):
 
         if not search_text:
             self.logger.info("No search text provided, displaying first page of all items.")
-            self.display_items(self.all_items)
+            self.search_worker.cancel()  # A search still running must not replace the full list
+            self.display_items(self.catalog)
             return
 
-        found_item = self.binary_search(self.all_items, search_text)
-        
-        if found_item:
-            self.logger.info(f"Item found: {found_item}")
-            self.display_items(found_item)
-        else:
-            self.logger.warning(f"No items found for search text: {search_text}")
-            self.display_items([])
+        use_prefix = self.config.get_prefix_search()
+        item_codes = not self.config.get_useSqlite()  # SQLite rows have no item code
+
+        def search(catalog, token):
+            found_item = self.binary_search(catalog, search_text)
+            if not found_item and use_prefix:
+                token.check()
+                found_item = self.prefix_search(catalog, search_text, item_codes, token)
+            return found_item
+
+        self.start_search(search, search_text)
 
     def filter_items(self, isUOM):
         """Update filtering to reset to page 1 when filtering"""
-        if not self.db_connected or not hasattr(self, 'all_items'):
+        if not self.db_connected or self.catalog is None:
             if not self.warning_shown:
                 QMessageBox.warning(self, 'Database Error', 'Database is not connected. Searched items will not be shown.')
                 self.warning_shown = True
@@ -1031,50 +1537,73 @@ class BarcodeApp(QMainWindow):
         keywords = search_text.split()
         self.logger.info(f"Keywords extracted: {keywords}")
 
-        if self.config.get_useSqlite():
-            # SQLite: only (barCode, name, price)
-            if not isUOM:
-                filtered_items = [
-                    item for item in self.all_items
-                    if all(keyword in str(item[1]).lower() for keyword in keywords)  # name
-                ]
-            else:
-                filtered_items = [
-                    item for item in self.all_items
-                    if all(keyword in str(item[0]).lower() for keyword in keywords)  # barcode
-                ]
-                if filtered_items:
-                    itemcode = str(filtered_items[0][0])
-                    filtered_items = [
-                        item for item in self.all_items
-                        if str(item[0]).lower() == itemcode.lower()  # exact match
-                    ]
-        else:
-            # SQL Server
+        if not isUOM:
+            # Field terms like `code:ABC* price:2..5` run as index lookups
+            try:
+                query = parse_query(search_text)
+            except QueryError as e:
+                self.logger.warning(f"Invalid search query '{search_text}': {e}")
+                QMessageBox.warning(self, 'Search Error', str(e))
+                return
+            if query.qualified:
+                def run(catalog, token):
+                    # The price, UOM and location indexes are built here on first use, off the UI thread
+                    self.logger.info(f"Query plan: {explain(catalog, query.terms)}")
+                    return catalog.view(run_query(catalog, query.terms, token))
+
+                self.start_search(run, search_text)
+                return
+
+        use_sqlite = self.config.get_useSqlite()
+        ranking = self.config.get_relevance_ranking()
+        first = self.items_per_page
+        popularity = self.print_counts
+
+        def search(catalog, token):
             if not isUOM:
-                    filtered_items = [
-                        item for item in self.all_items
-                        if all(keyword in str(item[1]).lower() for keyword in keywords)  # description
-                    ]
+                # description, answered from the inverted word index
+                row_ids = self.search_cache.lookup(
+                    catalog, "description", " ".join(keywords),
+                    lambda query: catalog.search_descriptions(query.split(), token),
+                    lambda cached, query: catalog.narrow_descriptions(cached, query.split(), token),
+                )
+                if ranking and keywords:
+                    # Best matches on the first page; later pages are ranked when shown
+                    return catalog.rank(row_ids, keywords, first, popularity, token)
             else:
-                filtered_items = [
-                    item for item in self.all_items
-                    if all(keyword in str(item[0]).lower() for keyword in keywords)  # item code
-                ]
-        
-        self.logger.info(f"Found {len(filtered_items)} items matching the search criteria.")
-        self.display_items(filtered_items)
+                # UOM variants: item code groups, or the rows of one barcode on SQLite
+                row_ids = catalog.uom_search(keywords, not use_sqlite, token)
+            return catalog.view(row_ids)
+
+        self.start_search(search, search_text)
+
+    def fuzzy_search(self):
+        """Typo-tolerant description search, best matches first."""
+        if not self.db_connected or self.catalog is None:
+            if not self.warning_shown:
+                QMessageBox.warning(self, 'Database Error', 'Database is not connected. Searched items will not be shown.')
+                self.warning_shown = True
+            return
+
+        # Reset to first page when filtering
+        self.current_page = 1
+
+        search_text = self.item_code_input.text().strip().lower()
+        keywords = search_text.split()
+        self.logger.info(f"Fuzzy search for keywords: {keywords}")
+
+        limit = self.config.get_fuzzy_result_limit()
+        self.start_search(
+            lambda catalog, token: catalog.view(catalog.fuzzy_search(keywords, limit, token)), search_text
+        )
 
     def print_barcode(self):
-        selected_rows = []
         send_command = SendCommand()
 
-        # Get selected rows
-        for row in range(self.item_table.rowCount()):
-            if self.item_table.item(row, 0).checkState() == Qt.Checked:
-                selected_rows.append(row)
+        # The selection spans every page and search
+        selection = self.catalog.selection if self.catalog is not None else None
 
-        if not selected_rows:
+        if not selection:
             self.logger.warning("No items selected for printing.")
             QMessageBox.warning(self, 'Selection Error', 'No items selected for printing.')
             return
@@ -1090,6 +1619,7 @@ class BarcodeApp(QMainWindow):
             remark_text = ""  # User clicked "Cancel," so no remark
 
         printer = None  # Ensure we initialize the printer variable
+        succeeded = False
         try:
             self.logger.info("USB mode selected. Checking printer connection...")
 
@@ -1118,66 +1648,33 @@ class BarcodeApp(QMainWindow):
                     QMessageBox.warning(self, 'Printer Error', f"Invalid IP or port: {e}")
                     return
 
-            # Process selected items
-            for row in selected_rows:
-                description = self.item_table.item(row, 2).text()
-                description = description.replace('"', '')
-                unit_price_integer = self.item_table.item(row, 8).text()
-                barcode_value = self.item_table.item(row, 6).text()
-                copies = self.item_table.item(row, 9).text()
-
-                self.logger.info(f"Preparing to print item: {description} (Barcode: {barcode_value})")
-                
-                description_1, description_2 = self.split_description(description)
-                
-                tpsl_template = self.config.get_tpsl_template()
-                zpl_template = self.config.get_zpl_template()
-                
-                printer_clear = ""
-                print_data = ""
-                if not self.config.get_use_zpl():
-                    printer_clear = "CLS"
-                    if self.config.get_tpslSize() == self.options[1]:
-                        tpsl_template = self.config.get_tpsl_size80_template()
-                    elif self.config.get_tpslSize() == self.options[2]:
-                        tpsl_template = self.config.get_tpsl_size3_template()
-                    elif self.config.get_tpslSize() == self.options[3]: # Fun Bake
-                        tpsl_template = self.config.get_tpsl_funbake_template()
-
-                    print_data = self.replace_placeholders(
-                        tpsl_template,
-                        companyName=self.config.get_company_name(),
-                        description=description,
-                        description_1=description_1,
-                        description_2=description_2,
-                        remark=remark_text,
-                        barcode_value=barcode_value,
-                        unit_price_integer=unit_price_integer,
-                        copies=copies,
-                    )
+            # Labels are built one at a time from the catalog columns of the selected rows, in the order the table shows them
+            row_ids = self.catalog.in_order(list(selection))
+            job = PrintJob(self.catalog, row_ids, self.label_format(remark_text), selection.copies)
+            printer_clear = job.label_format.clear
+            self.logger.info(f"Printing {len(job)} selected items.")
+            if self.config.get_batch_print() and not self.config.get_use_generic_driver():
+                # One connection (or spooler job) for the whole job: the clear command once, then every label
+                started = time.perf_counter()
+                printed = Counter()
+                if self.config.get_wireless_mode():
+                    sent = send_command.send_wireless_batch(ip, port, printer_clear, self.counted_labels(job, printed))
                 else:
-                    printer_clear = "^XA^CLS^XZ"
-                    if self.config.get_zplSize() == self.options[1]:
-                        zpl_template = self.config.get_zpl_size80_template()
-                    elif self.config.get_zplSize() == self.options[2]:
-                        zpl_template = self.config.get_zpl_size3_template()
-                    elif self.config.get_zplSize() == self.options[3]: # Fun Bake
-                        zpl_template = self.config.get_zpl_funbake_template()
-
-                    print_data = self.replace_placeholders(
-                        zpl_template,
-                        companyName=self.config.get_company_name(),
-                        description=description,
-                        description_1=description_1,
-                        description_2=description_2,
-                        remark=remark_text,
-                        barcode_value=barcode_value,
-                        unit_price_integer=unit_price_integer,
-                        copies=copies,
-                    )
-                    # Add remark to ZPL command (only if not Fun Bake, as it's built-in)
-                    if remark_text and self.config.get_zplSize() != self.options[3]:
-                        print_data += f"\n^FO10,180^A0N,15,20^FDRemark: {remark_text}^FS"
+                    sent = send_command.send_win32print_batch(self.config.get_printer_name(), printer_clear, self.counted_labels(job, printed))
+                if not sent:
+                    self.logger.error(f"Print job of {len(job)} labels was not sent completely.")
+                    QMessageBox.warning(self, 'Printer Error', 'The print job could not be sent. Check the printer and try again.')
+                    return
+                # Only a job that went out counts towards the search ranking
+                self.print_counts.update(printed)
+                elapsed = time.perf_counter() - started
+                self.logger.info(f"Sent {len(job)} labels in {elapsed:.2f} s ({len(job) / max(elapsed, 1e-6):.0f} labels/s).")
+                succeeded = True
+                return
+
+            for label in job.labels():
+                print_data = label.data
+                barcode_value = label.barcode_value
 
                 if self.config.get_use_generic_driver():
                     if printer is not None:
@@ -1193,6 +1690,9 @@ class BarcodeApp(QMainWindow):
                     send_command.send_win32print(self.config.get_printer_name(), printer_clear)
                     send_command.send_win32print(self.config.get_printer_name(), print_data)
 
+                self.print_counts[barcode_value] += 1
+            succeeded = True
+
         except usb.core.USBError as e:
             self.logger.error(f"USB Error: {e}")
             QMessageBox.information(self, 'Error', f'{e}')
@@ -1200,18 +1700,17 @@ class BarcodeApp(QMainWindow):
             self.logger.error(f"Value Error: {e}")
             QMessageBox.information(self, 'Error', f'{e}')
         finally:
-            # Show success message once after all items are printed
-            if not self.config.get_wireless_mode() and self.config.get_use_generic_driver():
-                self.logger.info('All selected items have been successfully sent to the printer (USB).')
-                QMessageBox.information(self, 'Success', 'All selected items have been successfully sent to the printer!')
+            if printer is not None:
                 usb.util.dispose_resources(printer)
 
-            elif not self.config.get_wireless_mode() and not self.config.get_use_generic_driver():
-                self.logger.info('All selected items have been successfully sent to the printer (win32print).')
-                QMessageBox.information(self, 'Success', 'All selected items have been successfully sent to the printer!')
-
-            else:
-                self.logger.info('All selected items have been successfully sent to the printer (wireless).')
+            # Show success message once after all items are printed; failures have shown their own message
+            if succeeded:
+                if not self.config.get_wireless_mode() and self.config.get_use_generic_driver():
+                    self.logger.info('All selected items have been successfully sent to the printer (USB).')
+                elif not self.config.get_wireless_mode() and not self.config.get_use_generic_driver():
+                    self.logger.info('All selected items have been successfully sent to the printer (win32print).')
+                else:
+                    self.logger.info('All selected items have been successfully sent to the printer (wireless).')
                 QMessageBox.information(self, 'Success', 'All selected items have been successfully sent to the printer!')
 
 if __name__ == '__main__':
@@ -0,0 +1,658 @@
+import sys
+import threading
+from array import array
+from heapq import heapify, heappop, nsmallest
+from math import log1p
+from modules.CatalogIndex import FuzzyIndex, GtinIndex, HashKeyIndex, NumberIndex, SortedKeyIndex, TokenIndex, TrigramIndex, fold, intersect
+from modules.CatalogSearch import chunks
+from modules.CatalogSelection import Selection
+
+# Normalized catalog row, the same for SQL Server and SQLite sources:
+# (item_code, description, uom, unit_price, unit_cost, barcode, location, location_price)
+COLUMNS = ("item_code", "description", "uom", "unit_price", "unit_cost", "barcode", "location", "location_price")
+
+PRICE_SCALE = 10000  # Prices are fixed-point integers with four decimals, like SQL Server money
+NULL_PRICE = -(2 ** 63)
+MISSING = "-"  # Shown for the columns the SQLite source does not have
+NUMBER_COLUMNS = ("uom_codes", "location_codes", "unit_prices", "unit_costs", "location_prices")
+TRIGRAM_SHARE = 50  # Use the trigram index when a keyword's candidates are under 1/50 of the catalog
+
+# Relevance points per keyword: a whole description word, the start of one, anywhere inside one
+EXACT_WORD_SCORE = 3
+PREFIX_WORD_SCORE = 2
+SUBSTRING_SCORE = 1
+CODE_WEIGHT = 4  # Extra points when the keyword also starts the item code or barcode
+POPULARITY_WEIGHT = 1.0  # Times log(1 + labels printed for the barcode)
+DIRECT_RANK_ROWS = 2000  # Smaller results score each description directly instead of via posting sets
+
+
+def to_fixed(value):
+    if value is None:
+        return NULL_PRICE
+    return round(float(value) * PRICE_SCALE)
+
+
+def from_fixed(value):
+    if value == NULL_PRICE:
+        return None
+    return value / PRICE_SCALE
+
+
+def format_price(value):
+    """A price as shown in the table and printed on labels."""
+    return f"RM {float(value):.2f}" if value is not None else "RM 0.00"
+
+
+def normalize_row(row, use_sqlite):
+    """Map a fetched row of either backend onto the normalized catalog columns."""
+    if use_sqlite:
+        # SQLite data: (barCode, name, price)
+        barcode, description, price = row
+        return (MISSING, description, MISSING, price, 0, barcode, MISSING, price)
+    # SQL Server data: (item_code, description, uom, unit_price, unit_cost, barcode, location, location_price)
+    item_code, description, uom, unit_price, unit_cost, barcode, location, location_price = row
+    return (item_code, description, uom, unit_price, unit_cost,
+            item_code if barcode is None else barcode, location, location_price)
+
+
+class StringTable:
+    """Interns a low-cardinality text column (UOM, Location) as small integer codes."""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+
+class Catalog:
+    """
+    Column-oriented in-memory catalog.
+
+    Every row gets a stable row id (its position in the columns). Free text columns are plain
+    lists of strings, UOM and Location are interned into typed code arrays, and the three
+    prices are fixed-point integers in typed arrays, so a row costs a few dozen bytes on top
+    of its text instead of a Row object with eight boxed fields.
+
+    `barcode_index` keeps the row ids sorted by lowercased barcode, which is also the order
+    the table shows (`order`); `item_code_index` does the same for item codes. The catalog
+    itself behaves like a read-only sequence of normalized row tuples in that order, so it
+    can be paged and displayed directly. `barcode_lookup` answers a barcode (a scan) in
+    O(log n), also matching its other GTIN spellings (leading zeros, check digit). These
+    are built as rows are added; sorted indexes of other columns are built on first use
+    and maintained the same way.
+
+    `description_index` is an inverted index of the description words, built on load for
+    keyword search, and `trigram_index` an optional trigram index of the descriptions for
+    substring search, limited to `trigram_budget` bytes (0 disables it). `fuzzy_index` finds
+    description words within a small edit distance of a misspelled keyword. `selection`
+    holds the rows checked for printing by row id, so it outlives pages and searches.
+
+    Searches run on the search worker while the UI thread adds, changes and removes rows.
+    `lock` is held by every change, by index builds and, on the worker, for a whole search,
+    so a search never sees columns and indexes halfway through a change.
+    """
+
+    def __init__(self, trigram_budget=0):
+        self.item_codes = []
+        self.descriptions = []
+        self.barcodes = []
+        self.uoms = StringTable()
+        self.locations = StringTable()
+        self.uom_codes = array("I")
+        self.location_codes = array("I")
+        self.unit_prices = array("q")
+        self.unit_costs = array("q")
+        self.location_prices = array("q")
+        self.version = 0  # Bumped on every change, so cached search results can tell they are stale
+        self.lock = threading.RLock()
+        self.barcode_index = SortedKeyIndex(self.barcodes)
+        self.barcode_lookup = GtinIndex(self.barcodes)
+        self.item_code_index = SortedKeyIndex(self.item_codes, skip=MISSING)
+        self.description_index = TokenIndex(self.descriptions)
+        self.trigram_index = TrigramIndex(self.descriptions, trigram_budget)
+        self.fuzzy_index = FuzzyIndex(self.description_index)  # Derived from the word index, not maintained separately
+        self.indexes = {
+            "barcodes": self.barcode_index,
+            "barcode_lookup": self.barcode_lookup,
+            "item_codes": self.item_code_index,
+            "description_tokens": self.description_index,
+            "description_trigrams": self.trigram_index,
+        }
+        self.selection = Selection()
+
+    @classmethod
+    def for_config(cls, config):
+        """An empty catalog with the index options of the settings."""
+        return cls(trigram_budget=max(0, config.get_trigram_memory_budget()) * 2 ** 20)
+
+    @classmethod
+    def from_rows(cls, rows, use_sqlite, trigram_budget=0):
+        catalog = cls(trigram_budget)
+        catalog.extend(rows, use_sqlite)
+        return catalog
+
+    @property
+    def order(self):
+        """Row ids in barcode order."""
+        return self.barcode_index.ids
+
+    def index(self, column):
+        """
+        The sorted index of a column, built on first use: a text column ("barcodes",
+        "item_codes", "descriptions") or an integer one ("unit_prices", "uom_codes", ...).
+        """
+        index = self.indexes.get(column)
+        if index is None:
+            with self.lock:
+                index = self.indexes.get(column)
+                if index is None:
+                    index = (NumberIndex if column in NUMBER_COLUMNS else SortedKeyIndex)(getattr(self, column))
+                    index.build(range(len(self.item_codes)))
+                    self.indexes[column] = index
+        return index
+
+    def append(self, row):
+        """
+        Store one normalized row and return its row id; the caller holds `lock` and indexes
+        the row with `reindex`.
+        """
+        item_code, description, uom, unit_price, unit_cost, barcode, location, location_price = row
+        self.item_codes.append(item_code)
+        self.descriptions.append(description)
+        self.barcodes.append(barcode)
+        self.uom_codes.append(self.uoms.code(uom))
+        self.location_codes.append(self.locations.code(location))
+        self.unit_prices.append(to_fixed(unit_price))
+        self.unit_costs.append(to_fixed(unit_cost))
+        self.location_prices.append(to_fixed(location_price))
+        return len(self.item_codes) - 1
+
+    def extend(self, rows, use_sqlite):
+        """Append fetched rows and merge them into the barcode order."""
+        with self.lock:
+            first = len(self.item_codes)
+            shared = {}  # Rows of one item repeat its code and description; keep one copy of each
+            for row in rows:
+                item_code, description, uom, unit_price, unit_cost, barcode, location, location_price = normalize_row(row, use_sqlite)
+                self.append((
+                    shared.setdefault(item_code, item_code), shared.setdefault(description, description),
+                    uom, unit_price, unit_cost, barcode, location, location_price,
+                ))
+
+            added = range(first, len(self.item_codes))
+            for index in self.indexes.values():
+                index.add(added)
+            self.version += 1
+            return len(added)
+
+    def update(self, row_id, row):
+        """Overwrite a row in place; the caller re-sorts it with `reindex`."""
+        with self.lock:
+            for index in self.indexes.values():
+                index.discard(row_id)
+            item_code, description, uom, unit_price, unit_cost, barcode, location, location_price = row
+            self.item_codes[row_id] = item_code
+            self.descriptions[row_id] = description
+            self.barcodes[row_id] = barcode
+            self.uom_codes[row_id] = self.uoms.code(uom)
+            self.location_codes[row_id] = self.locations.code(location)
+            self.unit_prices[row_id] = to_fixed(unit_price)
+            self.unit_costs[row_id] = to_fixed(unit_cost)
+            self.location_prices[row_id] = to_fixed(location_price)
+            self.version += 1
+
+    def reindex(self, row_ids):
+        """Put updated or appended rows back at their position in every sorted index."""
+        with self.lock:
+            for index in self.indexes.values():
+                index.update(row_ids)
+            self.version += 1
+
+    def remove(self, row_ids):
+        """
+        Drop rows and compact the columns. Row ids above a removed row shift down.
+
+        Returns:
+            int: Number of rows removed.
+        """
+        with self.lock:
+            dropped = set(row_ids)
+            if not dropped:
+                return 0
+
+            count = len(self.item_codes)
+            kept = [row_id for row_id in range(count) if row_id not in dropped]
+            new_ids = array("q", [-1]) * count
+            for new_id, old_id in enumerate(kept):
+                new_ids[old_id] = new_id
+
+            # Columns are compacted in place, the indexes hold references to them
+            for column in (self.item_codes, self.descriptions, self.barcodes):
+                column[:] = [column[row_id] for row_id in kept]
+            for name in NUMBER_COLUMNS:
+                column = getattr(self, name)
+                column[:] = array(column.typecode, [column[row_id] for row_id in kept])
+            for index in self.indexes.values():
+                index.remap(new_ids)
+            self.selection.remap(new_ids)
+            self.version += 1
+            return count - len(kept)
+
+    def carry_selection(self, previous, row_ids=None, missing=None):
+        """
+        Select the rows of a reloaded catalog that were selected in `previous`, matched on
+        barcode, item code and UOM, with their copies.
+
+        Args:
+            row_ids: The row ids of `previous` to carry over; all of its selection by default.
+            missing: A list the row ids without a match are appended to, e.g. to carry them
+                again once the rest of a streamed catalog has arrived.
+
+        Returns:
+            int: Number of rows selected.
+        """
+        carried = 0
+        for old_id in previous.selection if row_ids is None else row_ids:
+            barcode = previous.barcodes[old_id]
+            key = previous.key(old_id)
+            found = False
+            for row_id in self.barcode_ids(barcode):
+                if self.barcodes[row_id] == barcode and self.key(row_id) == key:
+                    self.selection.add(row_id)
+                    self.selection.set_copies(row_id, previous.selection.copies_of(old_id))
+                    carried += 1
+                    found = True
+            if not found and missing is not None:
+                missing.append(old_id)
+        return carried
+
+    def in_order(self, row_ids, token=None):
+        """The given row ids in barcode (display) order."""
+        if len(row_ids) * 16 < len(self.order):
+            barcodes = self.barcodes
+            return sorted(row_ids, key=lambda row_id: (fold(barcodes[row_id]), row_id))
+        wanted = row_ids if isinstance(row_ids, (set, frozenset)) else set(row_ids)
+        ordered = []
+        for chunk in chunks(self.order, token):
+            ordered.extend(row_id for row_id in chunk if row_id in wanted)
+        return ordered
+
+    def prefix_ids(self, prefix, item_codes=True):
+        """
+        Row ids whose barcode (or item code) starts with the prefix: barcode matches in
+        barcode order, then the item code matches not already listed.
+        """
+        row_ids = list(self.barcode_index.prefix(prefix))
+        if item_codes:
+            code_ids = self.item_code_index.prefix(prefix)
+            if code_ids:
+                listed = set(row_ids)
+                row_ids.extend(row_id for row_id in code_ids if row_id not in listed)
+        return row_ids
+
+    def barcode_ids(self, code):
+        """Row ids of a barcode in any of its GTIN spellings, in display order."""
+        return self.in_order(self.barcode_lookup.lookup(code))
+
+    def item_rows(self, item_code):
+        """Row ids of every UOM of an item: one contiguous range of `item_code_index`, in O(log n)."""
+        return self.item_code_index.exact(item_code)
+
+    def siblings(self, row_ids):
+        """
+        Every row of the items the given rows belong to, in display order. Rows without an
+        item code (SQLite) are grouped by their barcode instead.
+        """
+        related = set()
+        for row_id in row_ids:
+            item_code = self.item_codes[row_id]
+            if item_code == MISSING:
+                related.update(self.barcode_lookup.lookup(self.barcodes[row_id]))
+            else:
+                related.update(self.item_rows(item_code))
+        return self.in_order(related)
+
+    def sibling_barcodes(self, item_code):
+        """The distinct barcodes of an item's UOM rows, e.g. for a label batch of the whole product."""
+        barcodes = self.barcodes
+        return list(dict.fromkeys(barcodes[row_id] for row_id in self.in_order(self.item_rows(item_code))))
+
+    def uom_search(self, keywords, item_codes=True, token=None):
+        """
+        Rows for "Get UOM", in display order.
+
+        With item codes, every row whose item code contains all keywords; without (SQLite),
+        every row with the first barcode in display order containing all keywords. Only the
+        distinct codes are searched, and each matching code brings its whole range of rows.
+        """
+        keywords = [keyword.lower() for keyword in keywords]
+        if not keywords:
+            return []
+        if not item_codes:
+            barcodes = self.barcode_index.containing(keywords, token)
+            return self.barcode_index.exact(barcodes[0]) if barcodes else []
+
+        matched = []
+        for item_code in self.item_code_index.containing(keywords, token):
+            matched.extend(self.item_rows(item_code))
+        return self.in_order(matched, token)
+
+    def narrow_prefix(self, row_ids, prefix, item_codes=True, token=None):
+        """The part of an earlier `prefix_ids` result that also matches a longer prefix, in the same order."""
+        prefix = fold(prefix)
+        barcodes = self.barcodes
+        codes = self.item_codes
+        narrowed = []
+        for chunk in chunks(row_ids, token):
+            narrowed.extend(
+                row_id for row_id in chunk
+                if fold(barcodes[row_id]).startswith(prefix) or (item_codes and fold(codes[row_id]).startswith(prefix))
+            )
+        return narrowed
+
+    def narrow_descriptions(self, row_ids, keywords, token=None):
+        """The rows of an earlier description result whose description contains every keyword."""
+        keywords = [keyword.lower() for keyword in keywords]
+        descriptions = self.descriptions
+        narrowed = []
+        for chunk in chunks(row_ids, token):
+            narrowed.extend(
+                row_id for row_id in chunk
+                if all(keyword in str(descriptions[row_id]).lower() for keyword in keywords)
+            )
+        return narrowed
+
+    def search_descriptions(self, keywords, token=None):
+        """Row ids, in display order, whose description contains every keyword."""
+        keywords = list(dict.fromkeys(keyword.lower() for keyword in keywords))
+        if not keywords:
+            return self.order
+        return self.in_order(intersect(self.description_matches(keyword, token) for keyword in keywords), token)
+
+    def description_matches(self, keyword, token=None):
+        if token is not None:
+            token.check()
+        # Trigrams pay off when the keyword's rarest trigram is rare; common words use the word index
+        estimate = self.trigram_index.estimate(keyword)
+        if estimate is not None and estimate * TRIGRAM_SHARE < len(self.order):
+            return self.trigram_index.matches(keyword)
+        return self.description_index.matches(keyword)
+
+    def rank(self, row_ids, keywords, first=100, popularity=None, token=None):
+        """
+        Order search results by relevance, best first.
+
+        Each keyword scores by how it matches the description (a whole word, the start of a
+        word, or inside a word), plus CODE_WEIGHT when the item code or barcode starts with
+        it; `popularity` (barcode -> labels printed) adds a logarithmic bonus. The word and
+        code matches of a large result come from the indexes as row id sets, so a row costs a
+        few set lookups; a small result splits its descriptions instead.
+        Equal scores keep the order of row_ids (the display order for search results). Only
+        the first `first` rows are selected with a bounded heap and sorted; the rest are
+        ranked when a later page asks for them.
+
+        Returns:
+            RankedView: The rows of row_ids in relevance order.
+        """
+        keywords = list(dict.fromkeys(keyword.lower() for keyword in keywords))
+        postings = self.description_index.postings
+        direct = len(row_ids) <= DIRECT_RANK_ROWS
+        levels = []
+        extra = {}
+        for keyword in keywords:
+            if token is not None:
+                token.check()
+            if not direct:
+                exact = set(postings.get(keyword, ()))
+                prefix = set()
+                for word, posting in postings.items():
+                    if word != keyword and word.startswith(keyword):
+                        prefix.update(posting)
+                levels.append((exact, prefix))
+            for row_id in set(self.item_code_index.prefix(keyword)).union(self.barcode_index.prefix(keyword)):
+                extra[row_id] = extra.get(row_id, 0) + CODE_WEIGHT
+        for barcode, printed in (popularity or {}).items():
+            if printed > 0:
+                for row_id in self.barcode_lookup.lookup(barcode):
+                    extra[row_id] = extra.get(row_id, 0) + POPULARITY_WEIGHT * log1p(printed)
+
+        if direct:
+            descriptions = self.descriptions
+            scores = {}  # UOM rows of an item share one description
+            entries = []
+            for position, row_id in enumerate(row_ids):
+                description = descriptions[row_id]
+                score = scores.get(description)
+                if score is None:
+                    score = scores[description] = self.description_score(description, keywords)
+                entries.append((-score - extra.get(row_id, 0), position, row_id))
+            return RankedView(self, entries, first)
+
+        base = SUBSTRING_SCORE * len(keywords)
+        exact_points = EXACT_WORD_SCORE - SUBSTRING_SCORE
+        prefix_points = PREFIX_WORD_SCORE - SUBSTRING_SCORE
+        entries = []
+        position = 0
+        for chunk in chunks(row_ids, token):
+            for row_id in chunk:
+                score = base + extra.get(row_id, 0)
+                for exact, prefix in levels:
+                    if row_id in exact:
+                        score += exact_points
+                    elif row_id in prefix:
+                        score += prefix_points
+                entries.append((-score, position, row_id))
+                position += 1
+        return RankedView(self, entries, first)
+
+    @staticmethod
+    def description_score(description, keywords):
+        """Word match points of one description, the same scale as `rank`."""
+        words = str(description).lower().split()
+        score = 0
+        for keyword in keywords:
+            if keyword in words:
+                score += EXACT_WORD_SCORE
+            elif any(word.startswith(keyword) for word in words):
+                score += PREFIX_WORD_SCORE
+            else:
+                score += SUBSTRING_SCORE
+        return score
+
+    def fuzzy_search(self, keywords, limit=100, token=None):
+        """
+        Typo-tolerant description search: every keyword must be within one edit (up to four
+        letters) or two edits (longer words) of a description word.
+
+        Returns:
+            list: Up to `limit` row ids, fewest total edits first, then in display order.
+        """
+        keywords = list(dict.fromkeys(keyword.lower() for keyword in keywords))
+        if not keywords:
+            return []
+
+        postings = self.description_index.postings
+        scores = None
+        for keyword in keywords:
+            if token is not None:
+                token.check()
+            max_distance = 1 if len(keyword) <= 4 else 2
+            best = {}
+            for word, distance in self.fuzzy_index.lookup(keyword, max_distance).items():
+                for row_id in postings[word]:
+                    if distance < best.get(row_id, max_distance + 1):
+                        best[row_id] = distance
+            if scores is None:
+                scores = best
+            else:
+                scores = {row_id: score + best[row_id] for row_id, score in scores.items() if row_id in best}
+            if not scores:
+                return []
+
+        barcodes = self.barcodes
+        ranked = nsmallest(limit, scores.items(), key=lambda entry: (entry[1], fold(barcodes[entry[0]]), entry[0]))
+        return [row_id for row_id, _ in ranked]
+
+    def key(self, row_id):
+        """(ItemCode, UOM) of a row, the key delta sync matches changed rows on."""
+        return self.item_codes[row_id], self.uoms.values[self.uom_codes[row_id]]
+
+    def row(self, row_id):
+        """The normalized row tuple of a row id, prices as floats."""
+        return (
+            self.item_codes[row_id],
+            self.descriptions[row_id],
+            self.uoms.values[self.uom_codes[row_id]],
+            from_fixed(self.unit_prices[row_id]),
+            from_fixed(self.unit_costs[row_id]),
+            self.barcodes[row_id],
+            self.locations.values[self.location_codes[row_id]],
+            from_fixed(self.location_prices[row_id]),
+        )
+
+    def view(self, row_ids):
+        return CatalogView(self, row_ids)
+
+    def row_id(self, index):
+        return self.order[index]
+
+    def all_ids(self):
+        """Every row id shown, in no particular order."""
+        return self.order
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.row(row_id) for row_id in self.order[index]]
+        return self.row(self.order[index])
+
+    def __iter__(self):
+        return (self.row(row_id) for row_id in self.order)
+
+    def memory_usage(self):
+        """Approximate bytes held by the catalog, including its strings."""
+        total = 0
+        seen = set()
+        for column in (self.item_codes, self.descriptions, self.barcodes, self.uoms.values, self.locations.values):
+            total += sys.getsizeof(column)
+            for value in column:
+                if id(value) not in seen:
+                    seen.add(id(value))
+                    total += sys.getsizeof(value)
+        total += sys.getsizeof(self.uoms.codes) + sys.getsizeof(self.locations.codes)
+        for column in (self.uom_codes, self.location_codes, self.unit_prices, self.unit_costs, self.location_prices):
+            total += sys.getsizeof(column)
+        for index in self.indexes.values():
+            if isinstance(index, NumberIndex):
+                total += sys.getsizeof(index.keys) + sys.getsizeof(index.ids)
+                if isinstance(index, GtinIndex):
+                    total += sys.getsizeof(index.texts.keys)
+            elif isinstance(index, SortedKeyIndex):
+                total += sys.getsizeof(index.keys) + sys.getsizeof(index.ids)
+                total += sum(sys.getsizeof(key) for key in index.keys if id(key) not in seen)
+            elif isinstance(index, HashKeyIndex):
+                total += sys.getsizeof(index.keys)
+                total += sum(sys.getsizeof(key) for key in index.keys if id(key) not in seen)
+                total += sum(sys.getsizeof(found) for found in index.keys.values() if not isinstance(found, int) or found > 256)
+            elif index.postings:
+                total += sys.getsizeof(index.postings)
+                total += sum(sys.getsizeof(token) + sys.getsizeof(posting) for token, posting in index.postings.items())
+        return total
+
+
+class CatalogView:
+    """A read-only sequence of catalog rows given by row ids, e.g. a search result."""
+
+    def __init__(self, catalog, row_ids):
+        self.catalog = catalog
+        self.row_ids = row_ids
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.catalog.row(row_id) for row_id in self.row_ids[index]]
+        return self.catalog.row(self.row_ids[index])
+
+    def __iter__(self):
+        return (self.catalog.row(row_id) for row_id in self.row_ids)
+
+    def row_id(self, index):
+        return self.row_ids[index]
+
+    def all_ids(self):
+        """Every row id of the view, in no particular order."""
+        return self.row_ids
+
+
+class RankedView(CatalogView):
+    """
+    Search results in relevance order, ranked lazily.
+
+    `entries` are (sort key, row id) tuples with the sort key first. The best `first` are
+    taken with a bounded heap up front; the others are heapified and popped only as far as
+    a later page reads.
+    """
+
+    def __init__(self, catalog, entries, first=100):
+        self.catalog = catalog
+        self.count = len(entries)
+        self.ranked_ids = [entry[-1] for entry in nsmallest(first, entries)]
+        self.entries = entries
+        self.rest = None
+
+    def ensure(self, end):
+        """Rank at least the first `end` rows."""
+        if end <= len(self.ranked_ids):
+            return
+        if self.rest is None:
+            taken = set(self.ranked_ids)
+            self.rest = [entry for entry in self.entries if entry[-1] not in taken]
+            heapify(self.rest)
+            self.entries = None
+        while len(self.ranked_ids) < end and self.rest:
+            self.ranked_ids.append(heappop(self.rest)[-1])
+
+    @property
+    def row_ids(self):
+        """Every row id in relevance order (ranks the whole result)."""
+        self.ensure(self.count)
+        return self.ranked_ids
+
+    def all_ids(self):
+        """Every row id of the result without ranking the rest of it."""
+        if self.rest is None:
+            return [entry[-1] for entry in self.entries]
+        return self.ranked_ids + [entry[-1] for entry in self.rest]
+
+    def row_id(self, index):
+        if index < 0:
+            index += self.count
+        self.ensure(index + 1)
+        return self.ranked_ids[index]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, _ = index.indices(self.count)
+            self.ensure(max(start, stop))
+            return [self.catalog.row(row_id) for row_id in self.ranked_ids[index]]
+        if index < 0:
+            index += self.count
+        self.ensure(index + 1)
+        return self.catalog.row(self.ranked_ids[index])
+
+    def __iter__(self):
+        return (self.catalog.row(row_id) for row_id in self.row_ids)
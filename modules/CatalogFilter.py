@@ -0,0 +1,249 @@
+import math
+import re
+from modules.Catalog import NULL_PRICE, to_fixed
+from modules.CatalogIndex import fold, intersect
+from modules.CatalogSearch import chunks
+
+# Field-qualified search box queries, e.g. `code:ABC* desc:milk price:2..5 uom:CTN`.
+# Every term maps to an index lookup; the planner starts from the most selective one.
+
+TOKEN = re.compile(r'(?:([A-Za-z]+):)?(?:"([^"]*)"|(\S+))')
+HIGHEST_PRICE = 2 ** 63 - 1
+INTERSECT_RATIO = 4  # Look a term up when it matches at most this many rows per candidate, else check each candidate
+
+
+class QueryError(ValueError):
+    """A field term that cannot be understood, e.g. `price:abc`."""
+
+
+class KeyTerm:
+    """`code:` / `barcode:` — an exact code, or a prefix when it ends with `*`."""
+
+    def __init__(self, text, column, value):
+        self.text = text
+        self.column = column
+        self.prefix = value.endswith("*")
+        self.value = fold(value.rstrip("*"))
+
+    def estimate(self, catalog):
+        index = catalog.index(self.column)
+        return len(index.prefix(self.value)) if self.prefix else len(index.exact(self.value))
+
+    def rows(self, catalog, token=None):
+        index = catalog.index(self.column)
+        return index.prefix(self.value) if self.prefix else index.exact(self.value)
+
+    def accepts(self, catalog):
+        column = getattr(catalog, self.column)
+        value = self.value
+        if self.prefix:
+            return lambda row_id: fold(column[row_id]).startswith(value)
+        return lambda row_id: fold(column[row_id]) == value
+
+
+class DescriptionTerm:
+    """`desc:` and plain words — every keyword inside the description; a quoted phrase must appear as is."""
+
+    def __init__(self, text, keywords, phrase=None):
+        self.text = text
+        self.keywords = list(dict.fromkeys(fold(keyword) for keyword in keywords))
+        self.phrase = fold(phrase) if phrase and len(self.keywords) > 1 else None
+
+    def estimate(self, catalog):
+        postings = catalog.description_index.postings
+        estimates = []
+        for keyword in self.keywords:
+            if keyword in postings:
+                estimates.append(len(postings[keyword]))
+            else:
+                trigrams = catalog.trigram_index.estimate(keyword)
+                estimates.append(trigrams if trigrams is not None else len(catalog))
+        return min(estimates, default=len(catalog))
+
+    def rows(self, catalog, token=None):
+        matched = intersect(catalog.description_matches(keyword, token) for keyword in self.keywords)
+        if self.phrase is None:
+            return matched
+        accept = self.accepts(catalog)
+        return [row_id for chunk in chunks(list(matched), token) for row_id in chunk if accept(row_id)]
+
+    def accepts(self, catalog):
+        descriptions = catalog.descriptions
+        keywords = self.keywords
+        phrase = self.phrase
+        if phrase is not None:
+            return lambda row_id: phrase in str(descriptions[row_id]).lower()
+        return lambda row_id: all(keyword in str(descriptions[row_id]).lower() for keyword in keywords)
+
+
+class RangeTerm:
+    """`price:2..5`, `price:2..`, `price:..5` or `price:2.50` — the unit price, from its sorted index."""
+
+    def __init__(self, text, column, value):
+        self.text = text
+        self.column = column
+        low, separator, high = value.partition("..")
+        if not separator:
+            high = low
+        if not (low or high):
+            raise QueryError(f"Invalid price '{value}', expected e.g. price:2..5")
+        self.low = self.bound(low, value) if low else NULL_PRICE + 1  # Open ranges never include a missing price
+        self.high = self.bound(high, value) if high else HIGHEST_PRICE
+
+    @staticmethod
+    def bound(text, value):
+        """A price bound as a fixed-point integer; `inf`, `nan` and prices too large to store are rejected."""
+        try:
+            price = float(text)
+        except ValueError:
+            raise QueryError(f"Invalid price '{value}', expected e.g. price:2..5")
+        if not math.isfinite(price):
+            raise QueryError(f"Invalid price '{value}', expected e.g. price:2..5")
+        fixed = to_fixed(price)
+        if not NULL_PRICE < fixed <= HIGHEST_PRICE:
+            raise QueryError(f"Price '{value}' is out of range")
+        return fixed
+
+    def estimate(self, catalog):
+        return catalog.index(self.column).count(self.low, self.high)
+
+    def rows(self, catalog, token=None):
+        return catalog.index(self.column).range(self.low, self.high)
+
+    def accepts(self, catalog):
+        column = getattr(catalog, self.column)
+        low, high = self.low, self.high
+        return lambda row_id: low <= column[row_id] <= high
+
+
+class CodeTerm:
+    """`uom:` / `loc:` — interned values, case-insensitive, a prefix when ending with `*`."""
+
+    def __init__(self, text, table, column, value):
+        self.text = text
+        self.table = table
+        self.column = column
+        self.prefix = value.endswith("*")
+        self.value = fold(value.rstrip("*"))
+
+    def codes(self, catalog):
+        table = getattr(catalog, self.table)
+        if self.prefix:
+            return [code for value, code in table.codes.items() if fold(value).startswith(self.value)]
+        return [code for value, code in table.codes.items() if fold(value) == self.value]
+
+    def estimate(self, catalog):
+        index = catalog.index(self.column)
+        return sum(index.count(code, code) for code in self.codes(catalog))
+
+    def rows(self, catalog, token=None):
+        index = catalog.index(self.column)
+        codes = self.codes(catalog)
+        if len(codes) == 1:
+            return index.exact(codes[0])
+        matched = []
+        for code in codes:
+            matched.extend(index.exact(code))
+        return matched
+
+    def accepts(self, catalog):
+        column = getattr(catalog, self.column)
+        codes = set(self.codes(catalog))
+        return lambda row_id: column[row_id] in codes
+
+
+FIELDS = {
+    "code": lambda text, value: KeyTerm(text, "item_codes", value),
+    "item": lambda text, value: KeyTerm(text, "item_codes", value),
+    "barcode": lambda text, value: KeyTerm(text, "barcodes", value),
+    "bc": lambda text, value: KeyTerm(text, "barcodes", value),
+    "desc": lambda text, value: DescriptionTerm(text, value.split(), value),
+    "description": lambda text, value: DescriptionTerm(text, value.split(), value),
+    "price": lambda text, value: RangeTerm(text, "unit_prices", value),
+    "uom": lambda text, value: CodeTerm(text, "uoms", "uom_codes", value),
+    "loc": lambda text, value: CodeTerm(text, "locations", "location_codes", value),
+    "location": lambda text, value: CodeTerm(text, "locations", "location_codes", value),
+}
+
+
+class FilterQuery:
+    """
+    A parsed search box query.
+
+    Attributes:
+        terms: The terms a row must all match.
+        qualified: True when at least one `field:` term was used; plain text keeps the
+            regular description search.
+    """
+
+    def __init__(self, text, terms, qualified):
+        self.text = text
+        self.terms = terms
+        self.qualified = qualified
+
+
+def parse_query(text):
+    """
+    Parse `field:value` terms and plain words. Unknown fields are plain words, so a
+    description containing a colon can still be searched.
+
+    Raises:
+        QueryError: A known field with an empty or invalid value.
+    """
+    terms = []
+    plain = []
+    qualified = False
+    for match in TOKEN.finditer(text):
+        field, quoted, bare = match.groups()
+        value = quoted if quoted is not None else bare
+        factory = FIELDS.get(field.lower()) if field else None
+        if factory is None:
+            if field:
+                value = f"{field}:{value}"
+            if quoted is not None and not field:
+                terms.append(DescriptionTerm(match.group(0), value.split(), value))
+            else:
+                plain.extend(value.split())
+            continue
+        if not value.strip():
+            raise QueryError(f"'{field}:' needs a value")
+        terms.append(factory(match.group(0), value.strip()))
+        qualified = True
+    if plain:
+        terms.append(DescriptionTerm(" ".join(plain), plain))
+    return FilterQuery(text, terms, qualified)
+
+
+def plan(catalog, terms):
+    """The terms with their estimated row counts, most selective first."""
+    return sorted(((term, term.estimate(catalog)) for term in terms), key=lambda entry: entry[1])
+
+
+def run_query(catalog, terms, token=None):
+    """
+    Row ids matching every term, in display order.
+
+    The most selective term is looked up first. Each further term is looked up and
+    intersected when it is selective compared with the candidates left, and otherwise
+    checked row by row on the candidates only.
+    """
+    if not terms:
+        return catalog.order
+    planned = plan(catalog, terms)
+    candidates = planned[0][0].rows(catalog, token)
+    for term, estimate in planned[1:]:
+        if not candidates:
+            return []
+        if token is not None:
+            token.check()
+        if estimate <= len(candidates) * INTERSECT_RATIO:
+            candidates = intersect([candidates, term.rows(catalog, token)])
+        else:
+            accept = term.accepts(catalog)
+            candidates = [row_id for chunk in chunks(list(candidates), token) for row_id in chunk if accept(row_id)]
+    return catalog.in_order(candidates, token)
+
+
+def explain(catalog, terms):
+    """One line describing the plan, for the log."""
+    return " -> ".join(f"{term.text} (~{estimate})" for term, estimate in plan(catalog, terms))
@@ -0,0 +1,725 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from heapq import merge
+from itertools import accumulate
+
+PREFIX_END = chr(0x10FFFF)  # Sorts after every character a key can continue with
+
+
+def fold(value):
+    """Lowercased search key; reuses the original string when it is already lowercase (e.g. digits)."""
+    text = str(value)
+    key = text.lower()
+    return text if key == text else key
+
+
+class SortedKeyIndex:
+    """
+    Row ids of a catalog text column sorted by their lowercased value.
+
+    `keys` holds the pre-lowercased values in sorted order and `ids` the matching row ids,
+    so an exact or range lookup is two bisects and a slice. The index is built once when
+    the catalog loads and kept up to date as rows are added, changed or removed. Rows whose
+    value is `skip` (a placeholder such as the missing item code of SQLite rows) are left
+    out.
+    """
+
+    REBUILD_RATIO = 0.05  # Re-sort everything when more than this share of the rows changed
+
+    key = staticmethod(fold)  # Sort key of a column value
+
+    @staticmethod
+    def store(keys):
+        """The container `keys` is kept in."""
+        return list(keys)
+
+    def __init__(self, column, skip=None):
+        self.column = column  # The catalog's list of values by row id, read at build/update time
+        self.skip = skip
+        self.keys = self.store(())
+        self.ids = array("I")
+        self.joined = None  # Cache of distinct(), dropped on every change
+
+    def pairs(self, row_ids):
+        """
+        Sorted (key, row id) pairs of the rows. Equal values share one key object, so rows
+        of one item do not each hold their own lowercased copy of its code.
+        """
+        column = self.column
+        skip = self.skip
+        keys = {}
+        pairs = []
+        for row_id in row_ids:
+            value = column[row_id]
+            if value == skip:
+                continue
+            key = keys.get(value)
+            if key is None:
+                key = keys[value] = self.key(value)
+            pairs.append((key, row_id))
+        pairs.sort()
+        return pairs
+
+    def build(self, row_ids):
+        self.joined = None
+        pairs = self.pairs(row_ids)
+        self.keys = self.store(key for key, _ in pairs)
+        self.ids = array("I", [row_id for _, row_id in pairs])
+
+    def add(self, row_ids):
+        """Index newly appended rows."""
+        self.joined = None
+        self.merge(self.pairs(row_ids))
+
+    def merge(self, added):
+        """Merge sorted (key, row id) pairs of newly appended rows into the index."""
+        if not added:
+            return
+        if not self.keys or added[0][0] >= self.keys[-1]:
+            self.keys.extend(key for key, _ in added)
+            self.ids.extend(row_id for _, row_id in added)
+            return
+        pairs = list(merge(zip(self.keys, self.ids), added))
+        self.keys = self.store(key for key, _ in pairs)
+        self.ids = array("I", [row_id for _, row_id in pairs])
+
+    def discard(self, row_id):
+        """Nothing to do before a row changes; `update` finds the row by id."""
+
+    def update(self, row_ids):
+        """Re-sort rows whose value changed (or that were appended) since they were indexed."""
+        self.joined = None
+        row_ids = set(row_ids)
+        if not row_ids:
+            return
+        if len(row_ids) > len(self.column) * self.REBUILD_RATIO:
+            self.build(range(len(self.column)))
+            return
+
+        # One pass finds the old positions (appended rows have none yet)
+        for position in reversed([position for position, row_id in enumerate(self.ids) if row_id in row_ids]):
+            del self.ids[position]
+            del self.keys[position]
+
+        for key, row_id in self.pairs(row_ids):
+            position = bisect_right(self.keys, key)
+            self.keys.insert(position, key)
+            self.ids.insert(position, row_id)
+
+    def remap(self, new_ids):
+        """Follow a compaction of the catalog; `new_ids[old]` is the new row id or -1 when removed."""
+        kept = [position for position, row_id in enumerate(self.ids) if new_ids[row_id] >= 0]
+        self.joined = None
+        self.keys = self.store(self.keys[position] for position in kept)
+        self.ids = array("I", [new_ids[self.ids[position]] for position in kept])
+
+    def bounds(self, low, high):
+        """Positions of the keys k with low <= k <= high."""
+        return bisect_left(self.keys, low), bisect_right(self.keys, high)
+
+    def exact(self, value):
+        """Row ids whose lowercased value equals `value`, in O(log n)."""
+        key = fold(value)
+        start, end = self.bounds(key, key)
+        return self.ids[start:end]
+
+    def range(self, low, high):
+        """Row ids whose lowercased value lies between `low` and `high` (inclusive), in key order."""
+        start, end = self.bounds(fold(low), fold(high))
+        return self.ids[start:end]
+
+    def prefix(self, value):
+        """Row ids whose lowercased value starts with `value`, in key order; O(log n + k)."""
+        key = fold(value)
+        start = bisect_left(self.keys, key)
+        end = bisect_left(self.keys, key + PREFIX_END, start)
+        return self.ids[start:end]
+
+    def distinct(self):
+        """
+        The distinct keys in order, their offsets and the keys joined into one text, so a
+        substring scan runs in str.find instead of a loop over every row. Cached until the
+        index changes.
+        """
+        if self.joined is None:
+            keys = list(dict.fromkeys(self.keys))
+            starts = array("q", accumulate((len(key) + 1 for key in keys), initial=0))
+            self.joined = (keys, starts, "\n".join(keys))
+        return self.joined
+
+    def containing(self, keywords, token=None):
+        """The distinct keys that contain every keyword, in key order."""
+        keywords = sorted({fold(keyword) for keyword in keywords}, key=len, reverse=True)
+        if not keywords:
+            return []
+        keys, starts, text = self.distinct()
+        first, rest = keywords[0], keywords[1:]
+        found = []
+        position = text.find(first)
+        while position >= 0:
+            if token is not None and len(found) % 4096 == 4095:
+                token.check()
+            ordinal = bisect_right(starts, position) - 1
+            key = keys[ordinal]
+            if all(keyword in key for keyword in rest):
+                found.append(key)
+            position = text.find(first, starts[ordinal + 1])  # Next key
+        return found
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class NumberIndex(SortedKeyIndex):
+    """
+    Row ids of an integer catalog column (fixed-point prices, UOM or location codes) sorted
+    by value, for range and exact lookups. The keys are a typed array.
+    """
+
+    key = staticmethod(int)
+
+    @staticmethod
+    def store(keys):
+        return array("q", keys)
+
+    def exact(self, value):
+        start, end = self.bounds(value, value)
+        return self.ids[start:end]
+
+    def range(self, low, high):
+        start, end = self.bounds(low, high)
+        return self.ids[start:end]
+
+    def count(self, low, high):
+        """Number of rows with low <= value <= high, in O(log n)."""
+        start, end = self.bounds(low, high)
+        return end - start
+
+
+class HashKeyIndex:
+    """
+    Dictionary from the lowercased, trimmed value of a text column to its row ids, for O(1)
+    exact lookups such as a scanned barcode. A unique value maps to its row id, a repeated
+    one to an ascending tuple of row ids.
+    """
+
+    def __init__(self, column):
+        self.column = column
+        self.keys = {}
+
+    @staticmethod
+    def normalize(value):
+        return fold(value).strip()
+
+    def variants(self, value):
+        """The keys a looked up value may be stored under."""
+        return (self.normalize(value),)
+
+    def insert(self, key, row_id):
+        found = self.keys.get(key)
+        if found is None:
+            self.keys[key] = row_id
+        elif isinstance(found, int):
+            if found != row_id:
+                self.keys[key] = (found, row_id) if found < row_id else (row_id, found)
+        elif row_id not in found:
+            self.keys[key] = tuple(sorted(found + (row_id,)))
+
+    def build(self, row_ids):
+        self.keys = {}
+        self.add(row_ids)
+
+    def add(self, row_ids):
+        column = self.column
+        for row_id in row_ids:
+            self.insert(self.normalize(column[row_id]), row_id)
+
+    def discard(self, row_id):
+        """Forget a row before its value is overwritten."""
+        key = self.normalize(self.column[row_id])
+        found = self.keys.get(key)
+        if found == row_id:
+            del self.keys[key]
+        elif isinstance(found, tuple) and row_id in found:
+            rest = tuple(other for other in found if other != row_id)
+            self.keys[key] = rest[0] if len(rest) == 1 else rest
+
+    def update(self, row_ids):
+        """Index changed (already discarded) or appended rows under their current value."""
+        self.add(row_ids)
+
+    def remap(self, new_ids):
+        keys = {}
+        for key, found in self.keys.items():
+            mapped = [new_ids[row_id] for row_id in ((found,) if isinstance(found, int) else found) if new_ids[row_id] >= 0]
+            if mapped:
+                keys[key] = mapped[0] if len(mapped) == 1 else tuple(mapped)
+        self.keys = keys
+
+    def lookup(self, value):
+        """Row ids whose value equals `value` (case-insensitive), ascending."""
+        matched = []
+        for key in self.variants(value):
+            found = self.keys.get(key)
+            if found is not None:
+                matched.append((found,) if isinstance(found, int) else found)
+        if len(matched) <= 1:
+            return matched[0] if matched else ()
+        return tuple(sorted(set().union(*matched)))
+
+    def __len__(self):
+        return len(self.keys)
+
+
+GTIN_BODY_LENGTHS = (7, 11, 12, 13)  # GTIN-8, UPC-A (GTIN-12), EAN-13 and GTIN-14 without their check digit
+
+
+def check_digit(body):
+    """
+    GS1 check digit of a GTIN without it: weights 3, 1, 3, ... from the right. The digit
+    sums are taken over byte slices, so the loop runs in C rather than digit by digit.
+    """
+    digits = body.encode("ascii")
+    tripled = digits[-1::-2]
+    single = digits[-2::-2]
+    total = 3 * (sum(tripled) - 48 * len(tripled)) + sum(single) - 48 * len(single)
+    return (10 - total % 10) % 10
+
+
+GTIN_MAX = 2 ** 63 - 1  # Numeric barcodes up to this value are kept in the typed arrays
+
+
+class GtinIndex(NumberIndex):
+    """
+    Barcode lookup that treats the usual spellings of one GTIN as the same code.
+
+    A numeric barcode is stored under its integer value, so leading zeros do not matter
+    (a UPC-A scanned as a 13-digit EAN with a leading zero finds the 12-digit code). The
+    check digit is handled on the query side: a query whose last digit is a valid check
+    digit is also looked up without it (the code may be stored without one), and a query
+    that may lack its check digit is also looked up with the computed one. Each barcode is
+    stored once, and a scan costs at most three lookups of O(log n).
+
+    The integer values are kept sorted in a typed array next to their row ids, about 12
+    bytes a row where a dictionary costs over 100. Other barcodes (letters, or digits too
+    long for 64 bits) are matched case-insensitively as text through `texts`.
+    """
+
+    def __init__(self, column):
+        super().__init__(column)
+        self.texts = HashKeyIndex(column)
+
+    @staticmethod
+    def number(value):
+        """The integer a numeric barcode is stored under, None for any other barcode."""
+        text = str(value).strip()
+        if text.isascii() and text.isdigit():
+            number = int(text)
+            if number <= GTIN_MAX:
+                return number
+        return None
+
+    def split(self, row_ids):
+        """Sorted (number, row id) pairs of the numeric barcodes, and the row ids of the others."""
+        column = self.column
+        numbers = []
+        texts = []
+        for row_id in row_ids:
+            number = self.number(column[row_id])
+            if number is None:
+                texts.append(row_id)
+            else:
+                numbers.append((number, row_id))
+        numbers.sort()
+        return numbers, texts
+
+    def build(self, row_ids):
+        numbers, texts = self.split(row_ids)
+        self.keys = self.store(key for key, _ in numbers)
+        self.ids = array("I", [row_id for _, row_id in numbers])
+        self.texts.build(texts)
+
+    def add(self, row_ids):
+        numbers, texts = self.split(row_ids)
+        self.merge(numbers)
+        self.texts.add(texts)
+
+    def discard(self, row_id):
+        """Forget a text barcode before its value is overwritten; numeric ones are found by id in `update`."""
+        self.texts.discard(row_id)
+
+    def update(self, row_ids):
+        row_ids = set(row_ids)
+        if not row_ids:
+            return
+        if len(row_ids) > len(self.column) * self.REBUILD_RATIO:
+            self.build(range(len(self.column)))
+            return
+        for position in reversed([position for position, row_id in enumerate(self.ids) if row_id in row_ids]):
+            del self.ids[position]
+            del self.keys[position]
+        numbers, texts = self.split(row_ids)
+        for key, row_id in numbers:
+            position = bisect_right(self.keys, key)
+            self.keys.insert(position, key)
+            self.ids.insert(position, row_id)
+        self.texts.add(texts)
+
+    def remap(self, new_ids):
+        super().remap(new_ids)
+        self.texts.remap(new_ids)
+
+    def variants(self, value):
+        """The keys a looked up value may be stored under: integers, or its lowercased text."""
+        text = str(value).strip()
+        number = self.number(text)
+        if number is None:
+            return (fold(text),)
+        keys = [number]
+        body = text[:-1]
+        if len(body) in GTIN_BODY_LENGTHS and check_digit(body) == int(text[-1]):
+            keys.append(int(body))
+        if len(text) in GTIN_BODY_LENGTHS:
+            keys.append(number * 10 + check_digit(text))
+        return keys
+
+    def lookup(self, value):
+        """Row ids stored under any spelling of `value`, ascending."""
+        matched = []
+        for key in self.variants(value):
+            if isinstance(key, int):
+                start, end = self.bounds(key, key)
+                if start < end:
+                    matched.append(self.ids[start:end])
+            else:
+                found = self.texts.keys.get(key)
+                if found is not None:
+                    matched.append((found,) if isinstance(found, int) else found)
+        if len(matched) == 1 and len(matched[0]) == 1:
+            return tuple(matched[0])
+        return tuple(sorted(set().union(*matched)))
+
+    def __len__(self):
+        return len(self.ids) + len(self.texts)
+
+
+class TokenIndex:
+    """
+    Inverted index from the whitespace-separated, lowercased words of a text column to
+    posting lists (ascending row id arrays).
+
+    A keyword typed in the search bar never contains whitespace, so it occurs in a value
+    exactly when it occurs inside one of the value's words. A keyword that is a whole word
+    is answered from its posting list; a partial word (e.g. "choc" in "chocolate") unions
+    the posting lists of the vocabulary words containing it, a scan over the distinct words
+    instead of every row. Multi-keyword queries intersect the lists smallest first.
+    """
+
+    REBUILD_RATIO = 0.05
+
+    def __init__(self, column):
+        self.column = column
+        self.postings = {}
+
+    @staticmethod
+    def tokenize(value):
+        return set(str(value).lower().split())
+
+    def build(self, row_ids):
+        self.postings = {}
+        self.add(row_ids)
+
+    def add(self, row_ids):
+        """Index appended rows; their ids are larger than every indexed id, so lists stay sorted."""
+        postings = self.postings
+        column = self.column
+        cache = {}  # Every UOM row of an item repeats its description
+        for row_id in row_ids:
+            value = column[row_id]
+            tokens = cache.get(value)
+            if tokens is None:
+                tokens = cache[value] = self.tokenize(value)
+            for token in tokens:
+                posting = postings.get(token)
+                if posting is None:
+                    posting = postings[token] = array("I")
+                posting.append(row_id)
+
+    def discard(self, row_id):
+        """Drop a row under its current value, before the value is overwritten."""
+        for token in self.tokenize(self.column[row_id]):
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            position = bisect_left(posting, row_id)
+            if position < len(posting) and posting[position] == row_id:
+                del posting[position]
+                if not posting:
+                    del self.postings[token]
+
+    def update(self, row_ids):
+        """Index rows whose value was overwritten (after `discard`) or appended out of order."""
+        row_ids = set(row_ids)
+        if len(row_ids) > len(self.column) * self.REBUILD_RATIO:
+            self.build(range(len(self.column)))
+            return
+        for row_id in row_ids:
+            for token in self.tokenize(self.column[row_id]):
+                posting = self.postings.get(token)
+                if posting is None:
+                    posting = self.postings[token] = array("I")
+                position = bisect_left(posting, row_id)
+                if position == len(posting) or posting[position] != row_id:
+                    posting.insert(position, row_id)
+
+    def remap(self, new_ids):
+        postings = {}
+        for token, posting in self.postings.items():
+            posting = array("I", [new_ids[row_id] for row_id in posting if new_ids[row_id] >= 0])
+            if posting:
+                postings[token] = posting
+        self.postings = postings
+
+    def matches(self, keyword):
+        """Row ids whose value contains the keyword (no whitespace), as a posting list or a set."""
+        partial = [posting for token, posting in self.postings.items() if keyword in token and token != keyword]
+        exact = self.postings.get(keyword)
+        if not partial:
+            return exact if exact is not None else ()
+        matched = set(exact) if exact is not None else set()
+        for posting in partial:
+            matched.update(posting)
+        return matched
+
+    def search(self, keywords):
+        """
+        Row ids whose value contains every keyword.
+
+        Returns:
+            Sequence of row ids (unordered when more than one list was involved).
+        """
+        return intersect(self.matches(keyword) for keyword in dict.fromkeys(keyword.lower() for keyword in keywords))
+
+
+class TrigramIndex:
+    """
+    Posting lists of the three-character fragments of every word of a text column, for
+    substring search in the middle of words ("choc" in "darkchocolate").
+
+    A keyword's candidates are the rows holding all of its trigrams (intersected smallest
+    list first); each candidate is then checked with a plain substring test. The index
+    stops and frees itself once its estimated size passes `budget` bytes, so low-memory
+    tills fall back to the word index.
+    """
+
+    ENTRY_BYTES = 4  # One row id in a posting array
+    LIST_BYTES = 150  # Dict slot, key string and array header of one trigram
+
+    def __init__(self, column, budget):
+        self.column = column
+        self.budget = budget
+        self.postings = {}
+        self.size = 0
+        self.enabled = budget > 0
+
+    @staticmethod
+    def trigrams(value):
+        return {word[i:i + 3] for word in str(value).lower().split() for i in range(len(word) - 2)}
+
+    def disable(self):
+        self.enabled = False
+        self.postings = {}
+        self.size = 0
+
+    def build(self, row_ids):
+        self.postings = {}
+        self.size = 0
+        self.enabled = self.budget > 0
+        self.add(row_ids)
+
+    def add(self, row_ids):
+        if not self.enabled:
+            return
+        postings = self.postings
+        column = self.column
+        cache = {}
+        size = self.size
+        for row_id in row_ids:
+            value = column[row_id]
+            grams = cache.get(value)
+            if grams is None:
+                grams = cache[value] = self.trigrams(value)
+            for gram in grams:
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array("I")
+                    size += self.LIST_BYTES
+                posting.append(row_id)
+            size += len(grams) * self.ENTRY_BYTES
+            if size > self.budget:
+                self.disable()
+                return
+        self.size = size
+
+    def discard(self, row_id):
+        if not self.enabled:
+            return
+        for gram in self.trigrams(self.column[row_id]):
+            posting = self.postings.get(gram)
+            if posting is None:
+                continue
+            position = bisect_left(posting, row_id)
+            if position < len(posting) and posting[position] == row_id:
+                del posting[position]
+                self.size -= self.ENTRY_BYTES
+
+    def update(self, row_ids):
+        if not self.enabled:
+            return
+        for row_id in set(row_ids):
+            for gram in self.trigrams(self.column[row_id]):
+                posting = self.postings.get(gram)
+                if posting is None:
+                    posting = self.postings[gram] = array("I")
+                    self.size += self.LIST_BYTES
+                position = bisect_left(posting, row_id)
+                if position == len(posting) or posting[position] != row_id:
+                    posting.insert(position, row_id)
+                    self.size += self.ENTRY_BYTES
+        if self.size > self.budget:
+            self.disable()
+
+    def remap(self, new_ids):
+        if not self.enabled:
+            return
+        for gram, posting in list(self.postings.items()):
+            self.postings[gram] = array("I", [new_ids[row_id] for row_id in posting if new_ids[row_id] >= 0])
+
+    def estimate(self, keyword):
+        """Upper bound of the rows containing the keyword (its rarest trigram), None if unusable."""
+        if not self.enabled or len(keyword) < 3:
+            return None
+        return min(len(self.postings.get(keyword[i:i + 3], ())) for i in range(len(keyword) - 2))
+
+    def matches(self, keyword):
+        """
+        Row ids whose value contains the keyword (at least three characters, no whitespace).
+
+        Returns:
+            list: Matching row ids, or None when the index cannot answer (disabled, short keyword).
+        """
+        if not self.enabled or len(keyword) < 3:
+            return None
+        candidates = intersect(self.postings.get(keyword[i:i + 3], ()) for i in range(len(keyword) - 2))
+        column = self.column
+        return [row_id for row_id in candidates if keyword in str(column[row_id]).lower()]
+
+
+def intersect(lists):
+    """
+    Intersection of row id collections, smallest first. Stops at the first empty one.
+
+    Returns:
+        The single collection as is, or a set.
+    """
+    collected = []
+    for matched in lists:
+        if not matched:
+            return ()
+        collected.append(matched)
+    if not collected:
+        return ()
+    if len(collected) == 1:
+        return collected[0]
+
+    collected.sort(key=len)
+    result = set(collected[0])
+    for matched in collected[1:]:
+        result.intersection_update(matched)
+        if not result:
+            break
+    return result
+
+
+def edit_distance(first, second, limit):
+    """Optimal string alignment distance (a transposition counts as one edit), or limit + 1 once it exceeds limit."""
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(second) + 1))
+    for i, char in enumerate(first, 1):
+        current = [i] + [0] * len(second)
+        for j, other in enumerate(second, 1):
+            cost = 0 if char == other else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and i > 1 and j > 1 and char == second[j - 2] and first[i - 2] == other:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class FuzzyIndex:
+    """
+    Symmetric-delete dictionary over the vocabulary of a TokenIndex, for typo-tolerant search.
+
+    Every word is stored under each string obtained by deleting up to MAX_DISTANCE of its
+    characters. Deleting up to the same number of characters from a typed word and looking
+    those strings up yields every vocabulary word within that edit distance (plus a few
+    that a distance check then drops), without comparing against the whole vocabulary.
+    The dictionary is built on first use and picks up new words on later lookups.
+    """
+
+    MAX_DISTANCE = 2
+    MAX_WORD_LENGTH = 24  # Longer "words" (codes, run-together text) are not worth their deletes
+
+    def __init__(self, token_index):
+        self.token_index = token_index
+        self.words = set()
+        self.deletes = {}
+
+    @staticmethod
+    def variants(word, distance):
+        """The word and every string made by deleting up to `distance` characters from it."""
+        result = {word}
+        frontier = {word}
+        for _ in range(distance):
+            frontier = {text[:i] + text[i + 1:] for text in frontier for i in range(len(text))}
+            result |= frontier
+        return result
+
+    def refresh(self):
+        new_words = self.token_index.postings.keys() - self.words
+        deletes = self.deletes
+        for word in new_words:
+            if len(word) > self.MAX_WORD_LENGTH:
+                continue
+            for variant in self.variants(word, self.MAX_DISTANCE):
+                words = deletes.get(variant)
+                if words is None:
+                    deletes[variant] = [word]
+                else:
+                    words.append(word)
+        self.words |= new_words
+
+    def lookup(self, keyword, max_distance):
+        """
+        Vocabulary words within `max_distance` edits of the keyword.
+
+        Returns:
+            dict: word -> edit distance
+        """
+        self.refresh()
+        max_distance = min(max_distance, self.MAX_DISTANCE)
+        postings = self.token_index.postings
+        found = {}
+        for variant in self.variants(keyword, max_distance):
+            for word in self.deletes.get(variant, ()):
+                if word in found or word not in postings:
+                    continue  # Checked already, or no longer in the catalog
+                distance = edit_distance(keyword, word, max_distance)
+                if distance <= max_distance:
+                    found[word] = distance
+        return found
@@ -0,0 +1,166 @@
+import re
+from modules.logger_config import setup_logger
+
+DEFAULT_LOCATION = "HQ"  # Location of a row whose item has no POS price for the location
+
+# Columns of the SQL Server catalog row, in the order the rest of the application unpacks them
+ITEM_COLUMNS = (
+    ("ItemCode", "u.ItemCode"),
+    ("DescriptionWithUOM", "i.Description"),
+    ("UOM", "u.UOM"),
+    ("DefaultUnitPrice", "u.Price"),
+    ("Cost", "u.Cost"),
+    ("Barcode", "ISNULL(NULLIF(u.BarCode, ''), i.ItemCode)"),
+    ("Location", f"ISNULL(p.Location, '{DEFAULT_LOCATION}')"),
+    ("PosUnitPrice", "ISNULL(p.Price, u.Price)"),
+)
+
+SQLITE_ITEMS_QUERY = "SELECT barCode, name, price FROM Tbl_Plu;"
+
+IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]{0,127}")
+
+
+def select_list(skip=()):
+    """SELECT list of the catalog columns; skipped columns are returned as NULL so row positions stay fixed."""
+    return ",\n            ".join(
+        f"NULL AS {name}" if name in skip else f"{expression} AS {name}"
+        for name, expression in ITEM_COLUMNS
+    )
+
+
+def quote_identifier(name):
+    """
+    A column name from the settings as a bracketed SQL Server identifier.
+
+    Raises:
+        ValueError: The name is not a plain identifier (letters, digits, underscores).
+    """
+    if not isinstance(name, str) or not IDENTIFIER.fullmatch(name):
+        raise ValueError(f"Invalid column name: {name!r}")
+    return f"[{name}]"
+
+
+class CatalogQueries:
+    """
+    Catalog queries for one database connection.
+
+    Every statement uses bound parameters, so the server sees one statement text per query
+    whatever the location and can reuse its plan. Each statement gets its own cursor that is
+    kept for the life of the connection: pyodbc keeps the last statement prepared on a cursor
+    and re-executing the same text skips the prepare round trip (sqlite3 caches prepared
+    statements per connection the same way).
+    """
+
+    def __init__(self, connection, hide_cost=False):
+        self.logger = setup_logger('CatalogQueries')
+        self.connection = connection
+        self.skip = ("Cost",) if hide_cost else ()
+        self.cursors = {}
+
+    @classmethod
+    def for_connection(cls, pooled, hide_cost=False):
+        """The CatalogQueries kept on a pooled connection, so its prepared cursors outlive one fetch."""
+        key = (cls.__name__, hide_cost)
+        queries = pooled.cache.get(key)
+        if queries is None:
+            queries = cls(pooled.connection, hide_cost)
+            pooled.cache[key] = queries
+        return queries
+
+    def execute(self, query, parameters=()):
+        cursor = self.cursors.get(query)
+        if cursor is None:
+            cursor = self.connection.cursor()
+            self.cursors[query] = cursor
+            self.logger.debug(f"Preparing catalog statement #{len(self.cursors)}")
+        cursor.execute(query, parameters)
+        return cursor
+
+    def items(self, location):
+        """Every ItemUOM row joined with its item and the POS price for the location."""
+        query = f"""
+        SELECT
+            {select_list(self.skip)}
+        FROM dbo.ItemUOM u
+        LEFT JOIN dbo.Item i ON u.ItemCode = i.ItemCode
+        LEFT JOIN dbo.PosPricePlan p ON u.ItemCode = p.ItemCode AND p.Location = ?;
+        """
+        return self.execute(query, (location,))
+
+    def sqlite_items(self):
+        return self.execute(SQLITE_ITEMS_QUERY)
+
+    def changed_items(self, column, location, marks):
+        """
+        Every joined row of the ItemUOM keys whose UOM, item or POS price row changed after
+        the given (ItemUOM, Item, PosPricePlan) high-water marks.
+
+        A None mark means the table was empty at the last sync, so all of its rows count as
+        changed. That gives at most eight statement texts, each prepared once.
+        """
+        parameters = []
+        column = quote_identifier(column)
+
+        def changed_since(alias, mark):
+            if mark is None:
+                return "1 = 1"
+            parameters.append(mark)
+            return f"{alias}.{column} > ?"
+
+        uom_mark, item_mark, price_mark = marks
+        uom_filter = changed_since("cu", uom_mark)
+        item_filter = changed_since("ci", item_mark)
+        parameters.append(location)
+        price_filter = changed_since("cp", price_mark)
+        parameters.append(location)
+
+        query = f"""
+        WITH ChangedKeys AS (
+            SELECT cu.ItemCode, cu.UOM FROM dbo.ItemUOM cu WHERE {uom_filter}
+            UNION
+            SELECT cu.ItemCode, cu.UOM FROM dbo.Item ci
+            JOIN dbo.ItemUOM cu ON cu.ItemCode = ci.ItemCode
+            WHERE {item_filter}
+            UNION
+            SELECT cu.ItemCode, cu.UOM FROM dbo.PosPricePlan cp
+            JOIN dbo.ItemUOM cu ON cu.ItemCode = cp.ItemCode
+            WHERE cp.Location = ? AND {price_filter}
+        )
+        SELECT
+            {select_list(self.skip)}
+        FROM ChangedKeys c
+        JOIN dbo.ItemUOM u ON u.ItemCode = c.ItemCode AND u.UOM = c.UOM
+        LEFT JOIN dbo.Item i ON u.ItemCode = i.ItemCode
+        LEFT JOIN dbo.PosPricePlan p ON u.ItemCode = p.ItemCode AND p.Location = ?;
+        """
+        return self.execute(query, tuple(parameters))
+
+    def marks(self, column):
+        """Current high-water marks of ItemUOM, Item and PosPricePlan."""
+        column = quote_identifier(column)
+        query = f"""
+        SELECT
+            (SELECT MAX({column}) FROM dbo.ItemUOM),
+            (SELECT MAX({column}) FROM dbo.Item),
+            (SELECT MAX({column}) FROM dbo.PosPricePlan);
+        """
+        # fetchall() drains the result set; a kept cursor with pending results would leave the
+        # connection busy for the next statement on SQL Server without MARS
+        return tuple(self.execute(query).fetchall()[0])
+
+    def key_set(self):
+        """(ItemCode, UOM) of every ItemUOM row, used to detect deleted rows."""
+        return {(row[0], row[1]) for row in self.execute("SELECT ItemCode, UOM FROM dbo.ItemUOM;").fetchall()}
+
+    def price_plan_codes(self, location):
+        """ItemCode of every PosPricePlan row of the location, used to detect deleted POS prices."""
+        query = "SELECT DISTINCT ItemCode FROM dbo.PosPricePlan WHERE Location = ?;"
+        return {row[0] for row in self.execute(query, (location,)).fetchall()}
+
+    def close(self):
+        for cursor in self.cursors.values():
+            try:
+                cursor.close()
+            except Exception as e:
+                self.logger.error(f"Error closing catalog cursor: {e}")
+        self.cursors.clear()
@@ -0,0 +1,133 @@
+import time
+from collections import OrderedDict
+from modules.logger_config import setup_logger
+
+CHECK_EVERY = 16384  # Rows scanned between two cancellation checks
+
+
+class SearchCancelled(Exception):
+    """Raised at a cancellation check once a newer search has replaced this one."""
+
+
+class CancelToken:
+    """
+    Cooperative cancellation flag shared by the UI thread and one running search.
+
+    The UI thread calls cancel() when a newer query arrives; the search calls check() between
+    stages and every CHECK_EVERY rows of a scan, and stops with SearchCancelled.
+    """
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def check(self):
+        if self.cancelled:
+            raise SearchCancelled()
+
+
+def chunks(row_ids, token=None):
+    """Slices of row_ids to scan one after the other, checking the token before each."""
+    if token is None:
+        yield row_ids
+        return
+    for start in range(0, len(row_ids), CHECK_EVERY):
+        token.check()
+        yield row_ids[start:start + CHECK_EVERY]
+
+
+class SearchCache:
+    """
+    LRU cache of recent search results (row ids) for search-as-you-type.
+
+    Every search mode used here is monotone: when the query text extends an earlier query
+    ("coc" -> "coca"), the new result is a subset of the old one. A query that extends a
+    cached one is therefore answered by narrowing that result instead of searching the
+    whole catalog, as long as the cached result is small enough for narrowing to be the
+    cheaper path. Entries belong to one catalog version and are dropped when it changes.
+    """
+
+    def __init__(self, capacity=64, refine_limit=50000, report_every=100):
+        self.logger = setup_logger('SearchCache')
+        self.capacity = capacity
+        self.refine_limit = refine_limit  # Larger cached results are cheaper to search again
+        self.report_every = report_every
+        self.entries = OrderedDict()
+        self.catalog = None
+        self.version = None
+        self.counts = {"hit": 0, "refined": 0, "miss": 0}
+        self.seconds = {"hit": 0.0, "refined": 0.0, "miss": 0.0}
+
+    def clear(self):
+        self.entries.clear()
+
+    def lookup(self, catalog, mode, query, search, narrow):
+        """
+        Result row ids of `query`, from the cache when possible.
+
+        Args:
+            catalog: The Catalog searched; a different catalog or version empties the cache.
+            mode: Search mode, results of different modes never mix.
+            query: Normalized query text.
+            search: search(query) -> row ids, the full search.
+            narrow: narrow(row_ids, query) -> the subset of row_ids matching query.
+        """
+        started = time.perf_counter()
+        if catalog is not self.catalog or catalog.version != self.version:
+            self.clear()
+            self.catalog = catalog
+            self.version = catalog.version
+
+        key = (mode, query)
+        result = self.entries.get(key)
+        if result is not None:
+            self.entries.move_to_end(key)
+            kind = "hit"
+        else:
+            base = self.base(mode, query)
+            if base is not None:
+                result = narrow(base, query)
+                kind = "refined"
+            else:
+                result = search(query)
+                kind = "miss"
+            self.entries[key] = result
+            if len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+        self.record(kind, time.perf_counter() - started)
+        return result
+
+    def base(self, mode, query):
+        """The result of the longest cached query of the mode that `query` extends."""
+        best = None
+        best_length = -1
+        for (cached_mode, cached_query), result in self.entries.items():
+            if (cached_mode == mode and len(cached_query) > best_length and query.startswith(cached_query)
+                    and len(result) <= self.refine_limit):
+                best = result
+                best_length = len(cached_query)
+        return best
+
+    def record(self, kind, elapsed):
+        self.counts[kind] += 1
+        self.seconds[kind] += elapsed
+        if sum(self.counts.values()) % self.report_every == 0:
+            self.logger.info(self.summary())
+
+    def hit_rate(self):
+        lookups = sum(self.counts.values())
+        return (self.counts["hit"] + self.counts["refined"]) / lookups if lookups else 0.0
+
+    def average_ms(self, kind):
+        return self.seconds[kind] * 1000 / self.counts[kind] if self.counts[kind] else 0.0
+
+    def summary(self):
+        return (
+            f"Search cache: {sum(self.counts.values())} lookups, hit rate {self.hit_rate():.0%} "
+            f"({self.counts['hit']} hits at {self.average_ms('hit'):.2f} ms, "
+            f"{self.counts['refined']} refined at {self.average_ms('refined'):.2f} ms, "
+            f"{self.counts['miss']} misses at {self.average_ms('miss'):.2f} ms)"
+        )
@@ -0,0 +1,103 @@
+from collections import deque
+from itertools import compress, repeat
+
+SPARSE = 8  # Fewer than one selected row in this many: iteration finds the flags one by one
+RECOUNT = 100  # Selecting at least one row in this many: recounting every flag beats reading each row's
+
+
+class Selection:
+    """
+    The rows checked for printing, kept across pages and searches.
+
+    One flag byte per catalog row id in a bytearray, grown on demand, with a running count.
+    Copy counts are kept only for the rows where they are not the default of 1. Selecting
+    many rows and iterating run in C (map over the bytearray, `find` for a few selected
+    rows, `compress` for many), so they cost about what a set of row ids would, at one byte
+    per catalog row. Iterating yields the selected row ids in ascending order.
+    """
+
+    def __init__(self):
+        self.flags = bytearray()
+        self.count = 0
+        self.copies = {}  # Row id -> copies, when not 1
+
+    def grow(self, row_id):
+        if row_id >= len(self.flags):
+            self.flags.extend(bytes(row_id + 1 - len(self.flags)))
+
+    def __contains__(self, row_id):
+        return row_id < len(self.flags) and self.flags[row_id] == 1
+
+    def add(self, row_id):
+        self.grow(row_id)
+        if not self.flags[row_id]:
+            self.flags[row_id] = 1
+            self.count += 1
+
+    def discard(self, row_id):
+        if row_id < len(self.flags) and self.flags[row_id]:
+            self.flags[row_id] = 0
+            self.count -= 1
+            self.copies.pop(row_id, None)
+
+    def update(self, row_ids):
+        """
+        Select many rows at once, e.g. every row of a search result.
+
+        Args:
+            row_ids: Distinct row ids.
+
+        Returns:
+            int: Number of rows that were not selected before.
+        """
+        if not row_ids:
+            return 0
+        self.grow(max(row_ids))
+        flags = self.flags
+        if len(row_ids) * RECOUNT < len(flags):
+            # A small result: count the rows not selected yet from their own flags
+            added = bytes(map(flags.__getitem__, row_ids)).count(0)
+            deque(map(flags.__setitem__, row_ids, repeat(1)), maxlen=0)
+            self.count += added
+            return added
+        before = self.count
+        deque(map(flags.__setitem__, row_ids, repeat(1)), maxlen=0)
+        self.count = flags.count(1)  # At most RECOUNT flags per selected row
+        return self.count - before
+
+    def clear(self):
+        self.flags = bytearray()
+        self.count = 0
+        self.copies = {}
+
+    def copies_of(self, row_id):
+        return self.copies.get(row_id, 1)
+
+    def set_copies(self, row_id, copies):
+        if copies == 1:
+            self.copies.pop(row_id, None)
+        else:
+            self.copies[row_id] = copies
+
+    def remap(self, new_ids):
+        """Follow a compaction of the catalog: new_ids[old id] is the new row id, or -1 when dropped."""
+        selected = [(new_ids[row_id], self.copies_of(row_id)) for row_id in self if row_id < len(new_ids)]
+        self.clear()
+        for row_id, copies in selected:
+            if row_id >= 0:
+                self.add(row_id)
+                self.set_copies(row_id, copies)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        flags = self.flags
+        if self.count * SPARSE >= len(flags):
+            yield from compress(range(len(flags)), flags)
+            return
+        find = flags.find
+        row_id = find(1)
+        while row_id >= 0:
+            yield row_id
+            row_id = find(1, row_id + 1)
@@ -0,0 +1,184 @@
+import hashlib
+import mmap
+import os
+import re
+import struct
+import zlib
+from array import array
+from modules.logger_config import setup_logger
+
+# Snapshot layout (little endian), version 1:
+#   header  : magic "BCSN", version u16, schema u8, column count u8, fingerprint sha1 (20 bytes),
+#             row count u32, crc32 of the body u32
+#   body    : one block per column
+#     text  : type u8 = 0, null mask length u32, null mask (1 byte per row, omitted when no NULLs),
+#             utf-8 length u64, values joined by NUL
+#     real  : type u8 = 1, null mask length u32, null mask, row count float64 values
+MAGIC = b"BCSN"
+VERSION = 1
+HEADER = struct.Struct("<4sHBB20sII")
+
+TEXT = 0
+REAL = 1
+
+SCHEMA_SQLSERVER = 0
+SCHEMA_SQLITE = 1
+
+# Column types of the rows produced by FetchItemsThread
+COLUMN_TYPES = {
+    # ItemCode, DescriptionWithUOM, UOM, DefaultUnitPrice, Cost, Barcode, Location, PosUnitPrice
+    SCHEMA_SQLSERVER: (TEXT, TEXT, TEXT, REAL, REAL, TEXT, TEXT, REAL),
+    # barCode, name, price
+    SCHEMA_SQLITE: (TEXT, TEXT, REAL),
+}
+
+
+class CatalogSnapshot:
+    """
+    Versioned on-disk copy of the last fetched catalog, one file per location, used to show the
+    table on cold start before the database answers.
+
+    The file stores the catalog column by column so loading is a handful of C-level splits
+    and array copies over a memory-mapped file. A fingerprint of the catalog source (server,
+    database, location and backend) is kept in the header; a snapshot taken from a different
+    source is discarded on load.
+    """
+
+    def __init__(self, directory, server, database, location, use_sqlite, sqlite_path=""):
+        self.logger = setup_logger('CatalogSnapshot')
+        self.schema = SCHEMA_SQLITE if use_sqlite else SCHEMA_SQLSERVER
+        source = "|".join(str(part) for part in (server, database, location, self.schema, sqlite_path))
+        self.fingerprint = hashlib.sha1(source.encode("utf-8")).digest()
+        safe_location = re.sub(r"[^A-Za-z0-9_-]", "_", str(location)) or "default"
+        self.path = os.path.join(directory, f"catalog_{safe_location}.snap")
+        self.checksum = None  # crc32 of the snapshot last loaded or saved
+
+    @classmethod
+    def for_config(cls, config):
+        return cls(
+            os.path.dirname(config.json_path),
+            config.get_server(),
+            config.get_database(),
+            config.get_location(),
+            config.get_useSqlite(),
+            config.get_sqlPath() if config.get_useSqlite() else "",
+        )
+
+    def load(self):
+        """
+        Load the snapshot rows, already sorted by barcode.
+
+        Returns:
+            list: Row tuples, or None when there is no usable snapshot.
+        """
+        if not os.path.isfile(self.path):
+            return None
+
+        try:
+            with open(self.path, "rb") as file:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                    rows = self.decode(view)
+        except (OSError, ValueError, struct.error, UnicodeDecodeError) as e:
+            self.logger.error(f"Unreadable catalog snapshot {self.path}: {e}")
+            self.invalidate()
+            return None
+
+        if rows is None:
+            # Removed only after the mapping is closed; Windows refuses to delete a mapped file
+            self.logger.info("Catalog snapshot belongs to another server, database or location. Discarding it.")
+            self.invalidate()
+            return None
+
+        self.logger.info(f"Loaded {len(rows)} items from catalog snapshot {self.path}")
+        return rows
+
+    def decode(self, view):
+        magic, version, schema, column_count, fingerprint, row_count, checksum = HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"unsupported snapshot format {magic!r} v{version}")
+        if fingerprint != self.fingerprint or schema != self.schema:
+            return None
+        if zlib.crc32(view[HEADER.size:]) != checksum:
+            raise ValueError("snapshot checksum mismatch")
+
+        offset = HEADER.size
+        columns = []
+        for _ in range(column_count):
+            column_type = view[offset]
+            offset += 1
+            if column_type == TEXT:
+                (mask_length,) = struct.unpack_from("<I", view, offset)
+                offset += 4
+                mask = view[offset:offset + mask_length]
+                offset += mask_length
+                (text_length,) = struct.unpack_from("<Q", view, offset)
+                offset += 8
+                values = view[offset:offset + text_length].decode("utf-8").split("\0") if row_count else []
+                offset += text_length
+                if mask:
+                    values = [None if null else value for value, null in zip(values, mask)]
+            elif column_type == REAL:
+                (mask_length,) = struct.unpack_from("<I", view, offset)
+                offset += 4
+                mask = view[offset:offset + mask_length]
+                offset += mask_length
+                values = array("d")
+                values.frombytes(view[offset:offset + row_count * 8])
+                offset += row_count * 8
+                values = values.tolist()
+                if mask:
+                    values = [None if null else value for value, null in zip(values, mask)]
+            else:
+                raise ValueError(f"unknown column type {column_type}")
+
+            if len(values) != row_count:
+                raise ValueError("snapshot column length mismatch")
+            columns.append(values)
+
+        self.checksum = checksum
+        return list(zip(*columns))
+
+    def save(self, rows):
+        """
+        Write the rows (sorted the way the table shows them) as the new snapshot.
+
+        Returns:
+            int: crc32 of the snapshot body, comparable with `checksum` of a loaded snapshot.
+        """
+        column_types = COLUMN_TYPES[self.schema]
+        body = bytearray()
+        for index, column_type in enumerate(column_types):
+            body.append(column_type)
+            values = [row[index] for row in rows]
+            mask = bytes(value is None for value in values) if None in values else b""
+            body += struct.pack("<I", len(mask)) + mask
+            if column_type == TEXT:
+                text = "\0".join("" if value is None else str(value).replace("\0", "") for value in values)
+                encoded = text.encode("utf-8")
+                body += struct.pack("<Q", len(encoded)) + encoded
+            else:
+                body += array("d", (0.0 if value is None else float(value) for value in values)).tobytes()
+
+        checksum = zlib.crc32(body)
+        header = HEADER.pack(MAGIC, VERSION, self.schema, len(column_types), self.fingerprint, len(rows), checksum)
+
+        # Write next to the old snapshot and swap, so a crash never leaves a half-written file
+        temp_path = self.path + ".tmp"
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(temp_path, "wb") as file:
+            file.write(header)
+            file.write(body)
+        os.replace(temp_path, self.path)
+
+        self.logger.info(f"Saved {len(rows)} items to catalog snapshot {self.path}")
+        return checksum
+
+    def invalidate(self):
+        try:
+            os.remove(self.path)
+            self.logger.info(f"Removed catalog snapshot {self.path}")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.error(f"Could not remove catalog snapshot {self.path}: {e}")
+        self.checksum = None
@@ -0,0 +1,147 @@
+from modules.Catalog import normalize_row
+from modules.CatalogQueries import DEFAULT_LOCATION
+from modules.logger_config import setup_logger
+
+
+class DeltaSync:
+    """
+    Keeps the high-water marks of the last SQL Server catalog sync and merges changed rows
+    into the in-memory Catalog instead of reloading it.
+
+    The change column (a rowversion or last-modified column) must exist on ItemUOM, Item and
+    PosPricePlan. Deletes are not visible through the marks, so on every `reconcile_every`th
+    delta the ItemUOM keys and the item codes with a POS price for the location are fetched
+    as well: rows whose key disappeared are dropped, and rows whose POS price row
+    disappeared fall back to the default location and unit price, as the full query would.
+    """
+
+    def __init__(self, column, reconcile_every=10):
+        self.logger = setup_logger('DeltaSync')
+        self.column = column
+        self.reconcile_every = max(1, int(reconcile_every))
+        self.fingerprint = None
+        self.marks = None
+        self.pending_marks = None
+        self.delta_count = 0
+
+    def prepare(self, fingerprint):
+        """Forget the marks when the catalog source (server, database, location, projection) changed."""
+        if fingerprint != self.fingerprint:
+            if self.fingerprint is not None:
+                self.logger.info("Catalog source changed, next refresh will be a full reload.")
+            self.fingerprint = fingerprint
+            self.reset()
+
+    def reset(self):
+        self.marks = None
+        self.pending_marks = None
+        self.delta_count = 0
+
+    @property
+    def primed(self):
+        return self.marks is not None
+
+    def reconcile_due(self):
+        return (self.delta_count + 1) % self.reconcile_every == 0
+
+    def read_marks(self, queries):
+        return queries.marks(self.column)
+
+    def fetch_changes(self, queries, location):
+        """
+        Fetch the rows changed since the committed marks.
+
+        Returns:
+            tuple: (changed rows, live keys or None, new marks); live keys are the ItemUOM key
+            set and the item codes with a POS price for the location
+        """
+        # Read the new marks first so that rows written during the fetch are picked up again next time
+        new_marks = self.read_marks(queries)
+        changed = queries.changed_items(self.column, location, self.marks).fetchall()
+        live_keys = (queries.key_set(), queries.price_plan_codes(location)) if self.reconcile_due() else None
+        return changed, live_keys, new_marks
+
+    def commit(self, marks):
+        self.marks = marks
+        self.pending_marks = None
+
+    def commit_pending(self):
+        """Adopt the marks read before the last full fetch once its rows are in the catalog."""
+        if self.pending_marks is not None:
+            self.commit(self.pending_marks)
+
+    @staticmethod
+    def row_key(row):
+        return (row[0], row[2])  # (ItemCode, UOM)
+
+    def merge(self, catalog, changed_rows, live_keys):
+        """
+        Merge changed SQL Server rows into the catalog.
+
+        The rows of a changed (ItemCode, UOM) key are overwritten in place by the freshly
+        fetched rows for that key (extra rows are appended, missing ones removed). When live
+        keys are given, rows whose key no longer exists are removed and rows whose item lost
+        its POS price are reset to the default location and their unit price.
+
+        Returns:
+            tuple: (rows upserted, rows removed)
+        """
+        self.delta_count += 1
+        changed_keys = {self.row_key(row) for row in changed_rows}
+        if not changed_keys and live_keys is None:
+            return 0, 0
+
+        stale = {}
+        removed = []
+        unpriced = []
+        if live_keys is None:
+            # Cheap item code check first, the (ItemCode, UOM) key is only built for candidates
+            codes = {key[0] for key in changed_keys}
+            for row_id, item_code in enumerate(catalog.item_codes):
+                if item_code in codes:
+                    key = catalog.key(row_id)
+                    if key in changed_keys:
+                        stale.setdefault(key, []).append(row_id)
+        else:
+            keys, price_codes = live_keys
+            for row_id in range(len(catalog.item_codes)):
+                key = catalog.key(row_id)
+                if key in changed_keys:
+                    stale.setdefault(key, []).append(row_id)
+                elif key not in keys:
+                    removed.append(row_id)
+                elif key[0] not in price_codes and self.has_pos_price(catalog, row_id):
+                    unpriced.append(row_id)
+        gone = len(removed)
+
+        # One lock for the whole merge, so a search never sees rows updated but not yet re-sorted
+        with catalog.lock:
+            touched = []
+            for row in changed_rows:
+                row = normalize_row(row, False)
+                row_ids = stale.get(self.row_key(row))
+                if row_ids:
+                    row_id = row_ids.pop()
+                    catalog.update(row_id, row)
+                else:
+                    row_id = catalog.append(row)
+                touched.append(row_id)
+            for row_id in unpriced:
+                row = catalog.row(row_id)
+                catalog.update(row_id, row[:6] + (DEFAULT_LOCATION, row[3]))
+                touched.append(row_id)
+            for row_ids in stale.values():
+                removed.extend(row_ids)  # The key now has fewer rows than before
+
+            catalog.reindex(touched)
+            catalog.remove(removed)
+
+        self.logger.info(f"Delta sync merged {len(changed_rows)} changed rows, removed {gone} rows, "
+                         f"reset {len(unpriced)} rows whose POS price was deleted.")
+        return len(changed_rows) + len(unpriced), gone
+
+    @staticmethod
+    def has_pos_price(catalog, row_id):
+        """Whether a row still shows a POS price, i.e. differs from the full query's fallback for it."""
+        return (catalog.locations.values[catalog.location_codes[row_id]] != DEFAULT_LOCATION
+                or catalog.location_prices[row_id] != catalog.unit_prices[row_id])
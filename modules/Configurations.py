@@ -246,7 +246,121 @@ class BarcodeConfig(QObject):
 
     def set_sqlitePath(self, path:str):
         self.settings.setValue("sqlPath", path)
-    
+
+    def get_stream_fetch(self):
+        return self.settings.value("streamFetch", True, type=bool)
+
+    def set_stream_fetch(self, stream_fetch):
+        self.settings.setValue("streamFetch", stream_fetch)
+        self.setting_changed.emit("streamFetch", stream_fetch)
+
+    def get_fetch_batch_size(self):
+        return self.settings.value("fetchBatchSize", 5000, type=int)
+
+    def set_fetch_batch_size(self, batch_size):
+        self.settings.setValue("fetchBatchSize", batch_size)
+        self.setting_changed.emit("fetchBatchSize", batch_size)
+
+    def get_catalog_snapshot(self):
+        return self.settings.value("catalogSnapshot", True, type=bool)
+
+    def set_catalog_snapshot(self, catalog_snapshot):
+        self.settings.setValue("catalogSnapshot", catalog_snapshot)
+        self.setting_changed.emit("catalogSnapshot", catalog_snapshot)
+
+    def get_delta_sync_column(self):
+        # rowversion / last-modified column present on ItemUOM, Item and PosPricePlan; empty disables delta sync
+        return self.settings.value("deltaSyncColumn", "", type=str)
+
+    def set_delta_sync_column(self, column):
+        self.settings.setValue("deltaSyncColumn", column)
+        self.setting_changed.emit("deltaSyncColumn", column)
+
+    def get_delta_reconcile_interval(self):
+        return self.settings.value("deltaReconcileInterval", 10, type=int)
+
+    def set_delta_reconcile_interval(self, interval):
+        self.settings.setValue("deltaReconcileInterval", interval)
+        self.setting_changed.emit("deltaReconcileInterval", interval)
+
+    def get_prefix_search(self):
+        # Typing the first characters of a barcode or item code lists every code starting with them
+        return self.settings.value("prefixSearch", True, type=bool)
+
+    def set_prefix_search(self, prefix_search):
+        self.settings.setValue("prefixSearch", prefix_search)
+        self.setting_changed.emit("prefixSearch", prefix_search)
+
+    def get_trigram_memory_budget(self):
+        # Megabytes the description trigram index may use; 0 (the default) leaves it off for low-memory tills
+        return self.settings.value("trigramMemoryBudget", 0, type=int)
+
+    def set_trigram_memory_budget(self, megabytes):
+        self.settings.setValue("trigramMemoryBudget", megabytes)
+        self.setting_changed.emit("trigramMemoryBudget", megabytes)
+
+    def get_fuzzy_result_limit(self):
+        return self.settings.value("fuzzyResultLimit", 100, type=int)
+
+    def set_fuzzy_result_limit(self, limit):
+        self.settings.setValue("fuzzyResultLimit", limit)
+        self.setting_changed.emit("fuzzyResultLimit", limit)
+
+    def get_infinite_scroll(self):
+        # One scrolling table that loads rows as it nears the end, instead of Previous/Next pages
+        return self.settings.value("infiniteScroll", False, type=bool)
+
+    def set_infinite_scroll(self, infinite):
+        self.settings.setValue("infiniteScroll", infinite)
+        self.setting_changed.emit("infiniteScroll", infinite)
+
+    def get_scroll_chunk_size(self):
+        return self.settings.value("scrollChunkSize", 500, type=int)
+
+    def set_scroll_chunk_size(self, rows):
+        self.settings.setValue("scrollChunkSize", rows)
+        self.setting_changed.emit("scrollChunkSize", rows)
+
+    def get_relevance_ranking(self):
+        # Description search lists the best matches first instead of in barcode order
+        return self.settings.value("relevanceRanking", False, type=bool)
+
+    def set_relevance_ranking(self, ranking):
+        self.settings.setValue("relevanceRanking", ranking)
+        self.setting_changed.emit("relevanceRanking", ranking)
+
+    def get_scanner_fast_path(self):
+        # A code typed as a fast burst and ended with Enter is looked up directly as a barcode
+        return self.settings.value("scannerFastPath", True, type=bool)
+
+    def set_scanner_fast_path(self, fast_path):
+        self.settings.setValue("scannerFastPath", fast_path)
+        self.setting_changed.emit("scannerFastPath", fast_path)
+
+    def get_scanner_key_interval(self):
+        # Milliseconds between keystrokes below which input counts as coming from a scanner
+        return self.settings.value("scannerKeyInterval", 30, type=int)
+
+    def set_scanner_key_interval(self, milliseconds):
+        self.settings.setValue("scannerKeyInterval", milliseconds)
+        self.setting_changed.emit("scannerKeyInterval", milliseconds)
+
+    def get_scanner_auto_check(self):
+        # Tick the scanned item for printing
+        return self.settings.value("scannerAutoCheck", False, type=bool)
+
+    def set_scanner_auto_check(self, auto_check):
+        self.settings.setValue("scannerAutoCheck", auto_check)
+        self.setting_changed.emit("scannerAutoCheck", auto_check)
+
+    def get_batch_print(self):
+        # Send a whole print job as one stream instead of one connection (or win32 job) per label
+        return self.settings.value("batchPrint", True, type=bool)
+
+    def set_batch_print(self, batch_print):
+        self.settings.setValue("batchPrint", batch_print)
+        self.setting_changed.emit("batchPrint", batch_print)
+
     def reset_to_defaults(self):
         """Reset all settings to their default values."""
         # defaults = {
@@ -0,0 +1,239 @@
+import threading
+import time
+import pyodbc
+from contextlib import contextmanager
+from modules.logger_config import setup_logger
+
+LOGIN_TIMEOUT = 10  # seconds
+CHECK_TIMEOUT = 3  # Login timeout of interactive checks that run on the UI thread
+PING_INTERVAL = 30  # Idle seconds after which a connection is pinged before being handed out
+MAX_IDLE = 4  # Idle connections kept for worker threads
+BACKOFF_START = 1
+BACKOFF_MAX = 60
+
+
+def build_connection_string(config):
+    connection_string = (
+        f'DRIVER={{ODBC Driver 17 for SQL Server}};'
+        f'SERVER={config.get_server()};'
+        f'DATABASE={config.get_database()};'
+        f'UID={config.get_username()};'
+        f'PWD={config.get_password()};'
+    )
+    if config.get_trusted_connection():
+        connection_string += 'Trusted_Connection=yes;'
+    return connection_string
+
+
+class PooledConnection:
+    """A pooled pyodbc connection plus a per-connection cache (e.g. prepared CatalogQueries)."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.last_used = time.monotonic()
+        self.cache = {}
+
+    def ping(self):
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("SELECT 1").fetchone()
+        finally:
+            cursor.close()
+        self.last_used = time.monotonic()
+
+    def close(self):
+        for value in self.cache.values():
+            if hasattr(value, "close"):
+                try:
+                    value.close()
+                except Exception:
+                    pass
+        self.cache.clear()
+        try:
+            self.connection.close()
+        except pyodbc.Error:
+            pass
+
+
+class ConnectionPool:
+    """
+    Process-wide pool of SQL Server connections.
+
+    Worker threads check a connection out exclusively with `checkout()` and return it when
+    done, so a fetch thread never shares a connection with the UI thread and the next fetch
+    reuses it without a new login. Long-lived threads (the UI thread) use `connection()`,
+    which pins one connection to the calling thread. Connections idle for longer than the
+    ping interval are validated with `SELECT 1` before being handed out.
+
+    When a connection cannot be opened the pool is marked unhealthy and a background thread
+    keeps retrying with exponential backoff; callers fail fast in the meantime instead of
+    waiting for another login timeout.
+    """
+
+    def __init__(self, connection_string, ping_interval=PING_INTERVAL, max_idle=MAX_IDLE):
+        self.logger = setup_logger('ConnectionPool')
+        self.connection_string = connection_string
+        self.ping_interval = ping_interval
+        self.max_idle = max_idle
+        self.lock = threading.Lock()
+        self.idle = []
+        self.pinned = threading.local()
+        self.pinned_all = []  # Pinned connections of every thread, so close() can reach them
+        self.healthy = True
+        self.last_error = None
+        self.closed = False
+        self.reconnect_thread = None
+
+    def open(self, timeout=LOGIN_TIMEOUT):
+        try:
+            connection = pyodbc.connect(self.connection_string, timeout=timeout)
+        except pyodbc.Error as e:
+            self.mark_unhealthy(e)
+            raise
+        self.healthy = True
+        self.logger.info("Opened a new SQL Server connection.")
+        return PooledConnection(connection)
+
+    def validate(self, pooled):
+        """Return True when the connection is usable, pinging it if it has been idle for a while."""
+        if time.monotonic() - pooled.last_used < self.ping_interval:
+            return True
+        try:
+            pooled.ping()
+            return True
+        except pyodbc.Error as e:
+            self.logger.warning(f"Discarding dead SQL Server connection: {e}")
+            pooled.close()
+            return False
+
+    def acquire(self, timeout=LOGIN_TIMEOUT):
+        """Take a healthy connection for exclusive use, reusing an idle one when possible."""
+        if self.closed:
+            raise pyodbc.InterfaceError("Connection pool is closed.")
+        while True:
+            with self.lock:
+                pooled = self.idle.pop() if self.idle else None
+            if pooled is None:
+                if not self.healthy and self.reconnect_thread is not None:
+                    raise pyodbc.OperationalError(f"Database unreachable, reconnecting in the background: {self.last_error}")
+                return self.open(timeout)
+            if self.validate(pooled):
+                return pooled
+
+    def release(self, pooled):
+        pooled.last_used = time.monotonic()
+        with self.lock:
+            if not self.closed and len(self.idle) < self.max_idle:
+                self.idle.append(pooled)
+                return
+        pooled.close()
+
+    def discard(self, pooled):
+        """Close a connection that failed during use instead of returning it to the pool."""
+        pooled.close()
+
+    @contextmanager
+    def checkout(self):
+        pooled = self.acquire()
+        try:
+            yield pooled
+        except pyodbc.Error:
+            self.discard(pooled)
+            raise
+        else:
+            self.release(pooled)
+
+    def connection(self, timeout=LOGIN_TIMEOUT):
+        """The calling thread's pinned connection, validated and reopened when needed."""
+        pooled = getattr(self.pinned, "pooled", None)
+        if pooled is not None and not self.validate(pooled):
+            self.unpin(pooled)
+            pooled = None
+        if pooled is None:
+            pooled = self.acquire(timeout)
+            self.pinned.pooled = pooled
+            with self.lock:
+                self.pinned_all.append(pooled)
+        pooled.last_used = time.monotonic()
+        return pooled.connection
+
+    def unpin(self, pooled):
+        self.pinned.pooled = None
+        with self.lock:
+            if pooled in self.pinned_all:
+                self.pinned_all.remove(pooled)
+
+    def ping(self, timeout=LOGIN_TIMEOUT):
+        """
+        Cheap health check on the calling thread's pinned connection.
+
+        Args:
+            timeout: Login timeout in seconds when a connection has to be opened first.
+        """
+        pooled = getattr(self.pinned, "pooled", None)
+        try:
+            if pooled is None:
+                self.connection(timeout)
+            else:
+                pooled.ping()
+            return True
+        except pyodbc.Error as e:
+            if pooled is not None:
+                pooled.close()
+                self.unpin(pooled)
+            self.mark_unhealthy(e)
+            return False
+
+    def mark_unhealthy(self, error):
+        self.logger.error(f"SQL Server connection failed: {error}")
+        self.healthy = False
+        self.last_error = error
+        with self.lock:
+            if self.closed or (self.reconnect_thread is not None and self.reconnect_thread.is_alive()):
+                return
+            self.reconnect_thread = threading.Thread(target=self.reconnect_loop, name="ConnectionPoolReconnect", daemon=True)
+            self.reconnect_thread.start()
+
+    def reconnect_loop(self):
+        delay = BACKOFF_START
+        while not self.closed:
+            time.sleep(delay)
+            try:
+                pooled = PooledConnection(pyodbc.connect(self.connection_string, timeout=LOGIN_TIMEOUT))
+            except pyodbc.Error as e:
+                self.last_error = e
+                delay = min(delay * 2, BACKOFF_MAX)
+                self.logger.warning(f"Reconnect failed, retrying in {delay}s: {e}")
+                continue
+
+            self.logger.info("Reconnected to SQL Server.")
+            self.healthy = True
+            self.release(pooled)
+            break
+        self.reconnect_thread = None
+
+    def close(self):
+        self.closed = True
+        with self.lock:
+            connections = self.idle + self.pinned_all
+            self.idle = []
+            self.pinned_all = []
+        for pooled in connections:
+            pooled.close()
+        self.pinned.pooled = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(config):
+    """Return the process-wide pool for the configured server, replacing it if the settings changed."""
+    global _pool
+    connection_string = build_connection_string(config)
+    with _pool_lock:
+        if _pool is None or _pool.closed or _pool.connection_string != connection_string:
+            if _pool is not None:
+                _pool.close()
+            _pool = ConnectionPool(connection_string)
+        return _pool
@@ -0,0 +1,225 @@
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QBrush, QColor
+from modules.Catalog import format_price
+from modules.CatalogSelection import Selection
+
+HEADERS = ["*", "Item Code", "Description", "UOM", "Unit Price", "Unit Cost", "Barcode", "Location", "Price", "Copies"]
+CHECK_COLUMN = 0
+COPIES_COLUMN = 9
+PREFETCH_SLICE = 100  # Rows formatted per idle tick while prefetching
+
+
+class ItemTableModel(QAbstractTableModel):
+    """
+    Table model over a slice of a catalog result (a CatalogView, the Catalog itself or a
+    list of normalized rows).
+
+    Nothing is created per cell: `data()` reads a row from the result the first time it is
+    shown and formats all its cells at once into a cached tuple of strings. Check marks and
+    copy counts live in a Selection keyed by catalog row id (the catalog's own one), so they
+    survive page changes and new searches.
+
+    With a `chunk` size the model scrolls infinitely: it starts with one chunk of rows and
+    the view asks for more through canFetchMore/fetchMore. After each fetch the next chunk
+    is formatted ahead in idle time, a slice per timer tick. The cache of formatted rows
+    stays bounded: once it holds more than `cache_limit` rows, rows further than two chunks
+    from the visible ones (other than the prefetched chunk) are evicted.
+    """
+
+    STRIPE = QColor(230, 238, 255)  # Background of even rows
+    selection_changed = pyqtSignal(int)  # Rows selected in total
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.items = []
+        self.start = 0
+        self.count = 0
+        self.hide_cost = False
+        self.formatted = {}  # Row -> formatted cell strings, columns 1..8
+        self.selection = Selection()
+        self.stripe = QBrush(self.STRIPE)
+        self.total = 0  # Rows of the slice; `count` of them are loaded into the view
+        self.chunk = 0
+        self.cache_limit = 2000
+        self.visible = (0, 0)
+        self.prefetched = 0  # Rows below this one are formatted
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.timeout.connect(self.prefetch)
+
+    def set_items(self, items, start=0, end=None, hide_cost=False, chunk=0, selection=None):
+        """
+        Show items[start:end]; cached cells are reset.
+
+        Args:
+            items: A Catalog or a view of one (anything with `row_id(index)`), or an empty list.
+            chunk: Rows loaded at a time for infinite scrolling, 0 to load the whole slice.
+            selection: The Selection the check marks and copies read and write, normally
+                the catalog's; kept when not given.
+        """
+        self.prefetch_timer.stop()
+        self.beginResetModel()
+        self.items = items
+        self.start = start
+        self.total = (len(items) if end is None else end) - start
+        self.chunk = chunk
+        self.count = min(self.total, chunk) if chunk else self.total
+        self.cache_limit = max(2000, 8 * chunk)
+        self.hide_cost = hide_cost
+        self.formatted = {}
+        if selection is not None:
+            self.selection = selection
+        self.visible = (0, 0)
+        self.prefetched = 0
+        self.endResetModel()
+        self.schedule_prefetch()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.count < self.total
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.count >= self.total:
+            return
+        end = min(self.total, self.count + (self.chunk or self.total))
+        self.beginInsertRows(QModelIndex(), self.count, end - 1)
+        self.count = end
+        self.endInsertRows()
+        self.schedule_prefetch()
+
+    def schedule_prefetch(self):
+        """Format the chunk after the loaded rows in idle time, so the next fetch paints from cache."""
+        if self.chunk and self.count < self.total and not self.prefetch_timer.isActive():
+            self.prefetched = max(self.prefetched, self.count)
+            self.prefetch_timer.start(0)
+
+    def prefetch(self):
+        end = min(self.total, self.count + self.chunk, self.prefetched + PREFETCH_SLICE)
+        for row in range(self.prefetched, end):
+            self.cells(row)
+        self.prefetched = end
+        if end < min(self.total, self.count + self.chunk):
+            self.prefetch_timer.start(0)
+
+    def set_visible(self, first, last):
+        """Tell the model which rows are on screen; evicts far away formatted rows when the cache is full."""
+        self.visible = (first, last)
+        if len(self.formatted) <= self.cache_limit:
+            return
+        keep = 2 * max(self.chunk, last - first + 1)
+        low = first - keep
+        high = last + keep
+        # Rows past the loaded ones are the prefetched chunk, at most one chunk long
+        self.formatted = {
+            row: cells for row, cells in self.formatted.items() if low <= row <= high or row >= self.count
+        }
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def cells(self, row):
+        """The formatted text of columns 1..8 of a row, formatted on first use."""
+        cells = self.formatted.get(row)
+        if cells is None:
+            item_code, description, uom, unit_price, unit_cost, barcode_value, location, location_price = self.items[self.start + row]
+            if self.hide_cost:
+                formatted_unit_cost = '***'
+            else:
+                formatted_unit_cost = format_price(unit_cost)
+            cells = self.formatted[row] = (
+                str(item_code), str(description), str(uom), format_price(unit_price), formatted_unit_cost,
+                str(barcode_value), str(location), format_price(location_price),
+            )
+        return cells
+
+    def row_id(self, row):
+        """The catalog row id shown at a model row."""
+        return self.items.row_id(self.start + row)
+
+    def text(self, row, column):
+        """The text a cell shows."""
+        if column == CHECK_COLUMN:
+            return ""
+        if column == COPIES_COLUMN:
+            return str(self.selection.copies_of(self.row_id(row)))
+        return self.cells(row)[column - 1]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        column = index.column()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self.text(row, column) if column != CHECK_COLUMN else None
+        if role == Qt.CheckStateRole and column == CHECK_COLUMN:
+            return Qt.Checked if self.row_id(row) in self.selection else Qt.Unchecked
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignLeft | Qt.AlignVCenter) if column == CHECK_COLUMN else int(Qt.AlignCenter)
+        if role == Qt.BackgroundRole and row % 2 == 0:
+            return self.stripe
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid():
+            return False
+        row = index.row()
+        column = index.column()
+        if role == Qt.CheckStateRole and column == CHECK_COLUMN:
+            self.set_checked(row, value == Qt.Checked)
+            return True
+        if role == Qt.EditRole and column == COPIES_COLUMN:
+            try:
+                copies = int(str(value).strip())
+            except ValueError:
+                return False
+            if copies < 1:
+                return False
+            self.selection.set_copies(self.row_id(row), copies)
+            self.dataChanged.emit(index, index, [role])
+            return True
+        return False
+
+    def flags(self, index):
+        column = index.column()
+        if column == CHECK_COLUMN:
+            return Qt.ItemIsUserCheckable | Qt.ItemIsEnabled
+        if column == COPIES_COLUMN:
+            return Qt.ItemIsEditable | Qt.ItemIsEnabled
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled
+
+    def set_checked(self, row, checked):
+        if checked:
+            self.selection.add(self.row_id(row))
+        else:
+            self.selection.discard(self.row_id(row))
+        index = self.index(row, CHECK_COLUMN)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        self.selection_changed.emit(len(self.selection))
+
+    def select(self, row_ids):
+        """
+        Select many catalog rows at once, e.g. every row matching the search.
+
+        Returns:
+            int: Number of rows newly selected.
+        """
+        added = self.selection.update(row_ids)
+        self.refresh_checks()
+        return added
+
+    def clear_selection(self):
+        self.selection.clear()
+        self.refresh_checks()
+
+    def refresh_checks(self):
+        """Repaint the check marks and copies of the loaded rows after a bulk change."""
+        if self.count:
+            self.dataChanged.emit(self.index(0, CHECK_COLUMN), self.index(self.count - 1, COPIES_COLUMN))
+        self.selection_changed.emit(len(self.selection))
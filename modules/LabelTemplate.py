@@ -0,0 +1,61 @@
+import re
+
+PLACEHOLDER = re.compile(r'{{(.*?)}}')
+
+# Settings keys holding label templates; a change to any of them empties the template cache
+TEMPLATE_KEYS = ("tpslTemplate", "zplTemplate", "tpsl2", "zpl2", "tpsl3", "zpl3", "tpsl_funbake", "zpl_funbake")
+
+
+class CompiledTemplate:
+    """
+    A label template split once into literal segments and `{{name}}` slots.
+
+    `pieces` alternates literal text and slots; `slots` lists (position in pieces, name).
+    Rendering copies the pieces, drops the values into the slot positions and joins, so no
+    regular expression runs per label. A slot without a value keeps its `{{name}}` text.
+    """
+
+    def __init__(self, template):
+        self.template = template
+        self.pieces = []
+        self.slots = []
+        position = 0
+        for match in PLACEHOLDER.finditer(template):
+            self.pieces.append(template[position:match.start()])
+            self.slots.append((len(self.pieces), match.group(1)))
+            self.pieces.append(match.group(0))
+            position = match.end()
+        self.pieces.append(template[position:])
+        self.names = frozenset(name for _, name in self.slots)
+
+    def missing(self, values):
+        """Slot names `values` has no value for."""
+        return sorted(self.names.difference(values))
+
+    def render(self, values):
+        """The label text; `values` maps slot names to strings."""
+        pieces = self.pieces[:]
+        for position, name in self.slots:
+            if name in values:
+                pieces[position] = values[name]
+        return "".join(pieces)
+
+
+class TemplateCache:
+    """Compiled templates by template text, emptied when a template setting changes."""
+
+    def __init__(self):
+        self.compiled = {}
+
+    def get(self, template):
+        template = template or ""
+        compiled = self.compiled.get(template)
+        if compiled is None:
+            compiled = self.compiled[template] = CompiledTemplate(template)
+        return compiled
+
+    def clear(self):
+        self.compiled.clear()
+
+    def __len__(self):
+        return len(self.compiled)
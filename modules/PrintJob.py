@@ -0,0 +1,94 @@
+from collections import namedtuple
+from modules.Catalog import format_price, from_fixed
+from modules.LabelTemplate import CompiledTemplate
+from modules.logger_config import setup_logger
+
+# Everything here is plain Python over the catalog columns: no widgets, no settings reads,
+# so a job can be built and measured headless.
+
+DESCRIPTION_LINE = 25  # Characters of the first description line
+VALUE_NAMES = ("companyName", "description", "description_1", "description_2", "remark",
+               "barcode_value", "unit_price_integer", "copies")
+
+Label = namedtuple("Label", ["row_id", "barcode_value", "data"])
+
+
+def split_description(description, max_chars=DESCRIPTION_LINE):
+    """Split description into two lines for printer labels."""
+    if len(description) <= max_chars:
+        return description, ""
+
+    split_pos = description.rfind(' ', 0, max_chars + 1)
+    if split_pos == -1:
+        split_pos = max_chars
+
+    return description[:split_pos].strip(), description[split_pos:].strip()
+
+
+class LabelFormat:
+    """
+    The printer settings a job needs, read once before the job starts.
+
+    Attributes:
+        template: The CompiledTemplate of the TSPL or ZPL template, from `templates` when
+            given so a template is compiled once, not once per job.
+        clear: Command sent before each label to clear the printer buffer.
+        company_name: Value of `{{companyName}}`.
+        remark: Value of `{{remark}}`.
+        suffix: Appended to every label, e.g. the ZPL remark line.
+    """
+
+    def __init__(self, template, clear, company_name="", remark="", suffix="", templates=None):
+        self.template = templates.get(template) if templates is not None else CompiledTemplate(template or "")
+        self.clear = clear
+        self.company_name = str(company_name)
+        self.remark = str(remark)
+        self.suffix = suffix
+
+
+class PrintJob:
+    """
+    Labels of catalog rows, built from the raw catalog columns.
+
+    Args:
+        catalog: The Catalog the row ids belong to.
+        row_ids: Row ids to print, in print order, e.g. a Selection.
+        label_format: A LabelFormat.
+        copies: Row id -> copies for the rows not printed once, e.g. `Selection.copies`.
+    """
+
+    def __init__(self, catalog, row_ids, label_format, copies=None):
+        self.logger = setup_logger('PrintJob')
+        self.catalog = catalog
+        self.row_ids = row_ids
+        self.label_format = label_format
+        self.copies = copies or {}
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def values(self, row_id):
+        """The placeholder values of one row's label."""
+        description = str(self.catalog.descriptions[row_id]).replace('"', '')
+        description_1, description_2 = split_description(description)
+        label_format = self.label_format
+        return {
+            "companyName": label_format.company_name,
+            "description": description,
+            "description_1": description_1,
+            "description_2": description_2,
+            "remark": label_format.remark,
+            "barcode_value": str(self.catalog.barcodes[row_id]),
+            "unit_price_integer": format_price(from_fixed(self.catalog.location_prices[row_id])),
+            "copies": str(self.copies.get(row_id, 1)),
+        }
+
+    def labels(self):
+        """Yield a Label per row, one at a time, so a large job is never held in memory whole."""
+        template = self.label_format.template
+        suffix = self.label_format.suffix
+        for name in template.missing(VALUE_NAMES):
+            self.logger.warning(f"Missing placeholder for: {name}")
+        for row_id in self.row_ids:
+            values = self.values(row_id)
+            yield Label(row_id, values["barcode_value"], template.render(values) + suffix)
@@ -0,0 +1,25 @@
+# A print job sent as one byte stream: the clear command once, then every label, each
+# ended by a line break so the next label's first command starts on its own line.
+
+SEPARATOR = "\r\n"
+STREAM_CHUNK = 64 * 1024  # Bytes handed to the socket or spooler at a time
+
+
+def stream_chunks(clear, texts, chunk_size=STREAM_CHUNK):
+    """
+    The clear command and the label texts, utf-8 encoded and packed into chunks of about
+    `chunk_size` bytes, so a long job is neither sent label by label nor held whole.
+
+    The same bytearray is yielded each time and refilled once the caller asks for the next
+    chunk; the caller must be done with it by then.
+    """
+    buffer = bytearray()
+    if clear:
+        buffer += (clear + SEPARATOR).encode('utf-8')
+    for text in texts:
+        buffer += (text + SEPARATOR).encode('utf-8')
+        if len(buffer) >= chunk_size:
+            yield buffer
+            buffer.clear()
+    if buffer:
+        yield buffer
@@ -0,0 +1,213 @@
+import select
+import socket
+import threading
+import time
+from modules.logger_config import setup_logger
+
+CONNECT_TIMEOUT = 3  # seconds
+SEND_TIMEOUT = 10  # A printer that takes longer to accept a chunk is treated as gone
+SEND_BUFFER = 256 * 1024  # Room for several labels in the kernel, so sendall returns while the printer reads
+KEEPALIVE_IDLE = 30  # Idle seconds before the first keepalive probe
+KEEPALIVE_INTERVAL = 10
+KEEPALIVE_COUNT = 3
+REACHABLE_TTL = 30  # Seconds a successful connect or send vouches for the printer
+UNREACHABLE_TTL = 5  # Seconds a failed connect is remembered, so repeated clicks fail fast
+MAX_IDLE = 120  # Idle seconds after which close_idle() lets go of a connection
+
+
+class PrinterConnection:
+    """
+    One persistent TCP connection to a network label printer (raw port 9100).
+
+    The socket is opened on first use and kept for the next job, with TCP_NODELAY so a
+    short label is not held back, a large send buffer and keepalive probes. Before each
+    send a connection the printer has closed is noticed (readable with no data) and
+    reopened. A send that fails before any byte of the job went out is retried once on a
+    fresh connection; a failure later in the job is raised rather than risk printing
+    labels twice.
+
+    Reachability is cached instead of pinging: a connect or send that worked counts for
+    REACHABLE_TTL seconds, a failed connect for UNREACHABLE_TTL seconds.
+    """
+
+    def __init__(self, ip_address, port):
+        self.logger = setup_logger('PrinterPool')
+        self.address = (ip_address, int(port))
+        self.sock = None
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.reachable_until = 0.0
+        self.unreachable_until = 0.0
+        self.last_error = None
+        self.connects = 0
+
+    def tune(self, sock):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, KEEPALIVE_IDLE)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, KEEPALIVE_INTERVAL)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, KEEPALIVE_COUNT)
+        elif hasattr(socket, "SIO_KEEPALIVE_VALS"):
+            # Windows: (on, idle ms, interval ms)
+            sock.ioctl(socket.SIO_KEEPALIVE_VALS, (1, KEEPALIVE_IDLE * 1000, KEEPALIVE_INTERVAL * 1000))
+        sock.settimeout(SEND_TIMEOUT)
+
+    def open(self):
+        try:
+            sock = socket.create_connection(self.address, timeout=CONNECT_TIMEOUT)
+        except OSError as e:
+            self.mark_unreachable(e)
+            raise
+        self.tune(sock)
+        self.sock = sock
+        self.connects += 1
+        self.mark_reachable()
+        self.logger.info(f"Opened printer connection to {self.address[0]}:{self.address[1]}.")
+        return sock
+
+    def closed_by_printer(self):
+        """True when the printer has closed the connection; status bytes it sent are discarded."""
+        try:
+            while select.select([self.sock], [], [], 0)[0]:
+                if not self.sock.recv(4096):
+                    return True
+        except (OSError, ValueError):  # ValueError: the socket was closed underneath
+            return True
+        return False
+
+    def ensure(self):
+        """The open socket, reconnecting when there is none or the printer closed it."""
+        if self.sock is not None and self.closed_by_printer():
+            self.logger.info(f"Printer {self.address[0]}:{self.address[1]} closed the connection, reconnecting.")
+            self.close()
+        return self.sock if self.sock is not None else self.open()
+
+    def reachable(self):
+        """Whether the printer accepts connections, from the cache when it is recent."""
+        now = time.monotonic()
+        if now < self.reachable_until:
+            return True
+        if now < self.unreachable_until:
+            return False
+        with self.lock:
+            try:
+                self.ensure()
+            except OSError:
+                return False
+        return True
+
+    def send(self, chunks):
+        """
+        Send the chunks of one job (bytes-like) over the connection.
+
+        Returns:
+            int: Bytes sent.
+
+        Raises:
+            OSError: The printer could not be reached, or dropped the connection mid-job.
+        """
+        sent = 0
+        with self.lock:
+            for chunk in chunks:
+                self.send_chunk(chunk, retry=sent == 0)
+                sent += len(chunk)
+            self.last_used = time.monotonic()
+            self.mark_reachable()
+        return sent
+
+    def send_chunk(self, chunk, retry):
+        """
+        Send one chunk; with `retry`, a failure before any of its bytes went out is retried
+        once on a fresh connection.
+        """
+        written = 0
+        try:
+            sock = self.ensure()
+            with memoryview(chunk) as view:
+                while written < len(view):
+                    written += sock.send(view[written:])
+        except OSError as e:
+            self.close()
+            if not retry or written:
+                # Part of the chunk may already be printing, sending it again would print labels twice
+                self.mark_unreachable(e)
+                raise
+            self.logger.warning(f"Send to {self.address[0]}:{self.address[1]} failed ({e}), reconnecting.")
+            try:
+                self.ensure().sendall(chunk)
+            except OSError as retry_error:
+                # Remembered, so the next job fails fast instead of waiting for the connect timeout again
+                self.close()
+                self.mark_unreachable(retry_error)
+                raise
+
+    def mark_reachable(self):
+        self.reachable_until = time.monotonic() + REACHABLE_TTL
+        self.unreachable_until = 0.0
+
+    def mark_unreachable(self, error):
+        self.logger.error(f"Printer {self.address[0]}:{self.address[1]} unreachable: {error}")
+        self.last_error = error
+        self.reachable_until = 0.0
+        self.unreachable_until = time.monotonic() + UNREACHABLE_TTL
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+
+
+class PrinterPool:
+    """Process-wide persistent connections to network printers, one per (address, port)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = {}
+
+    def connection(self, ip_address, port):
+        key = (ip_address, int(port))
+        with self.lock:
+            connection = self.connections.get(key)
+            if connection is None:
+                connection = self.connections[key] = PrinterConnection(ip_address, port)
+            return connection
+
+    def close_idle(self, max_idle=MAX_IDLE):
+        """
+        Let go of connections idle for longer than max_idle seconds; many printers serve
+        one connection at a time, so an idle one would lock other tills out.
+        """
+        now = time.monotonic()
+        with self.lock:
+            connections = list(self.connections.values())
+        for connection in connections:
+            if connection.sock is not None and now - connection.last_used > max_idle and connection.lock.acquire(blocking=False):
+                try:
+                    connection.close()
+                finally:
+                    connection.lock.release()
+
+    def close(self):
+        with self.lock:
+            connections = list(self.connections.values())
+            self.connections.clear()
+        for connection in connections:
+            connection.close()
+
+
+_printer_pool = None
+_printer_pool_lock = threading.Lock()
+
+
+def get_printer_pool():
+    """Return the process-wide printer connection pool."""
+    global _printer_pool
+    with _printer_pool_lock:
+        if _printer_pool is None:
+            _printer_pool = PrinterPool()
+        return _printer_pool
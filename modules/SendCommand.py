@@ -1,8 +1,9 @@
 from PyQt5.QtWidgets import QMessageBox
 import socket
-import subprocess
 import os
 from modules.logger_config import setup_logger
+from modules.PrinterPool import get_printer_pool
+from modules.PrintStream import stream_chunks
 from win32 import win32print
 import usb
 import sys
@@ -14,49 +15,54 @@ class SendCommand:
         self.backend = usb.backend.libusb1.get_backend(find_library=self.resource_path('libusb-1.0.ddl'))
 
     def send_wireless_command(self, ip_address, port, command):
+        """Send one command over the printer's persistent connection."""
+        return self.send_wireless_chunks(ip_address, port, [command.encode('utf-8')])
+
+    def send_wireless_batch(self, ip_address, port, clear, texts):
+        """
+        Send a whole print job as one stream: the clear command once, then all labels.
+
+        Args:
+            clear: Command clearing the printer buffer, sent before the first label.
+            texts: The label texts, e.g. a generator; read as the stream is sent.
+
+        Returns:
+            bool: True when the whole job was sent.
+        """
+        return self.send_wireless_chunks(ip_address, port, stream_chunks(clear, texts))
+
+    def send_wireless_chunks(self, ip_address, port, chunks):
+        """
+        Send bytes to a network printer over its pooled connection. The connection stays
+        open for the next command; reachability comes from the pool's cache instead of a ping.
+
+        Returns:
+            bool: True when everything was sent.
+        """
         try:
             # Validate IP address
-            self.logger.info(f"Validating IP address: {ip_address}")
             try:
                 socket.inet_aton(ip_address)
             except socket.error:
                 self.logger.error(f"Invalid IP address: {ip_address}")
                 QMessageBox.critical(None, 'Error', f"Invalid IP address: {ip_address}")
-                return
-
-            # Ping the IP address to check if it's reachable
-            self.logger.info(f"Pinging {ip_address} to check connectivity...")
-            ping_command = ["ping", "-n", "1", ip_address] if os.name == "nt" else ["ping", "-c", "1", ip_address]
-            ping_result = subprocess.run(ping_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            if ping_result.returncode != 0:
-                self.logger.error(f"Ping failed for {ip_address}. Device may be unreachable.")
-                QMessageBox.critical(None, 'Error', f"Ping failed for {ip_address}. Device may be unreachable.")
-                return
-
-            # Log connection attempt
-            self.logger.info(f"Attempting to connect to {ip_address}:{port}")
-
-            # Check if the port is open
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                sock.settimeout(3)  # Set a timeout for the connection attempt
-                if sock.connect_ex((ip_address, int(port))) != 0:
-                    self.logger.error(f"Port {port} on {ip_address} is not open.")
-                    QMessageBox.critical(None, 'Error', f"Port {port} on {ip_address} is not open.")
-                    return
-
-            # Create a socket and connect
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as client_socket:
-                client_socket.connect((ip_address, int(port)))
-                self.logger.info(f"Connected to {ip_address}:{port}")
-
-                # Send the command
-                client_socket.sendall(command.encode('utf-8'))
-                self.logger.info(f"Command sent successfully: {command}")
+                return False
+
+            connection = get_printer_pool().connection(ip_address, port)
+            if not connection.reachable():
+                self.logger.error(f"Printer {ip_address}:{port} is unreachable: {connection.last_error}")
+                QMessageBox.critical(None, 'Error', f"Printer {ip_address}:{port} is unreachable: {connection.last_error}")
+                return False
+
+            sent = connection.send(chunks)
+            self.logger.info(f"Sent {sent} bytes to {ip_address}:{port}.")
+            return True
 
         except Exception as e:
             # Log the error
             self.logger.error(f"Error while sending command to {ip_address}:{port}: {e}")
             QMessageBox.critical(None, 'Error', f"Error: {e}")
+            return False
 
     def get_win32_printer_status(self, printer_name):
         """
@@ -120,6 +126,42 @@ class SendCommand:
             win32print.ClosePrinter(printer)
             self.logger.info(f"Printer connection closed for '{printer_name}'.")
 
+    def send_win32print_batch(self, printer_name, clear, texts):
+        """
+        Send a whole print job as one spooler job: the clear command once and all labels
+        written in chunks, instead of two spooler jobs per label.
+
+        Returns:
+            bool: True when the whole job was spooled.
+        """
+        self.logger.info(f"Attempting to send a batched print job to printer '{printer_name}' using win32print.")
+        printer = None
+        try:
+            printer = win32print.OpenPrinter(printer_name)
+            job_id = win32print.StartDocPrinter(printer, 1, ("Print Job", None, "RAW"))
+            self.logger.info(f"Print job started with ID: {job_id}")
+            win32print.StartPagePrinter(printer)
+
+            sent = 0
+            for chunk in stream_chunks(clear, texts):
+                win32print.WritePrinter(printer, bytes(chunk))
+                sent += len(chunk)
+
+            win32print.EndPagePrinter(printer)
+            win32print.EndDocPrinter(printer)
+            self.logger.info(f"Print job of {sent} bytes sent to printer '{printer_name}'.")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error while printing to '{printer_name}': {e}")
+            QMessageBox.critical(None, 'Error', f"Error: {e}")
+            return False
+
+        finally:
+            if printer is not None:
+                win32print.ClosePrinter(printer)
+                self.logger.info(f"Printer connection closed for '{printer_name}'.")
+
     def send_pyusb_command(self, vid, pid, endpoint, command):
         """
         Send a command to a USB printer.